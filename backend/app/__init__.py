@@ -3,6 +3,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 from app.config import Config
+from app.celery_app import celery_init_app
 
 db = SQLAlchemy()
 migrate = Migrate()
@@ -15,9 +16,17 @@ def create_app(config_class=Config):
     db.init_app(app)
     migrate.init_app(app, db)
     CORS(app)
+    celery_init_app(app)
+
+    from app.services.stage_timing import init_stage_timing
+    init_stage_timing(app)
+    from app.services.metrics import init_metrics
+    init_metrics(app)
+    from app.services.analysis_cache import init_analysis_cache
+    init_analysis_cache(app)
 
     # Register blueprints
-    from app.routes import auth_bp, symptoms_bp, medications_bp, food_bp, activity_bp, mood_bp, quick_log_bp, alerts_bp, environment_bp, users_bp, analysis_bp
+    from app.routes import auth_bp, symptoms_bp, medications_bp, food_bp, activity_bp, mood_bp, quick_log_bp, alerts_bp, environment_bp, users_bp, analysis_bp, metrics_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(symptoms_bp, url_prefix='/api/symptoms')
@@ -30,5 +39,10 @@ def create_app(config_class=Config):
     app.register_blueprint(environment_bp, url_prefix='/api/environment')
     app.register_blueprint(users_bp, url_prefix='/api/users')
     app.register_blueprint(analysis_bp, url_prefix='/api/analysis')
+    app.register_blueprint(metrics_bp, url_prefix='/api/metrics')
+
+    # Register CLI commands
+    from app.cli import analysis_cli
+    app.cli.add_command(analysis_cli)
 
     return app
\ No newline at end of file
@@ -0,0 +1,23 @@
+from celery import Celery, Task
+
+def celery_init_app(app):
+    """Create the Celery app for background jobs, running every task inside the Flask app context"""
+    class FlaskTask(Task):
+        def __call__(self, *args, **kwargs):
+            from app.services.metrics import log_metrics_if_due
+            with app.app_context():
+                try:
+                    return self.run(*args, **kwargs)
+                finally:
+                    log_metrics_if_due()
+
+    celery_app = Celery(app.name, task_cls=FlaskTask, include=['app.tasks'])
+    celery_app.conf.update(
+        broker_url=app.config['CELERY_BROKER_URL'],
+        result_backend=app.config['CELERY_RESULT_BACKEND'],
+        task_always_eager=app.config['CELERY_TASK_ALWAYS_EAGER'],
+        task_ignore_result=True,
+    )
+    celery_app.set_default()
+    app.extensions['celery'] = celery_app
+    return celery_app
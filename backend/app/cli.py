@@ -0,0 +1,94 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import click
+from flask.cli import AppGroup
+from app import db
+from app.models.user import User
+from app.services.rollups import rebuild_user_rollups
+from app.services.cooccurrence import rebuild_cooccurrence
+from app.services.batch_analysis import init_batch_worker, analyze_user_shard
+
+analysis_cli = AppGroup('analysis', help='Pattern analysis maintenance commands.')
+
+@analysis_cli.command('backfill-rollups')
+@click.option('--user-id', default=None, help='Only rebuild this user (default: every user).')
+def backfill_rollups(user_id):
+    """Rebuild daily rollups and food x symptom counts from the raw logs"""
+    query = User.query.with_entities(User.id)
+    if user_id:
+        query = query.filter(User.id == user_id)
+    user_ids = [row.id for row in query.all()]
+
+    total_days = 0
+    for i, uid in enumerate(user_ids, start=1):
+        total_days += rebuild_user_rollups(uid)
+        rebuild_cooccurrence(uid)
+        db.session.commit()
+        click.echo(f"[{i}/{len(user_ids)}] {uid}")
+
+    click.echo(f"Rebuilt {total_days} daily rollups for {len(user_ids)} user(s).")
+
+
+def _read_checkpoint(path):
+    """User IDs already completed by an earlier run"""
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return {line.strip() for line in f if line.strip()}
+
+@analysis_cli.command('batch')
+@click.option('--workers', default=2, show_default=True, type=click.IntRange(min=1),
+              help='Worker processes analyzing users concurrently (1 runs in-process).')
+@click.option('--shard-size', default=25, show_default=True, type=click.IntRange(min=1),
+              help='Users handed to a worker at a time.')
+@click.option('--checkpoint', default='analysis_batch.checkpoint', show_default=True,
+              help='File recording completed user IDs, so an interrupted run can resume.')
+@click.option('--restart', is_flag=True, help='Ignore the checkpoint and analyze every user again.')
+@click.option('--user-id', 'user_ids', multiple=True, help='Only analyze these users (repeatable).')
+def batch(workers, shard_size, checkpoint, restart, user_ids):
+    """Precompute every user's analysis into their stored analysis result"""
+    if restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    done = _read_checkpoint(checkpoint)
+
+    query = User.query.with_entities(User.id).order_by(User.id)
+    if user_ids:
+        query = query.filter(User.id.in_(user_ids))
+    pending = [row.id for row in query.yield_per(1000) if row.id not in done]
+    db.session.remove()
+
+    if done:
+        click.echo(f"Resuming: {len(done)} user(s) already done, {len(pending)} remaining.")
+    shards = [pending[i:i + shard_size] for i in range(0, len(pending), shard_size)]
+
+    started = time.perf_counter()
+    completed = failed = 0
+    with open(checkpoint, 'a') as log:
+        def record(outcomes):
+            nonlocal completed, failed
+            for user_id, count, error, _ in outcomes:
+                if error is None:
+                    completed += 1
+                    log.write(f"{user_id}\n")
+                else:
+                    failed += 1
+                    click.echo(f"  {user_id} failed: {error}", err=True)
+            log.flush()
+            elapsed = time.perf_counter() - started
+            click.echo(f"[{completed + failed}/{len(pending)}] {(completed + failed) / elapsed:.1f} users/sec")
+
+        if workers == 1:
+            for shard in shards:
+                record(analyze_user_shard(shard))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker) as pool:
+                futures = [pool.submit(analyze_user_shard, shard) for shard in shards]
+                for future in as_completed(futures):
+                    record(future.result())
+
+    elapsed = time.perf_counter() - started
+    rate = (completed + failed) / elapsed if elapsed else 0.0
+    click.echo(f"Analyzed {completed} user(s), {failed} failed, in {elapsed:.1f}s ({rate:.1f} users/sec).")
+    if failed:
+        click.echo("Failed users are not checkpointed; re-run to retry them.")
@@ -17,7 +17,32 @@ class Config:
     AIR_QUALITY_API_KEY = os.environ.get('AIR_QUALITY_API_KEY')
     HUGGINGFACE_TOKEN = os.environ.get('HUGGINGFACE_TOKEN')
     GOOGLE_GEMINI_KEY = os.environ.get('GOOGLE_GEMINI_KEY')
+    # How long a geocoded location search is reused before asking OpenWeatherMap again
+    GEOCODE_CACHE_TTL_SECONDS = int(os.environ.get('GEOCODE_CACHE_TTL_SECONDS') or 30 * 86400)
     
     # Celery
     CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL') or 'redis://localhost:6379/0'
-    CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND') or 'redis://localhost:6379/0'
\ No newline at end of file
+    CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND') or 'redis://localhost:6379/0'
+    # Run tasks inline instead of on a worker (tests/dev; pair with CELERY_BROKER_URL=memory://)
+    CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', '').lower() in ('1', 'true', 'yes')
+
+    # Pattern analysis
+    ANALYSIS_DEBOUNCE_SECONDS = int(os.environ.get('ANALYSIS_DEBOUNCE_SECONDS') or 30)  # quiet period after a write before recomputing
+    ANALYSIS_JOB_TIMEOUT_SECONDS = int(os.environ.get('ANALYSIS_JOB_TIMEOUT_SECONDS') or 600)  # a queued/running job older than this is assumed lost
+    ANALYSIS_CACHE_SIZE = int(os.environ.get('ANALYSIS_CACHE_SIZE') or 256)  # per-process LRU entries of analysis results
+    # Directory for per-user Arrow log snapshots that analysis reads through (needs pyarrow); unset reads the database directly
+    ANALYSIS_SNAPSHOT_DIR = os.environ.get('ANALYSIS_SNAPSHOT_DIR')
+    # Per-stage analysis timings as Server-Timing headers and log lines, optionally kept as per-process histograms
+    ANALYSIS_TIMING = os.environ.get('ANALYSIS_TIMING', '').lower() in ('1', 'true', 'yes')
+    ANALYSIS_TIMING_HISTOGRAMS = os.environ.get('ANALYSIS_TIMING_HISTOGRAMS', '').lower() in ('1', 'true', 'yes')
+    # Bearer token for GET /api/metrics (unset disables the route), and how often workers log the same metrics (0 is never)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_LOG_INTERVAL_SECONDS = int(os.environ.get('METRICS_LOG_INTERVAL_SECONDS') or 0)
+
+    # AI insight cache: fresh and stale-while-revalidate lifetimes, generation lease, and rows kept before evicting
+    INSIGHT_TTL_SECONDS = int(os.environ.get('INSIGHT_TTL_SECONDS') or 86400)
+    INSIGHT_STALE_SECONDS = int(os.environ.get('INSIGHT_STALE_SECONDS') or 7 * 86400)
+    INSIGHT_LEASE_SECONDS = int(os.environ.get('INSIGHT_LEASE_SECONDS') or 90)
+    INSIGHT_CACHE_MAX_ENTRIES = int(os.environ.get('INSIGHT_CACHE_MAX_ENTRIES') or 10000)
+    # Estimated token budget of the insight prompt sent to the model
+    INSIGHT_PROMPT_TOKENS = int(os.environ.get('INSIGHT_PROMPT_TOKENS') or 1200)
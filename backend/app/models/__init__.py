@@ -8,6 +8,11 @@ from .environment import EnvironmentLog
 from .pattern import Pattern
 from .alert import Alert
 from .report import Report
+from .rollup import DailyRollup
+from .correlation_stats import CorrelationStats
+from .food_symptom import FoodSymptomCount
+from .insight_cache import InsightCache
+from .geocode_cache import GeocodeCache
 
 __all__ = [
     'User',
@@ -21,4 +26,9 @@ __all__ = [
     'Pattern',
     'Alert',
     'Report',
+    'DailyRollup',
+    'CorrelationStats',
+    'FoodSymptomCount',
+    'InsightCache',
+    'GeocodeCache',
 ]
\ No newline at end of file
@@ -0,0 +1,20 @@
+from datetime import datetime
+from app import db
+
+class CorrelationStats(db.Model):
+    __tablename__ = 'correlation_stats'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'period_start', name='uq_correlation_stats_user_period'),
+    )
+    
+    id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+    period_start = db.Column(db.Date, nullable=False)  # first day of the month the stats cover
+    variables = db.Column(db.JSON, default=[])  # matrix variable names, in order of first appearance
+    # k x k pairwise sufficient statistics over days where both variables have a value:
+    # counts[i][j] = n, sums[i][j] = sum(x_i), sums_sq[i][j] = sum(x_i^2), cross[i][j] = sum(x_i * x_j)
+    counts = db.Column(db.JSON, default=[])
+    sums = db.Column(db.JSON, default=[])
+    sums_sq = db.Column(db.JSON, default=[])
+    cross = db.Column(db.JSON, default=[])
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,14 @@
+from app import db
+
+class FoodSymptomCount(db.Model):
+    __tablename__ = 'food_symptom_counts'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', 'food_name', 'symptom_name', name='uq_food_symptom_counts_user_day_pair'),
+    )
+    
+    id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+    day = db.Column(db.Date, nullable=False, index=True)  # day of the symptom episodes
+    food_name = db.Column(db.String(200), nullable=False)
+    symptom_name = db.Column(db.String(100), nullable=False)
+    episodes = db.Column(db.Integer, nullable=False, default=0)  # episodes with this food logged in the trigger window before them
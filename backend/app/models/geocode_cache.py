@@ -0,0 +1,12 @@
+from app import db
+
+class GeocodeCache(db.Model):
+    __tablename__ = 'geocode_cache'
+
+    id = db.Column(db.String(36), primary_key=True)
+    search = db.Column(db.String(200), nullable=False, unique=True)  # normalized location search string
+    lat = db.Column(db.Float)  # lat/lon/name are null when the location was not found
+    lon = db.Column(db.Float)
+    name = db.Column(db.String(200))  # "City, State, Country" as shown to users
+    created_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime, index=True)
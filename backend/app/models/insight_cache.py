@@ -0,0 +1,15 @@
+from app import db
+
+class InsightCache(db.Model):
+    __tablename__ = 'insight_cache'
+
+    id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, unique=True)
+    cache_key = db.Column(db.String(64))  # what the insight was generated for (the user's data version)
+    insight = db.Column(db.Text)
+    generated_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime)  # served as fresh until
+    stale_until = db.Column(db.DateTime, index=True)  # served while revalidating until, then evicted
+    last_accessed_at = db.Column(db.DateTime, index=True)
+    lease_owner = db.Column(db.String(36))  # generation in flight, single-flight per user
+    lease_expires_at = db.Column(db.DateTime)
@@ -3,6 +3,9 @@ from app import db
 
 class MoodLog(db.Model):
     __tablename__ = 'mood_logs'
+    __table_args__ = (
+        db.Index('ix_mood_logs_user_timestamp', 'user_id', 'timestamp'),  # per-user time range and latest-n queries
+    )
     
     id = db.Column(db.String(36), primary_key=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
@@ -0,0 +1,53 @@
+from datetime import datetime
+from app import db
+
+class DailyRollup(db.Model):
+    __tablename__ = 'daily_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', name='uq_daily_rollups_user_day'),
+    )
+    
+    id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    symptom_mean = db.Column(db.Float)
+    symptom_max = db.Column(db.Integer)
+    symptom_count = db.Column(db.Integer, default=0)
+    symptom_breakdown = db.Column(db.JSON, default={})  # symptom name -> {mean, max, count}
+    mood_mean = db.Column(db.Float)
+    activity_intensity = db.Column(db.Float)
+    temperature = db.Column(db.Float)
+    humidity = db.Column(db.Float)
+    pressure = db.Column(db.Float)
+    air_quality_index = db.Column(db.Float)
+    pm2_5 = db.Column(db.Float)
+    pm10 = db.Column(db.Float)
+    uv_index = db.Column(db.Float)
+    clouds = db.Column(db.Float)
+    adherence_ratio = db.Column(db.Float)  # taken / logged doses, all medications
+    scheduled_adherence_ratio = db.Column(db.Float)  # same, daily-frequency medications only
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'userId': self.user_id,
+            'day': self.day.isoformat(),
+            'symptomMean': self.symptom_mean,
+            'symptomMax': self.symptom_max,
+            'symptomCount': self.symptom_count,
+            'symptomBreakdown': self.symptom_breakdown or {},
+            'moodMean': self.mood_mean,
+            'activityIntensity': self.activity_intensity,
+            'temperature': self.temperature,
+            'humidity': self.humidity,
+            'pressure': self.pressure,
+            'airQualityIndex': self.air_quality_index,
+            'pm2_5': self.pm2_5,
+            'pm10': self.pm10,
+            'uvIndex': self.uv_index,
+            'clouds': self.clouds,
+            'adherenceRatio': self.adherence_ratio,
+            'scheduledAdherenceRatio': self.scheduled_adherence_ratio,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -3,6 +3,9 @@ from app import db
 
 class SymptomLog(db.Model):
     __tablename__ = 'symptom_logs'
+    __table_args__ = (
+        db.Index('ix_symptom_logs_user_timestamp', 'user_id', 'timestamp'),  # per-user time range and latest-n queries
+    )
     
     id = db.Column(db.String(36), primary_key=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
@@ -10,8 +10,15 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     name = db.Column(db.String(100), nullable=False)
     home_location = db.Column(db.String(200))
+    home_lat = db.Column(db.Float)  # home_location geocoded when it is set
+    home_lon = db.Column(db.Float)
+    home_location_name = db.Column(db.String(200))  # the geocoded place's display name, "City, State, Country"
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     preferences = db.Column(db.JSON, default={})
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # bumped on every log write
+    # Whether food_symptom_counts are current; new users' are kept current from their first log,
+    # existing rows start false and are rebuilt on first read
+    cooccurrence_built = db.Column(db.Boolean, nullable=False, default=True, server_default=db.false())
 
     # Relationships
     symptoms = db.relationship('SymptomLog', backref='user', lazy='dynamic', cascade='all, delete-orphan')
@@ -23,6 +30,10 @@ class User(db.Model):
     patterns = db.relationship('Pattern', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     alerts = db.relationship('Alert', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     reports = db.relationship('Report', backref='user', lazy='dynamic', cascade='all, delete-orphan')
+    daily_rollups = db.relationship('DailyRollup', backref='user', lazy='dynamic', cascade='all, delete-orphan')
+    correlation_stats = db.relationship('CorrelationStats', backref='user', lazy='dynamic', cascade='all, delete-orphan')
+    food_symptom_counts = db.relationship('FoodSymptomCount', backref='user', lazy='dynamic', cascade='all, delete-orphan')
+    insight_cache = db.relationship('InsightCache', backref='user', lazy='dynamic', cascade='all, delete-orphan')
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
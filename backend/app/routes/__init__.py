@@ -9,6 +9,7 @@ from .alerts import alerts_bp
 from .environment import environment_bp
 from .users import users_bp
 from .analysis import analysis_bp
+from .metrics import metrics_bp
 
 __all__ = [
     'auth_bp',
@@ -21,5 +22,6 @@ __all__ = [
     'alerts_bp',
     'environment_bp',
     'users_bp',
-    'analysis_bp'
+    'analysis_bp',
+    'metrics_bp'
 ]
@@ -4,6 +4,8 @@ import uuid
 from app import db
 from app.models.activity import ActivityLog
 from app.utils.decorators import token_required
+from app.services.log_changes import commit_log_change
+from app.utils.validation import scale_error
 
 activity_bp = Blueprint('activity', __name__)
 
@@ -35,6 +37,9 @@ def get_activity_logs(current_user):
 def create_activity_log(current_user):
     try:
         data = request.get_json()
+        error = scale_error(data.get('intensity'), 'Intensity')
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
         
         log = ActivityLog(
             id=str(uuid.uuid4()),
@@ -47,7 +52,7 @@ def create_activity_log(current_user):
         )
         
         db.session.add(log)
-        db.session.commit()
+        commit_log_change(current_user.id, 'activity', log.timestamp)
         
         return jsonify({'success': True, 'data': log.to_dict()}), 201
     except Exception as e:
@@ -63,7 +68,7 @@ def delete_activity_log(current_user, log_id):
             return jsonify({'success': False, 'error': 'Log not found'}), 404
         
         db.session.delete(log)
-        db.session.commit()
+        commit_log_change(current_user.id, 'activity', log.timestamp, change='delete')
         
         return jsonify({'success': True, 'message': 'Deleted successfully'}), 200
     except Exception as e:
@@ -1,72 +1,81 @@
-from flask import Blueprint, jsonify
-from app.utils.decorators import token_required
-from app.services.pattern_analysis import analyze_correlations, get_summary_data, calculate_correlation_matrix
-from app.services.ai_service import generate_health_insights
-from app.models.pattern import Pattern
-from app import db
-import hashlib
 import json
-import uuid
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from app import db
+from app.utils.decorators import token_required
+from app.services.pattern_analysis import analysis_window
+from app.services.analysis_jobs import get_analysis_record, schedule_pattern_analysis, job_in_progress, analysis_job_status, insight_status, window_dict, stream_ai_insights
+from app.services.analysis_cache import get_data_version, get_cached_analysis
+from app.services.cooccurrence import load_cooccurrence, food_trigger_scores
+from app.services.stage_timing import stage
 
 analysis_bp = Blueprint('analysis', __name__)
 
 @analysis_bp.route('/patterns', methods=['GET'])
 @token_required
 def get_patterns(current_user):
-    """Get statistical correlations and AI-generated health insights"""
+    """
+    Get correlations and AI-generated health insights, plus analysis job status.
+
+    By default the stored result of the background analysis over the last
+    lookback window is returned. startDate, endDate and lookbackDays select
+    a custom window, whose correlations are computed (or read from the
+    analysis cache) in the request. AI insights are generated in the
+    background: while they are, insightStatus is 'pending' and aiInsights
+    is null (or the previous insight, served stale), and /insights serves
+    them once ready. If generation fails, insightStatus is 'failed' and
+    insightError says why.
+    """
     try:
-        # 1. Get statistical correlations (insights)
-        correlations = analyze_correlations(current_user.id)
-        
-        # 2. Get full correlation matrix for the heatmap
-        matrix = calculate_correlation_matrix(current_user.id)
-        
-        # 3. Get data summary for AI
-        summary_text = get_summary_data(current_user.id)
-        
-        # 4. Check for cached AI insights
-        # We create a hash of the current data state to see if anything changed
-        data_state = {
-            'summary': summary_text,
-            'correlations': correlations,
-            'matrix': matrix
-        }
-        state_hash = hashlib.sha256(json.dumps(data_state, sort_keys=True).encode()).hexdigest()
-        
-        cached_pattern = Pattern.query.filter_by(
-            user_id=current_user.id, 
-            pattern_type='ai_insight_cache'
-        ).first()
-        
-        ai_insights = ""
-        
-        if cached_pattern and cached_pattern.variables.get('state_hash') == state_hash:
-            # Use cached insight
-            ai_insights = cached_pattern.description
+        start_date = request.args.get('startDate')
+        end_date = request.args.get('endDate')
+        lookback_days = request.args.get('lookbackDays')
+
+        try:
+            start, end = analysis_window(start_date, end_date, lookback_days)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': f'Invalid date range: {e}'}), 400
+
+        record = get_analysis_record(current_user.id)
+        job = analysis_job_status(record)
+        variables = (record.variables or {}) if record else {}
+
+        # Nothing stored yet (e.g. a new account), or the stored result predates
+        # the user's latest write or today's window and no live job is pending: queue an analysis
+        data_version = get_data_version(current_user.id)
+        stored_version = variables.get('dataVersion')
+        stale = stored_version is None or stored_version < data_version \
+            or variables.get('window') != window_dict(*analysis_window())
+        if stale and not job_in_progress(record):
+            try:
+                schedule_pattern_analysis(current_user.id)
+            except Exception as e:
+                # The job is recorded as failed; serve what is stored
+                print(f"Error scheduling pattern analysis: {e}")
+            record = get_analysis_record(current_user.id)
+            job = analysis_job_status(record)
+
+        variables = record.variables or {}
+        if start_date or end_date or lookback_days:
+            with stage('analysis') as timer:
+                correlations, matrix = get_cached_analysis(current_user.id, data_version, start, end)
+                timer.count(len(correlations))
+            window = window_dict(start, end)
         else:
-            # Generate new insights
-            ai_insights = generate_health_insights(summary_text, correlations)
-            
-            # Update or create cache record
-            if not cached_pattern:
-                cached_pattern = Pattern(
-                    id=str(uuid.uuid4()),
-                    user_id=current_user.id,
-                    pattern_type='ai_insight_cache',
-                    confidence_score=1.0
-                )
-                db.session.add(cached_pattern)
-            
-            cached_pattern.description = ai_insights
-            cached_pattern.variables = {'state_hash': state_hash}
-            db.session.commit()
-        
+            correlations = variables.get('correlations', [])
+            matrix = variables.get('matrix', [])
+            window = variables.get('window')
+
+        insights = insight_status(record)
         return jsonify({
             'success': True,
             'data': {
                 'correlations': correlations,
                 'matrix': matrix,
-                'aiInsights': ai_insights
+                'aiInsights': insights['aiInsights'],
+                'insightStatus': insights['status'],
+                'insightError': insights['error'],
+                'window': window,
+                'job': job
             }
         }), 200
         
@@ -75,3 +84,94 @@ def get_patterns(current_user):
             'success': False,
             'error': str(e)
         }), 500
+
+@analysis_bp.route('/insights', methods=['GET'])
+@token_required
+def get_insights(current_user):
+    """
+    Status of the AI insights for the user's stored analysis, with the text
+    once generated. Poll this while /patterns reports insightStatus 'pending'.
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'data': insight_status(get_analysis_record(current_user.id))
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@analysis_bp.route('/insights/stream', methods=['GET'])
+@token_required
+def stream_insights(current_user):
+    """
+    Stream the AI insights for the user's current data as Server-Sent Events.
+
+    'token' events carry pieces of text as the model writes them and a final
+    'done' event carries the whole insight (alone, when it was already
+    cached). Failures end the stream with an 'error' event.
+
+    Like every route this needs the Authorization header, which the browser
+    EventSource API can't send, so clients read it with fetch and a stream
+    reader (see analysisService.streamInsights in the frontend).
+    """
+    user_id = current_user.id
+
+    def events():
+        try:
+            for event, text in stream_ai_insights(user_id):
+                yield _sse(event, {'text': text})
+        except Exception as e:
+            db.session.rollback()
+            yield _sse('error', {'error': str(e)})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        # Keep proxies from buffering the stream
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@analysis_bp.route('/triggers', methods=['GET'])
+@token_required
+def get_food_triggers(current_user):
+    """
+    Foods that tend to precede each symptom, ranked by lift.
+
+    Pass symptom to get a single symptom's foods; otherwise every logged
+    symptom is returned. Accepts the same startDate, endDate and
+    lookbackDays window as /patterns.
+    """
+    try:
+        symptom = request.args.get('symptom')
+        min_episodes = request.args.get('minEpisodes', 2, type=int)
+
+        try:
+            start, end = analysis_window(request.args.get('startDate'), request.args.get('endDate'), request.args.get('lookbackDays'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': f'Invalid date range: {e}'}), 400
+
+        with stage('cooccurrence') as timer:
+            matrix = load_cooccurrence(current_user.id, start, end)
+            timer.count(matrix['counts'].nnz)
+        symptoms = [symptom] if symptom else matrix['symptoms']
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'window': window_dict(start, end),
+                'triggers': {name: food_trigger_scores(matrix, name, min_episodes) for name in symptoms}
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -4,7 +4,8 @@ import uuid
 from app import db
 from app.models.environment import EnvironmentLog
 from app.utils.decorators import token_required
-from app.utils.weather import fetch_weather_data, search_cities
+from app.services.log_changes import commit_log_change
+from app.utils.weather import fetch_weather_data, search_cities, resolve_home_location
 
 environment_bp = Blueprint('environment', __name__)
 
@@ -58,7 +59,7 @@ def create_environment_log(current_user):
         )
         
         db.session.add(log)
-        db.session.commit()
+        commit_log_change(current_user.id, 'environment', log.timestamp)
         
         return jsonify({'success': True, 'data': log.to_dict()}), 201
     except Exception as e:
@@ -75,7 +76,10 @@ def update_home_location(current_user):
         if not location:
             return jsonify({'success': False, 'error': 'Location is required'}), 400
             
-        current_user.home_location = location
+        if location != current_user.home_location or current_user.home_lat is None:
+            current_user.home_location = location
+            # Saved even when it cannot be geocoded now; auto-fetch retries and reports the error
+            resolve_home_location(current_user)
         db.session.commit()
         
         return jsonify({'success': True, 'data': current_user.to_dict()}), 200
@@ -104,7 +108,16 @@ def auto_fetch_environment(current_user):
         if not location:
             return jsonify({'success': False, 'error': 'Home location not set. Please set it in settings.'}), 400
             
-        weather_data, error = fetch_weather_data(location)
+        if current_user.home_lat is None or current_user.home_lon is None or current_user.home_location_name is None:
+            # Locations saved before coordinates were stored, or that failed to geocode then
+            error = resolve_home_location(current_user)
+            if error:
+                return jsonify({'success': False, 'error': error}), 400
+            db.session.commit()
+
+        weather_data, error = fetch_weather_data(
+            current_user.home_location_name, (current_user.home_lat, current_user.home_lon)
+        )
         if error:
             return jsonify({'success': False, 'error': error}), 400
             
@@ -119,7 +132,7 @@ def auto_fetch_environment(current_user):
             visibility=weather_data.get('visibility_mi'),
             pm2_5=weather_data.get('pm2_5'),
             pm10=weather_data.get('pm10'),
-            air_quality_index=weather_data['air_quality_index'],
+            air_quality_index=weather_data.get('air_quality_index'),
             uv_index=weather_data.get('uv_index'),
             clouds=weather_data.get('clouds'),
             weather_condition=weather_data['weather_condition'],
@@ -128,7 +141,7 @@ def auto_fetch_environment(current_user):
         )
         
         db.session.add(log)
-        db.session.commit()
+        commit_log_change(current_user.id, 'environment', log.timestamp)
         
         return jsonify({'success': True, 'data': log.to_dict()}), 201
     except Exception as e:
@@ -4,6 +4,7 @@ import uuid
 from app import db
 from app.models.food import FoodLog
 from app.utils.decorators import token_required
+from app.services.log_changes import commit_log_change
 
 food_bp = Blueprint('food', __name__)
 
@@ -47,7 +48,7 @@ def create_food_log(current_user):
         )
         
         db.session.add(log)
-        db.session.commit()
+        commit_log_change(current_user.id, 'food', log.timestamp)
         
         return jsonify({'success': True, 'data': log.to_dict()}), 201
     except Exception as e:
@@ -63,7 +64,7 @@ def delete_food_log(current_user, log_id):
             return jsonify({'success': False, 'error': 'Log not found'}), 404
         
         db.session.delete(log)
-        db.session.commit()
+        commit_log_change(current_user.id, 'food', log.timestamp, change='delete')
         
         return jsonify({'success': True, 'message': 'Deleted successfully'}), 200
     except Exception as e:
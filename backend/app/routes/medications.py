@@ -6,6 +6,7 @@ from app import db
 from app.models.medication import Medication, MedicationLog
 from app.models.alert import Alert
 from app.utils.decorators import token_required
+from app.services.log_changes import commit_log_change
 from sqlalchemy import func
 
 medications_bp = Blueprint('medications', __name__)
@@ -197,7 +198,9 @@ def update_medication(current_user, medication_id):
             medication.name = data['name']
         if 'dosage' in data:
             medication.dosage = data['dosage']
+        frequency_changed = False
         if 'frequency' in data:
+            frequency_changed = data['frequency'] != medication.frequency
             medication.frequency = data['frequency']
         if 'startDate' in data:
             try:
@@ -225,7 +228,16 @@ def update_medication(current_user, medication_id):
         if 'sideEffects' in data:
             medication.side_effects = data['sideEffects']
         
-        db.session.commit()
+        # A schedule change moves the medication's logs in or out of daily
+        # adherence tracking; no other field is read by the analysis
+        log_timestamps = []
+        if frequency_changed:
+            log_timestamps = [log.timestamp for log in medication.logs.with_entities(MedicationLog.timestamp)]
+
+        if log_timestamps:
+            commit_log_change(current_user.id, 'medication', *log_timestamps, change='update')
+        else:
+            db.session.commit()
         
         return jsonify({
             'success': True,
@@ -262,8 +274,14 @@ def delete_medication(current_user, medication_id):
             Alert.message.like(f"%{medication.name}%")
         ).delete(synchronize_session=False)
 
+        # Its dose logs are deleted with it, so their days need new rollups
+        log_timestamps = [log.timestamp for log in medication.logs.with_entities(MedicationLog.timestamp)]
+
         db.session.delete(medication)
-        db.session.commit()
+        if log_timestamps:
+            commit_log_change(current_user.id, 'medication', *log_timestamps, change='delete')
+        else:
+            db.session.commit()
         
         return jsonify({
             'success': True,
@@ -325,7 +343,7 @@ def log_dose(current_user, medication_id):
         )
         
         db.session.add(med_log)
-        db.session.commit()
+        commit_log_change(current_user.id, 'medication', med_log.timestamp)
         
         return jsonify({
             'success': True,
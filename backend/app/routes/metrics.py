@@ -0,0 +1,22 @@
+import hmac
+from flask import Blueprint, current_app, request, jsonify
+from app.services.metrics import process_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('', methods=['GET'])
+def get_metrics():
+    """
+    This process's integration and stage timing metrics, for operators.
+    Requires METRICS_TOKEN as a Bearer token; without one configured the
+    route does not exist.
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        return jsonify({'success': False, 'error': 'Not found'}), 404
+
+    auth_header = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(auth_header.encode(), f'Bearer {token}'.encode()):
+        return jsonify({'success': False, 'error': 'Invalid metrics token'}), 401
+
+    return jsonify({'success': True, 'data': process_metrics()}), 200
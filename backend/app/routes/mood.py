@@ -4,6 +4,8 @@ import uuid
 from app import db
 from app.models.mood import MoodLog
 from app.utils.decorators import token_required
+from app.services.log_changes import commit_log_change
+from app.utils.validation import scale_error
 
 mood_bp = Blueprint('mood', __name__)
 
@@ -35,6 +37,9 @@ def get_mood_logs(current_user):
 def create_mood_log(current_user):
     try:
         data = request.get_json()
+        error = scale_error(data.get('moodRating'), 'Mood rating')
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
         
         log = MoodLog(
             id=str(uuid.uuid4()),
@@ -46,7 +51,7 @@ def create_mood_log(current_user):
         )
         
         db.session.add(log)
-        db.session.commit()
+        commit_log_change(current_user.id, 'mood', log.timestamp)
         
         return jsonify({'success': True, 'data': log.to_dict()}), 201
     except Exception as e:
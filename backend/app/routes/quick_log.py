@@ -4,6 +4,8 @@ import uuid
 from app import db
 from app.models import SymptomLog, Medication, MedicationLog, FoodLog, ActivityLog, MoodLog
 from app.utils.decorators import token_required
+from app.services.log_changes import commit_log_change
+from app.utils.validation import scale_error
 
 quick_log_bp = Blueprint('quick_log', __name__)
 
@@ -26,6 +28,9 @@ def quick_log(current_user):
         if log_type == 'symptom':
             if not log_data.get('symptomName') or log_data.get('severity') is None:
                 return jsonify({'success': False, 'error': 'Symptom name and severity are required'}), 400
+            error = scale_error(log_data['severity'], 'Severity')
+            if error:
+                return jsonify({'success': False, 'error': error}), 400
             
             new_entry = SymptomLog(
                 id=str(uuid.uuid4()),
@@ -74,6 +79,9 @@ def quick_log(current_user):
         elif log_type == 'activity':
             if not log_data.get('activityType') or log_data.get('durationMinutes') is None:
                 return jsonify({'success': False, 'error': 'Activity type and duration are required'}), 400
+            error = scale_error(log_data.get('intensity', 5), 'Intensity')
+            if error:
+                return jsonify({'success': False, 'error': error}), 400
             
             new_entry = ActivityLog(
                 id=str(uuid.uuid4()),
@@ -88,6 +96,9 @@ def quick_log(current_user):
         elif log_type == 'mood':
             if log_data.get('moodRating') is None:
                 return jsonify({'success': False, 'error': 'Mood rating is required'}), 400
+            error = scale_error(log_data['moodRating'], 'Mood rating')
+            if error:
+                return jsonify({'success': False, 'error': error}), 400
             
             new_entry = MoodLog(
                 id=str(uuid.uuid4()),
@@ -102,7 +113,7 @@ def quick_log(current_user):
 
         if new_entry:
             db.session.add(new_entry)
-            db.session.commit()
+            commit_log_change(current_user.id, log_type, new_entry.timestamp)
             return jsonify({
                 'success': True,
                 'message': f'{log_type.capitalize()} logged successfully',
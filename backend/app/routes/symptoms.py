@@ -4,6 +4,8 @@ import uuid
 from app import db
 from app.models.symptom import SymptomLog
 from app.utils.decorators import token_required
+from app.services.log_changes import commit_log_change
+from app.utils.validation import scale_error
 
 symptoms_bp = Blueprint('symptoms', __name__)
 
@@ -63,6 +65,9 @@ def create_symptom(current_user):
                 'success': False,
                 'error': 'Symptom name and severity are required'
             }), 400
+        error = scale_error(data['severity'], 'Severity')
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
         
         # Create symptom log
         symptom = SymptomLog(
@@ -78,7 +83,7 @@ def create_symptom(current_user):
         )
         
         db.session.add(symptom)
-        db.session.commit()
+        commit_log_change(current_user.id, 'symptom', symptom.timestamp)
         
         return jsonify({
             'success': True,
@@ -129,6 +134,11 @@ def update_symptom(current_user, symptom_id):
         
         data = request.get_json()
         
+        if 'severity' in data:
+            error = scale_error(data['severity'], 'Severity')
+            if error:
+                return jsonify({'success': False, 'error': error}), 400
+
         # Update fields
         if 'symptomName' in data:
             symptom.symptom_name = data['symptomName']
@@ -143,7 +153,7 @@ def update_symptom(current_user, symptom_id):
         if 'triggers' in data:
             symptom.triggers = data['triggers']
         
-        db.session.commit()
+        commit_log_change(current_user.id, 'symptom', symptom.timestamp, change='update')
         
         return jsonify({
             'success': True,
@@ -170,7 +180,7 @@ def delete_symptom(current_user, symptom_id):
             }), 404
         
         db.session.delete(symptom)
-        db.session.commit()
+        commit_log_change(current_user.id, 'symptom', symptom.timestamp, change='delete')
         
         return jsonify({
             'success': True,
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from app import db
 from app.models.user import User
 from app.utils.decorators import token_required
+from app.utils.weather import resolve_home_location
 from werkzeug.security import generate_password_hash
 
 users_bp = Blueprint('users', __name__)
@@ -26,8 +27,10 @@ def update_profile(current_user):
                 }), 400
             current_user.email = data['email']
             
-        if 'homeLocation' in data:
+        if 'homeLocation' in data and data['homeLocation'] != current_user.home_location:
             current_user.home_location = data['homeLocation']
+            # Saved even when it cannot be geocoded now; auto-fetch retries and reports the error
+            resolve_home_location(current_user)
             
         db.session.commit()
         
@@ -1,56 +1,103 @@
-import requests
 import os
+import json
 from dotenv import load_dotenv
+from app.utils.http_client import http_post
 
 load_dotenv()
 
 # Using a capable and available model for the chat completion endpoint
-HF_API_URL = "https://router.huggingface.co/v1/chat/completions"
+# Overridable so a local stand-in for the HF router can be used in development and tests
+HF_API_URL = os.getenv("HF_API_URL") or "https://router.huggingface.co/v1/chat/completions"
 HF_AI_MODEL = "meta-llama/Llama-3.2-3B-Instruct"
 HF_TOKEN = os.getenv("HUGGINGFACE_TOKEN")
 
-def generate_health_insights(summary_text, correlation_results):
-    """Generate natural language insights using Hugging Face Inference API"""
-    
+UNAVAILABLE_MESSAGE = "Insight generation is currently unavailable (API token missing). Please check your statistical correlations below."
+
+class AIServiceError(Exception):
+    """Insights could not be generated; the message is safe to show users"""
+
+def _chat_payload(messages):
+    """Chat completion request body for the insight prompt"""
+    return {
+        "model": HF_AI_MODEL,
+        "messages": messages,
+        "max_tokens": 500,
+        "temperature": 0.7,
+        "top_p": 0.95
+    }
+
+def generate_health_insights(messages):
+    """
+    Generate natural language insights for the prompt messages using Hugging
+    Face Inference API. Raises AIServiceError if they can't be generated, so
+    a failure is never stored as if it were an insight.
+    """
     if not HF_TOKEN:
-        return "Insight generation is currently unavailable (API token missing). Please check your statistical correlations below."
+        raise AIServiceError(UNAVAILABLE_MESSAGE)
 
-    # Construct the context for the AI
-    correlation_text = "\n".join([f"- {res['description']}" for res in correlation_results])
-    
+    headers = {"Authorization": f"Bearer {HF_TOKEN}"}
+    payload = _chat_payload(messages)
     try:
-        headers = {"Authorization": f"Bearer {HF_TOKEN}"}
-        payload = {
-            "model": HF_AI_MODEL,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are a specialized health pattern analyst. Your goal is to provide 3 concise, actionable observations based on health logs. Use clear Markdown bullet points. Do not provide medical advice. Be professional, empathetic, and objective."
-                },
-                {
-                    "role": "user",
-                    "content": f"DATA SUMMARY:\n{summary_text}\n\nSTATISTICAL CORRELATIONS:\n{correlation_text}\n\nBased on this data, provide 3 concise insights or patterns as a bulleted list. Use **bolding** for key factors. Focus on possible triggers and lifestyle connections."
-                }
-            ],
-            "max_tokens": 500,
-            "temperature": 0.7,
-            "top_p": 0.95
-        }
-        
-        response = requests.post(HF_API_URL, headers=headers, json=payload, timeout=20)
-        
-        if response.status_code == 200:
-            result = response.json()
-            # Chat completion format: result['choices'][0]['message']['content']
-            if 'choices' in result and len(result['choices']) > 0:
-                return result['choices'][0]['message']['content']
-            return "Unexpected response format from AI service."
-        elif response.status_code == 503:
-            return "The AI model is currently loading on Hugging Face servers. Please try again in a few minutes."
-        else:
-            print(f"HF API Error: {response.status_code} - {response.text}")
-            return f"AI Insight generation encountered an error (Status {response.status_code})."
-            
+        response = http_post('huggingface', HF_API_URL, headers=headers, json=payload)
+    except Exception as e:
+        print(f"AI Service Exception: {e}")
+        raise AIServiceError("An error occurred while connecting to the AI service.")
+
+    if response.status_code == 503:
+        raise AIServiceError("The AI model is currently loading on Hugging Face servers. Please try again in a few minutes.")
+    if response.status_code != 200:
+        print(f"HF API Error: {response.status_code} - {response.text}")
+        raise AIServiceError(f"AI Insight generation encountered an error (Status {response.status_code}).")
+
+    try:
+        # Chat completion format: result['choices'][0]['message']['content']
+        content = response.json()['choices'][0]['message']['content']
+    except (ValueError, KeyError, IndexError, TypeError):
+        content = None
+    if not content:
+        raise AIServiceError("Unexpected response format from AI service.")
+    return content
+
+def stream_health_insights(messages):
+    """
+    Yield the insight text in pieces as the model generates it, using the
+    chat completion API's stream mode (server-sent "data:" lines, ending
+    with "data: [DONE]"). Raises AIServiceError if the API fails.
+    """
+    if not HF_TOKEN:
+        raise AIServiceError(UNAVAILABLE_MESSAGE)
+
+    headers = {"Authorization": f"Bearer {HF_TOKEN}", "Accept": "text/event-stream"}
+    payload = {**_chat_payload(messages), "stream": True}
+    try:
+        response = http_post('huggingface', HF_API_URL, headers=headers, json=payload, stream=True)
     except Exception as e:
         print(f"AI Service Exception: {e}")
-        return "An error occurred while connecting to the AI service."
+        raise AIServiceError("An error occurred while connecting to the AI service.")
+
+    with response:
+        if response.status_code == 503:
+            raise AIServiceError("The AI model is currently loading on Hugging Face servers. Please try again in a few minutes.")
+        if response.status_code != 200:
+            print(f"HF API Error: {response.status_code} - {response.text}")
+            raise AIServiceError(f"AI Insight generation encountered an error (Status {response.status_code}).")
+
+        # Event streams are UTF-8, but requests assumes ISO-8859-1 for any
+        # text/* response whose Content-Type names no charset
+        if "charset" not in response.headers.get("Content-Type", "").lower():
+            response.encoding = "utf-8"
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                # Stream format: choices[0]['delta']['content'], absent on role/finish chunks
+                text = choices[0].get("delta", {}).get("content") if choices else None
+                if text:
+                    yield text
+        except Exception as e:
+            print(f"AI Service Exception: {e}")
+            raise AIServiceError("The connection to the AI service was interrupted.")
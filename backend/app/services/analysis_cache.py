@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+from flask import current_app
+from app.services.pattern_analysis import (
+    get_data_version, analysis_seed, load_user_data, analyze_correlations, calculate_correlation_matrix,
+)
+
+class LRUCache:
+    """Thread-safe, size-bounded cache that evicts the least recently used entry"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+def init_analysis_cache(app):
+    """
+    Give the app its analysis cache, sized by ANALYSIS_CACHE_SIZE.
+
+    Entries are keyed by (user_id, data_version, start, end); a write bumps
+    the version, so stale entries are never read again and age out of the LRU.
+    """
+    app.extensions['analysis_cache'] = LRUCache(app.config['ANALYSIS_CACHE_SIZE'])
+
+def get_analysis_cache():
+    """The current app's analysis cache"""
+    return current_app.extensions['analysis_cache']
+
+_MISSING = object()
+
+def get_cached_analysis(user_id, data_version=None, start=None, end=None):
+    """
+    Return (correlations, matrix) for the user's current data in [start, end).
+
+    An unchanged user is answered from the cache without loading any logs;
+    on a miss the analyzers run once over the window and the result is
+    cached under the version and window they were computed for.
+    """
+    if data_version is None:
+        data_version = get_data_version(user_id)
+
+    key = (user_id, data_version, start, end)
+    cache = get_analysis_cache()
+    cached = cache.get(key, _MISSING)
+    if cached is not _MISSING:
+        return cached
+
+    result = (
+        analyze_correlations(user_id, load_user_data(user_id, start, end), seed=analysis_seed(user_id, data_version)),
+        calculate_correlation_matrix(user_id, start, end)
+    )
+    cache.set(key, result)
+    return result
@@ -0,0 +1,322 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from app import db
+from app.models.pattern import Pattern
+from app.services.pattern_analysis import get_summary_logs, analysis_window
+from app.services.analysis_cache import get_data_version, get_cached_analysis
+from app.services.ai_service import AIServiceError, generate_health_insights, stream_health_insights
+from app.services.insight_prompt import build_insight_messages
+from app.services.stage_timing import stage
+from app.services.insight_cache import lookup_insight, get_or_generate_insight, acquire_lease, release_lease, store_insight
+
+# Pattern row holding a user's latest stored analysis
+ANALYSIS_RESULT_TYPE = 'analysis_result'
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+def get_analysis_record(user_id):
+    """The Pattern row storing the user's latest analysis result and job status"""
+    return Pattern.query.filter_by(user_id=user_id, pattern_type=ANALYSIS_RESULT_TYPE).first()
+
+def _update_record(record, **fields):
+    """Merge fields into the record's JSON variables (reassigned so the change is tracked)"""
+    variables = dict(record.variables or {})
+    variables.update(fields)
+    record.variables = variables
+
+def _get_or_create_record(user_id):
+    record = get_analysis_record(user_id)
+    if not record:
+        record = Pattern(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            pattern_type=ANALYSIS_RESULT_TYPE,
+            description='Latest pattern analysis',
+            confidence_score=1.0,
+            variables={}
+        )
+        db.session.add(record)
+    return record
+
+def schedule_pattern_analysis(user_id):
+    """
+    Queue a debounced recompute of the user's patterns.
+
+    Each call issues a new job id and queues a task that runs after
+    ANALYSIS_DEBOUNCE_SECONDS; older queued tasks find they have been
+    superseded and exit, so a burst of writes produces one analysis.
+    """
+    from app.tasks import run_pattern_analysis
+
+    record = _get_or_create_record(user_id)
+    job_id = str(uuid.uuid4())
+    # Committed before enqueueing, so the task never finds an older job id
+    _update_record(record, jobId=job_id, status='queued', requestedAt=_now(), error=None)
+    db.session.commit()
+
+    try:
+        run_pattern_analysis.apply_async(
+            args=[user_id, job_id],
+            countdown=current_app.config['ANALYSIS_DEBOUNCE_SECONDS']
+        )
+    except Exception as e:
+        # Never leave a job 'queued' that no worker will run; a failed job is queued again on the next read
+        db.session.rollback()
+        record = get_analysis_record(user_id)
+        if (record.variables or {}).get('jobId') == job_id:
+            _update_record(record, status='failed', error=f'Could not queue analysis: {e}')
+            db.session.commit()
+        raise
+    return job_id
+
+def job_in_progress(record):
+    """
+    Whether the record's analysis job is queued or running and recent enough
+    to still finish. A job queued longer than the debounce plus
+    ANALYSIS_JOB_TIMEOUT_SECONDS, or running longer than the timeout, is
+    treated as lost (e.g. its worker died) so it can be queued again.
+    """
+    variables = (record.variables or {}) if record else {}
+    status = variables.get('status')
+    timeout = timedelta(seconds=current_app.config['ANALYSIS_JOB_TIMEOUT_SECONDS'])
+    if status == 'queued':
+        since = variables.get('requestedAt')
+        timeout += timedelta(seconds=current_app.config['ANALYSIS_DEBOUNCE_SECONDS'])
+    elif status == 'running':
+        since = variables.get('startedAt')
+    else:
+        return False
+    return since is not None and datetime.now(timezone.utc) - datetime.fromisoformat(since) < timeout
+
+def _insight_messages(user_id, correlations, start, end):
+    """The insight prompt for the user's recent logs and correlations, within INSIGHT_PROMPT_TOKENS"""
+    summary_logs = get_summary_logs(user_id, start=start, end=end)
+    return build_insight_messages(summary_logs, correlations, current_app.config['INSIGHT_PROMPT_TOKENS'])
+
+def _get_ai_insights(user_id, data_version, correlations, start=None, end=None):
+    """
+    Return the AI insights for the user's data version from the insight
+    cache, generating them only on a miss. Concurrent callers share one
+    generation; None means another caller's generation did not finish in time.
+    """
+    def generate():
+        messages = _insight_messages(user_id, correlations, start, end)
+        with stage('ai_insights') as timer:
+            ai_insights = generate_health_insights(messages)
+            timer.count(len(correlations))
+        return ai_insights
+
+    return get_or_generate_insight(user_id, str(data_version), generate)
+
+def run_pattern_analysis_job(user_id, job_id):
+    """
+    Worker body for a queued analysis: run every analyzer over the default
+    lookback window and store the results on the user's analysis record
+    (see store_analysis). Results for an unchanged data version come from
+    the cache without loading logs.
+    """
+    record = get_analysis_record(user_id)
+    if not record or (record.variables or {}).get('jobId') != job_id:
+        return 'superseded'
+
+    _update_record(record, status='running', startedAt=_now())
+    db.session.commit()
+
+    try:
+        start, end = analysis_window()
+        data_version = get_data_version(user_id)
+        correlations, matrix = get_cached_analysis(user_id, data_version, start, end)
+    except Exception as e:
+        db.session.rollback()
+        record = get_analysis_record(user_id)
+        if record.variables.get('jobId') == job_id:
+            _update_record(record, status='failed', error=str(e))
+            db.session.commit()
+        raise
+
+    store_analysis(user_id, correlations, matrix, data_version, start, end, job_id)
+    return 'complete'
+
+def store_analysis(user_id, correlations, matrix, data_version, start, end, job_id=None):
+    """
+    Store a finished analysis of data_version over [start, end) on the
+    user's analysis record. AI insights are taken from their cache when
+    current; otherwise they are marked pending (with any stale insight still
+    served) and generated by a separate task.
+
+    job_id is the queued job that produced the results. The job status is
+    only marked complete when that job (or, without a job_id, no live job)
+    is the record's current one, so a newer pending job is left alone.
+    """
+    ai_insights, insight_state = lookup_insight(user_id, str(data_version))
+    record = get_analysis_record(user_id)
+    if record:
+        # A write may have queued a newer job since the analysis started
+        db.session.refresh(record)
+    else:
+        record = _get_or_create_record(user_id)
+    results = {
+        'correlations': correlations,
+        'matrix': matrix,
+        'dataVersion': data_version,
+        'window': window_dict(start, end),
+        'completedAt': _now(),
+    }
+    if insight_state == 'fresh':
+        results.update(aiInsights=ai_insights, insightStatus='complete', insightCompletedAt=_now(), insightError=None)
+    else:
+        results.update(aiInsights=ai_insights, insightStatus='pending', insightRequestedAt=_now(), insightError=None)
+    current_job = (record.variables or {}).get('jobId') == job_id if job_id else not job_in_progress(record)
+    if current_job:
+        results.update(status='complete', error=None)
+    _update_record(record, **results)
+    db.session.commit()
+
+    if insight_state != 'fresh':
+        try:
+            schedule_ai_insights(user_id, data_version, start, end)
+        except Exception as e:
+            db.session.rollback()
+            _update_record(record, insightStatus='failed', insightError=str(e))
+            db.session.commit()
+
+def schedule_ai_insights(user_id, data_version, start, end):
+    """Queue AI insight generation for the stored analysis of this data version"""
+    from app.tasks import generate_ai_insights
+
+    generate_ai_insights.delay(user_id, data_version, start.isoformat(), end.isoformat())
+
+def run_insight_job(user_id, data_version, start, end):
+    """
+    Worker body for AI insight generation: call the model for the stored
+    correlations of data_version over [start, end) (ISO datetimes) and store
+    the text on the analysis record. A newer analysis makes the job
+    superseded; its own insights are queued separately.
+    """
+    record = get_analysis_record(user_id)
+    if not record or (record.variables or {}).get('dataVersion') != data_version:
+        return 'superseded'
+
+    try:
+        ai_insights = _get_ai_insights(
+            user_id, data_version, record.variables.get('correlations', []),
+            datetime.fromisoformat(start), datetime.fromisoformat(end)
+        )
+    except Exception as e:
+        db.session.rollback()
+        record = get_analysis_record(user_id)
+        if record.variables.get('dataVersion') == data_version:
+            _update_record(record, insightStatus='failed', insightError=str(e))
+            db.session.commit()
+        raise
+
+    if ai_insights is None:
+        db.session.refresh(record)
+        if record.variables.get('dataVersion') != data_version:
+            return 'superseded'
+        _update_record(record, insightStatus='failed', insightError='Timed out waiting for another insight generation')
+        db.session.commit()
+        return 'timeout'
+    return 'complete' if store_record_insights(user_id, data_version, ai_insights) else 'superseded'
+
+def store_record_insights(user_id, data_version, ai_insights):
+    """Put finished insights on the stored analysis if it is still for data_version"""
+    record = get_analysis_record(user_id)
+    if not record:
+        return False
+    db.session.refresh(record)
+    if record.variables.get('dataVersion') != data_version:
+        return False
+    _update_record(record, aiInsights=ai_insights, insightStatus='complete', insightCompletedAt=_now(), insightError=None)
+    db.session.commit()
+    return True
+
+def stream_ai_insights(user_id):
+    """
+    Yield ('token', text) pieces of the user's AI insights as the model
+    writes them, then ('done', full text).
+
+    A fresh cached insight is yielded whole. Otherwise the caller that takes
+    the insight cache lease streams from the model and stores the finished
+    text in the cache and on the stored analysis; callers that find a
+    generation already running wait for its cached result instead. A
+    client that disconnects mid-stream releases the lease.
+    """
+    data_version = get_data_version(user_id)
+    cache_key = str(data_version)
+    insight, state = lookup_insight(user_id, cache_key)
+    if state == 'fresh':
+        yield 'done', insight
+        return
+
+    start, end = analysis_window()
+    record = get_analysis_record(user_id)
+    variables = (record.variables or {}) if record else {}
+    if variables.get('dataVersion') == data_version:
+        correlations = variables.get('correlations', [])
+    else:
+        correlations, _ = get_cached_analysis(user_id, data_version, start, end)
+
+    owner = str(uuid.uuid4())
+    if not acquire_lease(user_id, owner):
+        insight = _get_ai_insights(user_id, data_version, correlations, start, end)
+        if insight is None:
+            raise TimeoutError('Timed out waiting for another insight generation')
+        yield 'done', insight
+        return
+
+    pieces = []
+    try:
+        messages = _insight_messages(user_id, correlations, start, end)
+        with stage('ai_insights_stream') as timer:
+            for piece in stream_health_insights(messages):
+                pieces.append(piece)
+                yield 'token', piece
+            timer.count(len(correlations))
+    except BaseException:
+        db.session.rollback()
+        release_lease(user_id, owner)
+        raise
+
+    ai_insights = ''.join(pieces)
+    if not ai_insights:
+        release_lease(user_id, owner)
+        raise AIServiceError("The AI service returned no insights.")
+    store_insight(user_id, cache_key, ai_insights, owner)
+    store_record_insights(user_id, data_version, ai_insights)
+    yield 'done', ai_insights
+
+def window_dict(start, end):
+    """An analysis window as API dates, with the exclusive end shown as an inclusive endDate"""
+    return {
+        'startDate': start.date().isoformat(),
+        'endDate': (end - timedelta(days=1)).date().isoformat()
+    }
+
+def analysis_job_status(record):
+    """Job fields of an analysis record as returned by the API"""
+    variables = (record.variables or {}) if record else {}
+    return {
+        'id': variables.get('jobId'),
+        'status': variables.get('status', 'idle'),
+        'requestedAt': variables.get('requestedAt'),
+        'completedAt': variables.get('completedAt'),
+        'error': variables.get('error')
+    }
+
+def insight_status(record):
+    """AI insight fields of an analysis record as returned by the API"""
+    variables = (record.variables or {}) if record else {}
+    # Records stored before insights ran separately have the text but no status
+    status = variables.get('insightStatus') or ('complete' if variables.get('aiInsights') else 'idle')
+    return {
+        'status': status,
+        # While pending this is the previous insight (served stale) or None
+        'aiInsights': variables.get('aiInsights'),
+        'dataVersion': variables.get('dataVersion'),
+        'requestedAt': variables.get('insightRequestedAt'),
+        'completedAt': variables.get('insightCompletedAt'),
+        'error': variables.get('insightError')
+    }
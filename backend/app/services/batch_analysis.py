@@ -0,0 +1,52 @@
+import time
+from app import db
+from app.services.pattern_analysis import (
+    analysis_window, get_data_version, analysis_seed, load_user_data, analyze_correlations, calculate_correlation_matrix,
+)
+from app.services.analysis_jobs import store_analysis
+
+def analyze_user(user_id, start, end):
+    """
+    Run the analyzers for one user over [start, end) and store the results
+    on their analysis record, as a queued analysis job would, so /patterns
+    serves them without recomputing. Returns the number of results.
+    """
+    data_version = get_data_version(user_id)
+    correlations = analyze_correlations(user_id, load_user_data(user_id, start, end),
+                                        seed=analysis_seed(user_id, data_version))
+    matrix = calculate_correlation_matrix(user_id, start, end)
+    store_analysis(user_id, correlations, matrix, data_version, start, end)
+    return len(correlations)
+
+# Per-process app context, set up by init_batch_worker
+_worker_app = None
+
+def init_batch_worker():
+    """Process pool initializer: give each worker process its own app and database engine"""
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app()
+    _worker_app.app_context().push()
+    # Connections inherited from the parent process must not be shared
+    db.engine.dispose()
+
+def analyze_user_shard(user_ids):
+    """
+    Analyze a shard of users in a worker process over the default window.
+
+    Each user is loaded, analyzed and committed on its own, so memory stays
+    bounded by one user's data and a failure only loses that user. Returns
+    a list of (user_id, result count or None, error or None, seconds).
+    """
+    start, end = analysis_window()
+    outcomes = []
+    for user_id in user_ids:
+        began = time.perf_counter()
+        try:
+            outcomes.append((user_id, analyze_user(user_id, start, end), None, time.perf_counter() - began))
+        except Exception as e:
+            db.session.rollback()
+            outcomes.append((user_id, None, str(e), time.perf_counter() - began))
+        finally:
+            db.session.remove()
+    return outcomes
@@ -0,0 +1,65 @@
+import numpy as np
+
+def binarize_factors(values):
+    """
+    Split each column of a T x F matrix of daily values into "high" and
+    "low" flags: above or below that column's mean over the days it was
+    recorded. Missing days set neither flag. Returns a T x 2F boolean
+    matrix, high flags first.
+    """
+    values = np.asarray(values, dtype='float64')
+    recorded = ~np.isnan(values)
+    counts = recorded.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(recorded, values, 0.0).sum(axis=0) / counts
+    return np.hstack([values > means, values < means])
+
+def combo_severity(severity, flags):
+    """
+    Days and mean severity for every pair of daily flags.
+
+    severity is length T without NaN and flags a T x K boolean matrix. The
+    day counts and severity sums of all K x K pairs come from one matrix
+    product each, so the work is O(K^2 * T) with no per-pair loop. The
+    diagonal holds each flag on its own. Returns (days, mean), both K x K;
+    mean is NaN for pairs that never occur together.
+    """
+    b = np.asarray(flags, dtype='float64')
+    days = b.T @ b
+    sums = (b * np.asarray(severity, dtype='float64')[:, None]).T @ b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = sums / days
+    return days, mean
+
+def severity_combos(severity, flags, min_days=3, min_lift=1.0, n_permutations=2000, seed=None):
+    """
+    Pairs of flags whose days together have a mean severity at least
+    min_lift above the overall mean and above either flag on its own.
+
+    Every pair seen on min_days or more days is tested at once: severity is
+    shuffled across days n_permutations times, and each pair's observed
+    mean is compared with the best pair mean of each shuffle, so the
+    p-values account for how many pairs were searched.
+
+    Returns (i, j, days, mean, p_values, baseline) with one entry of i, j,
+    days, mean and p_values per qualifying pair (i < j), strongest first.
+    """
+    severity = np.asarray(severity, dtype='float64')
+    flags = np.asarray(flags, dtype=bool)
+    baseline = severity.mean() if len(severity) else np.nan
+    days, mean = combo_severity(severity, flags)
+
+    i, j = np.triu_indices(days.shape[0], k=1)
+    tested = days[i, j] >= min_days
+    i, j = i[tested], j[tested]
+    pair_days, pair_mean = days[i, j], mean[i, j]
+
+    rng = np.random.default_rng(seed)
+    shuffled = rng.permuted(np.broadcast_to(severity, (n_permutations, len(severity))), axis=1)
+    null_best = (shuffled @ (flags[:, i] & flags[:, j]).astype('float64') / pair_days).max(axis=1, initial=-np.inf)
+    p_values = (1 + (null_best[:, None] >= pair_mean - 1e-12).sum(axis=0)) / (1 + n_permutations)
+
+    keep = (pair_mean >= baseline + min_lift) & (pair_mean > np.fmax(mean[i, i], mean[j, j]))
+    order = np.argsort(-pair_mean[keep], kind='stable')
+    return (i[keep][order], j[keep][order], pair_days[keep][order],
+            pair_mean[keep][order], p_values[keep][order], baseline)
@@ -0,0 +1,179 @@
+import uuid
+from datetime import datetime, time, timedelta
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sqlalchemy import select, func
+from app import db
+from app.models.user import User
+from app.models.symptom import SymptomLog
+from app.models.food import FoodLog
+from app.models.food_symptom import FoodSymptomCount
+from app.services.log_loader import load_log_frame
+from app.services.window_join import window_join
+from app.services.pattern_analysis import TRIGGER_WINDOW
+
+EPISODE_COLUMNS = {
+    'timestamp': (SymptomLog.timestamp, 'datetime64[ns]'),
+    'symptomName': (SymptomLog.symptom_name, 'object'),
+}
+FOOD_COLUMNS = {
+    'timestamp': (FoodLog.timestamp, 'datetime64[ns]'),
+    'foodName': (FoodLog.food_name, 'object'),
+}
+
+def compute_cooccurrence(user_id, start=None, end=None, window=TRIGGER_WINDOW):
+    """
+    Count, for symptom episodes in [start, end), how many of each symptom had
+    each food logged within `window` before them.
+
+    All episodes are matched to foods in one window join. A food logged
+    several times before the same episode counts once. Returns a DataFrame
+    with day, food_name, symptom_name and episodes columns.
+    """
+    episodes = load_log_frame(SymptomLog, EPISODE_COLUMNS, user_id, start, end)
+    foods = load_log_frame(FoodLog, FOOD_COLUMNS, user_id, None if start is None else start - window, end)
+
+    episode_idx, food_idx = window_join(episodes['timestamp'], foods['timestamp'], window)
+    pairs = pd.DataFrame({
+        'episode': episode_idx,
+        'food_name': foods['foodName'].to_numpy()[food_idx],
+    }).drop_duplicates()
+    pairs['symptom_name'] = episodes['symptomName'].to_numpy()[pairs['episode']]
+    pairs['day'] = episodes['timestamp'].dt.date.to_numpy()[pairs['episode']]
+
+    return (
+        pairs.groupby(['day', 'food_name', 'symptom_name'], sort=False)
+        .size().rename('episodes').reset_index()
+    )
+
+def _insert_counts(user_id, counts):
+    rows = [
+        {'id': str(uuid.uuid4()), 'user_id': user_id, **row}
+        for row in counts.to_dict('records')
+    ]
+    if rows:
+        db.session.execute(FoodSymptomCount.__table__.insert(), rows)
+    return len(rows)
+
+def refresh_cooccurrence(user_id, log_type, timestamps, window=TRIGGER_WINDOW):
+    """
+    Recount the episodes a food or symptom write can affect.
+
+    A symptom only changes its own day's counts; a food changes the days of
+    every episode whose window it falls in. Those days are recounted from
+    the raw logs before commit, so pending edits and deletes are reflected.
+    """
+    days = set()
+    for ts in timestamps:
+        if ts is None:
+            continue
+        last = (ts + window).date() if log_type == 'food' else ts.date()
+        days.update(ts.date() + timedelta(days=i) for i in range((last - ts.date()).days + 1))
+    if not days:
+        return
+
+    first, last = min(days), max(days)
+    start = datetime.combine(first, time.min)
+    end = datetime.combine(last + timedelta(days=1), time.min)
+
+    FoodSymptomCount.query.filter(
+        FoodSymptomCount.user_id == user_id,
+        FoodSymptomCount.day >= first,
+        FoodSymptomCount.day <= last
+    ).delete(synchronize_session=False)
+    _insert_counts(user_id, compute_cooccurrence(user_id, start, end, window))
+
+def rebuild_cooccurrence(user_id):
+    """Replace all of a user's food x symptom counts from their full history and mark them built"""
+    FoodSymptomCount.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+    User.query.filter_by(id=user_id).update({User.cooccurrence_built: True}, synchronize_session=False)
+    return _insert_counts(user_id, compute_cooccurrence(user_id))
+
+def _window_filter(stmt, column, start, end):
+    if start is not None:
+        stmt = stmt.where(column >= start)
+    if end is not None:
+        stmt = stmt.where(column < end)
+    return stmt
+
+def load_cooccurrence(user_id, start=None, end=None):
+    """
+    Load the user's food x symptom episode counts as a sparse matrix.
+
+    Returns a dict with the row 'foods', the column 'symptoms', 'counts' as a
+    CSR matrix of episodes, 'episodes' (total episodes per symptom, with or
+    without a food before them) and 'total' episodes, all over symptom
+    episodes in [start, end). Users whose counts were never built (those from
+    before the index existed) are rebuilt once on first read; after that an
+    empty result is just read back.
+    """
+    if not db.session.execute(select(User.cooccurrence_built).where(User.id == user_id)).scalar():
+        rebuild_cooccurrence(user_id)
+        db.session.commit()
+
+    pair_stmt = _window_filter(
+        select(FoodSymptomCount.food_name, FoodSymptomCount.symptom_name, func.sum(FoodSymptomCount.episodes))
+        .where(FoodSymptomCount.user_id == user_id),
+        FoodSymptomCount.day, start.date() if start else None, end.date() if end else None
+    ).group_by(FoodSymptomCount.food_name, FoodSymptomCount.symptom_name)
+    pairs = pd.DataFrame(db.session.execute(pair_stmt).all(), columns=['food', 'symptom', 'episodes'])
+
+    episode_stmt = _window_filter(
+        select(SymptomLog.symptom_name, func.count()).where(SymptomLog.user_id == user_id),
+        SymptomLog.timestamp, start, end
+    ).group_by(SymptomLog.symptom_name)
+    episodes = dict(db.session.execute(episode_stmt).all())
+
+    foods = sorted(pairs['food'].unique())
+    symptoms = sorted(episodes)
+    rows = pd.Index(foods).get_indexer(pairs['food'])
+    cols = pd.Index(symptoms).get_indexer(pairs['symptom'])
+    counts = sparse.coo_matrix(
+        (pairs['episodes'].to_numpy(dtype='float64'), (rows, cols)),
+        shape=(len(foods), len(symptoms))
+    ).tocsr()
+
+    return {
+        'foods': foods,
+        'symptoms': symptoms,
+        'counts': counts,
+        'episodes': np.array([episodes[name] for name in symptoms], dtype='float64'),
+        'total': float(sum(episodes.values())),
+    }
+
+def food_trigger_scores(matrix, symptom, min_episodes=2):
+    """
+    Foods ranked by how strongly they precede one symptom, read from a
+    single column of the co-occurrence matrix.
+
+    support is the share of all episodes that were this symptom preceded by
+    the food, confidence the share of this symptom's episodes preceded by
+    it, and lift the confidence relative to how often the food precedes any
+    episode (above 1 means the food comes before this symptom more than
+    usual).
+    """
+    if symptom not in matrix['symptoms'] or not matrix['total']:
+        return []
+
+    col = matrix['symptoms'].index(symptom)
+    column = matrix['counts'][:, col].toarray().ravel()
+    food_episodes = np.asarray(matrix['counts'].sum(axis=1)).ravel()
+
+    found = np.flatnonzero(column >= min_episodes)
+    support = column[found] / matrix['total']
+    confidence = column[found] / matrix['episodes'][col]
+    lift = confidence / (food_episodes[found] / matrix['total'])
+
+    scores = [
+        {
+            'food': matrix['foods'][i],
+            'episodes': int(column[i]),
+            'support': round(float(s), 4),
+            'confidence': round(float(c), 4),
+            'lift': round(float(l), 2),
+        }
+        for i, s, c, l in zip(found, support, confidence, lift)
+    ]
+    scores.sort(key=lambda x: (-x['lift'], -x['episodes']))
+    return scores
@@ -0,0 +1,274 @@
+import uuid
+from datetime import date, datetime
+import numpy as np
+from app import db
+from app.models.correlation_stats import CorrelationStats
+from app.models.rollup import DailyRollup
+
+# Daily rollup columns shown in the correlation matrix, by display name
+MATRIX_FACTORS = {
+    'Mood': 'mood_mean',
+    'Activity Intensity': 'activity_intensity',
+    'Temp': 'temperature',
+    'Humidity': 'humidity',
+    'AQI': 'air_quality_index',
+    'Medication Adherence': 'adherence_ratio',
+}
+
+STAT_FIELDS = ['counts', 'sums', 'sums_sq', 'cross']
+
+def period_start(day):
+    """Stats are bucketed by calendar month"""
+    return date(day.year, day.month, 1)
+
+def _next_period(period):
+    return date(period.year + period.month // 12, period.month % 12 + 1, 1)
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+def matrix_values(rollup):
+    """
+    The correlation matrix variables present on one day, as {name: value}.
+
+    Accepts a rollup values dict (as computed by the rollup service) or None
+    for a day without a rollup.
+    """
+    if not rollup:
+        return {}
+    values = {
+        f"Symptom: {name}": stats['mean']
+        for name, stats in (rollup.get('symptom_breakdown') or {}).items()
+    }
+    for name, col in MATRIX_FACTORS.items():
+        if rollup.get(col) is not None:
+            values[name] = rollup[col]
+    return values
+
+def rollup_values(rollup):
+    """Rollup model row as the values dict matrix_values expects"""
+    return {
+        'symptom_breakdown': rollup.symptom_breakdown,
+        **{col: getattr(rollup, col) for col in MATRIX_FACTORS.values()},
+    }
+
+def sufficient_stats(values):
+    """
+    Pairwise-complete sufficient statistics for a days x k matrix with NaN gaps.
+
+    Entry [i][j] of each result only counts days where both i and j are present.
+    """
+    present = (~np.isnan(values)).astype('float64')
+    filled = np.nan_to_num(values)
+    return {
+        'counts': present.T @ present,
+        'sums': filled.T @ present,
+        'sums_sq': (filled ** 2).T @ present,
+        'cross': filled.T @ filled,
+    }
+
+def _load(row):
+    """Stats row as numpy matrices"""
+    k = len(row.variables or [])
+    return {field: np.array(getattr(row, field) or [], dtype='float64').reshape(k, k) for field in STAT_FIELDS}
+
+def _apply(row, day_values, sign):
+    """Add (sign=1) or remove (sign=-1) one day's values from a stats row"""
+    if not day_values:
+        return
+
+    variables = list(row.variables or [])
+    stats = _load(row)
+    new_vars = [name for name in day_values if name not in variables]
+    if new_vars:
+        variables += new_vars
+        k = len(variables)
+        for field in STAT_FIELDS:
+            grown = np.zeros((k, k))
+            grown[:stats[field].shape[0], :stats[field].shape[1]] = stats[field]
+            stats[field] = grown
+
+    vector = np.array([[day_values.get(name, np.nan) for name in variables]], dtype='float64')
+    delta = sufficient_stats(vector)
+
+    row.variables = variables
+    for field in STAT_FIELDS:
+        setattr(row, field, (stats[field] + sign * delta[field]).tolist())
+
+def update_correlation_stats(user_id, changes):
+    """
+    Apply rollup changes to the user's stats in O(k^2) per day.
+
+    changes is a list of (day, old rollup values, new rollup values); either
+    side may be None when the day's rollup is created or removed.
+    """
+    periods = sorted({period_start(day) for day, _, _ in changes})
+    if not periods:
+        return
+
+    rows = {
+        row.period_start: row
+        for row in CorrelationStats.query.filter(
+            CorrelationStats.user_id == user_id,
+            CorrelationStats.period_start.in_(periods)
+        ).all()
+    }
+
+    for day, old, new in changes:
+        old_values, new_values = matrix_values(old), matrix_values(new)
+        if old_values == new_values:
+            continue
+
+        period = period_start(day)
+        row = rows.get(period)
+        if not row:
+            row = CorrelationStats(id=str(uuid.uuid4()), user_id=user_id, period_start=period, variables=[])
+            db.session.add(row)
+            rows[period] = row
+
+        _apply(row, old_values, -1)
+        _apply(row, new_values, 1)
+
+def rebuild_correlation_stats(user_id, rollups=None):
+    """
+    Replace the user's stats with ones computed from their rollups.
+
+    rollups is an optional {day: rollup values} mapping; the stored rollups
+    are read when it is omitted.
+    """
+    CorrelationStats.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+
+    if rollups is None:
+        rollups = {
+            row.day: rollup_values(row)
+            for row in DailyRollup.query.filter_by(user_id=user_id).order_by(DailyRollup.day).all()
+        }
+
+    by_period = {}
+    for day in sorted(rollups):
+        by_period.setdefault(period_start(day), []).append(matrix_values(rollups[day]))
+
+    for period, days in by_period.items():
+        variables = list(dict.fromkeys(name for values in days for name in values))
+        if not variables:
+            continue
+        matrix = np.array([[values.get(name, np.nan) for name in variables] for values in days], dtype='float64')
+        stats = sufficient_stats(matrix)
+        db.session.add(CorrelationStats(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            period_start=period,
+            variables=variables,
+            **{field: stats[field].tolist() for field in STAT_FIELDS}
+        ))
+
+def _order_variables(variables):
+    """Symptoms first in order of appearance, then the fixed factors"""
+    symptoms = [v for v in variables if v.startswith('Symptom: ')]
+    factors = [name for name in MATRIX_FACTORS if name in variables]
+    return symptoms + factors
+
+def combine_stats(rows):
+    """Sum stats rows into one set of matrices over the union of their variables"""
+    variables = _order_variables(list(dict.fromkeys(v for row in rows for v in (row.variables or []))))
+    position = {name: i for i, name in enumerate(variables)}
+    k = len(variables)
+
+    totals = {field: np.zeros((k, k)) for field in STAT_FIELDS}
+    for row in rows:
+        if not row.variables:
+            continue
+        idx = np.array([position[name] for name in row.variables])
+        stats = _load(row)
+        for field in STAT_FIELDS:
+            totals[field][np.ix_(idx, idx)] += stats[field]
+
+    return variables, totals
+
+def pearson_from_sums(n, sx, sy, sxx, syy, sxy):
+    """
+    Pearson correlation from the sums over paired observations, elementwise
+    over broadcastable arrays: n pairs, sums of x, y, x^2, y^2 and x*y.
+    Pairs with fewer than two observations or no variance are NaN.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx ** 2 / n
+        var_y = syy - sy ** 2 / n
+        corr = cov / np.sqrt(var_x * var_y)
+
+    # Variances that are only floating point residue count as zero
+    flat = (var_x <= 1e-12 * np.abs(sxx)) | (var_y <= 1e-12 * np.abs(syy))
+    return np.clip(np.where((n < 2) | flat, np.nan, corr), -1.0, 1.0)
+
+def correlation_from_stats(totals):
+    """
+    Pearson correlation for every pair, matching DataFrame.corr() with
+    pairwise-complete observations. Pairs without variance are NaN.
+    """
+    sx, sxx = totals['sums'], totals['sums_sq']
+    return pearson_from_sums(totals['counts'], sx, sx.T, sxx, sxx.T, totals['cross'])
+
+def _rollup_stats(user_id, ranges):
+    """
+    Stats computed directly from the rollups of the days in [start, end)
+    ranges, for the partial months at the edges of a window. Returns an
+    unsaved stats row, or None when none of those days have values.
+    """
+    days = []
+    for start, end in ranges:
+        query = DailyRollup.query.filter(DailyRollup.user_id == user_id)
+        if start is not None:
+            query = query.filter(DailyRollup.day >= start)
+        if end is not None:
+            query = query.filter(DailyRollup.day < end)
+        days += [matrix_values(rollup_values(row)) for row in query.all()]
+
+    variables = list(dict.fromkeys(name for values in days for name in values))
+    if not variables:
+        return None
+    matrix = np.array([[values.get(name, np.nan) for name in variables] for values in days], dtype='float64')
+    stats = sufficient_stats(matrix)
+    return CorrelationStats(variables=variables, **{field: stats[field].tolist() for field in STAT_FIELDS})
+
+def load_correlation_stats(user_id, start=None, end=None):
+    """
+    Combined stats over the user's history, or the days in [start, end).
+
+    Returns (variables, totals) with variables ordered for display. Monthly
+    buckets that fall entirely inside the window are summed as stored and the
+    days of partially covered months are added from their rollups. Users
+    with rollups but no stats yet are rebuilt on first read.
+    """
+    stats_query = CorrelationStats.query.filter_by(user_id=user_id)
+    if not db.session.query(stats_query.exists()).scalar() \
+            and db.session.query(DailyRollup.query.filter_by(user_id=user_id).exists()).scalar():
+        rebuild_correlation_stats(user_id)
+        db.session.commit()
+
+    start, end = _as_date(start), _as_date(end)
+    # Months whose period_start is in [first_full, last_full) lie wholly inside the window
+    first_full = None if start is None else (start if start.day == 1 else _next_period(period_start(start)))
+    last_full = None if end is None else period_start(end)
+
+    if first_full is not None and last_full is not None and first_full >= last_full:
+        rows, partial = [], [(start, end)]
+    else:
+        if first_full is not None:
+            stats_query = stats_query.filter(CorrelationStats.period_start >= first_full)
+        if last_full is not None:
+            stats_query = stats_query.filter(CorrelationStats.period_start < last_full)
+        rows = stats_query.all()
+        partial = [(lo, hi) for lo, hi in [(start, first_full), (last_full, end)] if lo is not None and lo < hi]
+
+    if partial:
+        edge = _rollup_stats(user_id, partial)
+        if edge is not None:
+            rows.append(edge)
+
+    variables, totals = combine_stats(rows)
+    # Drop variables that no longer have any observation (e.g. after deletes)
+    keep = [i for i in range(len(variables)) if totals['counts'][i, i] > 0]
+    variables = [variables[i] for i in keep]
+    totals = {field: totals[field][np.ix_(keep, keep)] for field in STAT_FIELDS}
+    return variables, totals
@@ -0,0 +1,164 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, update, delete, or_
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.insight_cache import InsightCache
+
+# How often a caller waiting on another generation re-checks the cache
+INSIGHT_POLL_SECONDS = 0.5
+
+# Least-recently-used eviction only needs a coarse last access, so a hit
+# writes it back at most this often instead of committing on every read
+INSIGHT_ACCESS_WRITE_INTERVAL = timedelta(minutes=5)
+
+def _seconds(name):
+    return timedelta(seconds=current_app.config[name])
+
+def lookup_insight(user_id, cache_key):
+    """
+    The user's cached insight and how it can be served: 'fresh' when it was
+    generated for cache_key and is within its TTL, 'stale' when it is for an
+    older key or past its TTL but still inside the stale-while-revalidate
+    window. Returns (None, None) on a miss.
+    """
+    now = datetime.utcnow()
+    entry = InsightCache.query.filter_by(user_id=user_id).first()
+    if not entry or entry.insight is None or entry.stale_until <= now:
+        return None, None
+
+    if entry.last_accessed_at is None or now - entry.last_accessed_at >= INSIGHT_ACCESS_WRITE_INTERVAL:
+        entry.last_accessed_at = now
+        db.session.commit()
+    if entry.cache_key == cache_key and now < entry.expires_at:
+        return entry.insight, 'fresh'
+    return entry.insight, 'stale'
+
+def acquire_lease(user_id, owner):
+    """
+    Try to become the user's single in-flight generation. The lease is a
+    conditional UPDATE (or the INSERT of the user's row), so exactly one
+    caller wins; an expired lease from a crashed worker can be taken over.
+    """
+    now = datetime.utcnow()
+    lease_until = now + _seconds('INSIGHT_LEASE_SECONDS')
+    taken = db.session.execute(
+        update(InsightCache)
+        .where(InsightCache.user_id == user_id)
+        .where(or_(InsightCache.lease_owner.is_(None), InsightCache.lease_expires_at < now))
+        .values(lease_owner=owner, lease_expires_at=lease_until)
+    ).rowcount
+    if taken:
+        db.session.commit()
+        return True
+
+    if db.session.execute(select(InsightCache.id).where(InsightCache.user_id == user_id)).first():
+        db.session.rollback()
+        return False
+    try:
+        db.session.add(InsightCache(
+            id=str(uuid.uuid4()), user_id=user_id, last_accessed_at=now,
+            lease_owner=owner, lease_expires_at=lease_until
+        ))
+        db.session.commit()
+        return True
+    except IntegrityError:
+        # Another caller created the row first and holds the lease
+        db.session.rollback()
+        return False
+
+def release_lease(user_id, owner):
+    db.session.execute(
+        update(InsightCache)
+        .where(InsightCache.user_id == user_id, InsightCache.lease_owner == owner)
+        .values(lease_owner=None, lease_expires_at=None)
+    )
+    db.session.commit()
+
+def store_insight(user_id, cache_key, insight, owner=None):
+    """Cache a generated insight for cache_key, releasing owner's lease, then evict expired rows"""
+    now = datetime.utcnow()
+    values = dict(
+        cache_key=cache_key,
+        insight=insight,
+        generated_at=now,
+        expires_at=now + _seconds('INSIGHT_TTL_SECONDS'),
+        stale_until=now + _seconds('INSIGHT_STALE_SECONDS'),
+        last_accessed_at=now,
+    )
+    stored = db.session.execute(
+        update(InsightCache)
+        .where(InsightCache.user_id == user_id, InsightCache.lease_owner == owner)
+        .values(**values, lease_owner=None, lease_expires_at=None)
+    ).rowcount
+    if not stored:
+        # Our lease expired and was taken over; store the text but leave the new lease alone
+        stored = db.session.execute(
+            update(InsightCache).where(InsightCache.user_id == user_id).values(**values)
+        ).rowcount
+    if not stored:
+        db.session.add(InsightCache(id=str(uuid.uuid4()), user_id=user_id, **values))
+    db.session.commit()
+    evict_insights()
+
+def evict_insights():
+    """
+    Drop insights past their stale window, then the least recently read
+    beyond INSIGHT_CACHE_MAX_ENTRIES. Rows with a live lease are kept.
+    """
+    now = datetime.utcnow()
+    db.session.execute(
+        delete(InsightCache)
+        .where(InsightCache.stale_until < now)
+        .where(or_(InsightCache.lease_owner.is_(None), InsightCache.lease_expires_at < now))
+    )
+    overflow = select(InsightCache.id).order_by(InsightCache.last_accessed_at.desc()) \
+        .offset(current_app.config['INSIGHT_CACHE_MAX_ENTRIES'])
+    overflow_ids = [row[0] for row in db.session.execute(overflow)]
+    if overflow_ids:
+        db.session.execute(
+            delete(InsightCache)
+            .where(InsightCache.id.in_(overflow_ids))
+            .where(or_(InsightCache.lease_owner.is_(None), InsightCache.lease_expires_at < now))
+        )
+    db.session.commit()
+
+def get_or_generate_insight(user_id, cache_key, generate, wait_seconds=None):
+    """
+    Return the fresh insight for cache_key, generating it at most once
+    across concurrent callers.
+
+    The caller that takes the user's lease runs generate() and caches its
+    result. If generate() raises, nothing is cached and the lease is
+    released, so a failure is retried rather than served. Everyone else polls the cache until that result lands, for up to
+    wait_seconds (the lease duration by default), and gets None if it does
+    not.
+    """
+    if wait_seconds is None:
+        wait_seconds = current_app.config['INSIGHT_LEASE_SECONDS']
+    deadline = time.monotonic() + wait_seconds
+    owner = str(uuid.uuid4())
+
+    while True:
+        insight, state = lookup_insight(user_id, cache_key)
+        if state == 'fresh':
+            return insight
+        if acquire_lease(user_id, owner):
+            # The previous holder may have finished between the lookup and the lease
+            insight, state = lookup_insight(user_id, cache_key)
+            if state == 'fresh':
+                release_lease(user_id, owner)
+                return insight
+            try:
+                insight = generate()
+            except Exception:
+                db.session.rollback()
+                release_lease(user_id, owner)
+                raise
+            store_insight(user_id, cache_key, insight, owner)
+            return insight
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(INSIGHT_POLL_SECONDS)
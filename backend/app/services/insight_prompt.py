@@ -0,0 +1,131 @@
+import math
+from collections import Counter
+
+SYSTEM_PROMPT = "You are a specialized health pattern analyst. Your goal is to provide 3 concise, actionable observations based on health logs. Use clear Markdown bullet points. Do not provide medical advice. Be professional, empathetic, and objective."
+
+INSTRUCTIONS = "Based on this data, provide 3 concise insights or patterns as a bulleted list. Use **bolding** for key factors. Focus on possible triggers and lifestyle connections."
+
+# Rough characters per token for English text. Deliberately low, so the
+# estimate errs on the long side for the model's real tokenizer
+CHARS_PER_TOKEN = 3
+
+# Tokens the chat template adds around each message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def estimate_prompt_tokens(messages):
+    """Estimated prompt size of a list of chat messages"""
+    return sum(estimate_tokens(m['content']) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+def _span(logs):
+    return f"{logs[0]['timestamp']:%Y-%m-%d} to {logs[-1]['timestamp']:%Y-%m-%d}"
+
+def _grouped(logs, name):
+    """Logs grouped by name, most frequent first, ties by name"""
+    groups = {}
+    for log in logs:
+        groups.setdefault(str(log[name]), []).append(log)
+    return sorted(groups.items(), key=lambda item: (-len(item[1]), item[0]))
+
+def _mean(logs, column):
+    return sum(log[column] for log in logs) / len(logs)
+
+def _symptom_lines(logs):
+    return [
+        f"- {name} ×{len(group)} (avg severity {_mean(group, 'severity'):.1f}, "
+        f"max {max(log['severity'] for log in group)}, last {group[-1]['timestamp']:%Y-%m-%d})"
+        for name, group in _grouped(logs, 'symptomName')
+    ]
+
+def _food_lines(logs):
+    lines = []
+    for name, group in _grouped(logs, 'foodName'):
+        meals = Counter(str(log['mealType']) for log in group)
+        # Most common meal, ties by name
+        meal = min(meals, key=lambda m: (-meals[m], m))
+        meal = f"mostly {meal}" if len(meals) > 1 else meal
+        lines.append(f"- {name} ×{len(group)} ({meal}, last {group[-1]['timestamp']:%Y-%m-%d})")
+    return lines
+
+def _activity_lines(logs):
+    return [
+        f"- {name} ×{len(group)} (avg {_mean(group, 'durationMinutes'):.0f} mins, "
+        f"intensity {_mean(group, 'intensity'):.1f}, last {group[-1]['timestamp']:%Y-%m-%d})"
+        for name, group in _grouped(logs, 'activityType')
+    ]
+
+def _mood_lines(logs):
+    ratings = [log['moodRating'] for log in logs]
+    return [
+        f"- {len(ratings)} ratings, avg {sum(ratings) / len(ratings):.1f} (range {min(ratings)}-{max(ratings)}), "
+        f"latest {ratings[-1]} on {logs[-1]['timestamp']:%Y-%m-%d}"
+    ]
+
+# Summary sections: log frame key, heading and compressed lines, most
+# valuable first. Sections lower down are the first to go when over budget
+SUMMARY_SECTIONS = [
+    ('symptoms', "Symptoms", _symptom_lines),
+    ('foods', "Food", _food_lines),
+    ('moods', "Mood", _mood_lines),
+    ('activities', "Activity", _activity_lines),
+]
+
+def rank_correlations(correlations):
+    """
+    Order analysis results for the prompt: most significant first, then by
+    strength (|score|, lift, then count), with the description as a final
+    tie-break so equal results always come out in the same order.
+    """
+    return sorted(correlations, key=lambda r: (
+        r.get('pValue') if r.get('pValue') is not None else 1.0,
+        -abs(r.get('score') or 0),
+        -(r.get('lift') or 0),
+        -(r.get('count') or 0),
+        r['description'],
+    ))
+
+def build_insight_messages(summary_logs, correlations, budget_tokens):
+    """
+    Chat messages asking for insights on the user's data, estimated at no
+    more than budget_tokens.
+
+    summary_logs maps SUMMARY_SECTIONS keys to the user's recent logs,
+    oldest first. Repeated logs are compressed to one line per item
+    ("- Nausea ×7 (...)"). The system prompt and instructions are always
+    sent; the rest is filled in priority order, ranked correlations first
+    and then each summary section, a line at a time. The first line that
+    does not fit ends the prompt, so lower-value sections are dropped before
+    higher ones are cut. The same inputs always give the same messages.
+    """
+    system = {'role': 'system', 'content': SYSTEM_PROMPT}
+    used = estimate_prompt_tokens([system]) + MESSAGE_OVERHEAD_TOKENS + estimate_tokens(INSTRUCTIONS)
+    if used > budget_tokens:
+        raise ValueError(f"Insight prompt budget of {budget_tokens} tokens is below the fixed prompt ({used} tokens)")
+
+    blocks = [('STATISTICAL CORRELATIONS:', [f"- {r['description']}" for r in rank_correlations(correlations)])]
+    for key, heading, lines in SUMMARY_SECTIONS:
+        logs = summary_logs.get(key)
+        if logs:
+            blocks.append((f"{heading}, {_span(logs)}:", lines(logs)))
+
+    parts = []
+    full = False
+    for heading, lines in blocks:
+        # A heading is only sent along with its first line
+        pending = [heading]
+        for line in lines:
+            # Each part is followed by a newline, or the blank line before the instructions
+            cost = sum(estimate_tokens(part + '\n\n') for part in [*pending, line])
+            if used + cost > budget_tokens:
+                full = True
+                break
+            parts.extend([*pending, line])
+            pending = []
+            used += cost
+        if full:
+            break
+
+    content = "\n".join(parts) + "\n\n" + INSTRUCTIONS if parts else INSTRUCTIONS
+    return [system, {'role': 'user', 'content': content}]
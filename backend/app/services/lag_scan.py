@@ -0,0 +1,42 @@
+import numpy as np
+from app.services.correlation_stats import pearson_from_sums
+
+def shifted_factors(factors, max_lag):
+    """
+    Stack of the T x M factors shifted by 0..max_lag days, as (max_lag + 1) x T x M.
+
+    Slice L holds, for every day t, the factor values of day t - L, with NaN
+    where that day falls before the start of the series.
+    """
+    factors = np.asarray(factors, dtype='float64')
+    days = factors.shape[0]
+    lags = np.arange(max_lag + 1)
+    padded = np.vstack([np.full((max_lag, factors.shape[1]), np.nan), factors])
+    return padded[max_lag + np.arange(days)[None, :] - lags[:, None]]
+
+def lagged_correlations(target, factors, max_lag):
+    """
+    Pearson correlation of a daily target with each factor at lags 0..max_lag.
+
+    `target` is a length-T array and `factors` a T x M array over consecutive
+    calendar days, with NaN for days without a value. At lag L the target on
+    day t is paired with each factor on day t - L. Every lag and factor is
+    evaluated at once from masked sums over a (max_lag + 1) x T x M stack of
+    shifted views, so adding lags does not add passes over the data.
+
+    Returns (corr, counts), both (max_lag + 1) x M, where counts is the number
+    of paired days. Pairs with fewer than two days or no variance are NaN.
+    """
+    target = np.asarray(target, dtype='float64')
+    factors = np.asarray(factors, dtype='float64').reshape(len(target), -1)
+    shifted = shifted_factors(factors, max_lag)
+
+    y = np.broadcast_to(target[None, :, None], shifted.shape)
+    present = ~np.isnan(shifted) & ~np.isnan(y)
+    x = np.where(present, shifted, 0.0)
+    y = np.where(present, y, 0.0)
+
+    n = present.sum(axis=1)
+    sx, sy = x.sum(axis=1), y.sum(axis=1)
+    sxx, syy = (x ** 2).sum(axis=1), (y ** 2).sum(axis=1)
+    return pearson_from_sums(n, sx, sy, sxx, syy, (x * y).sum(axis=1)), n
@@ -0,0 +1,40 @@
+from app import db
+from app.models.user import User
+from app.services.rollups import ROLLUP_LOG_TYPES, refresh_daily_rollups
+from app.services.cooccurrence import refresh_cooccurrence
+from app.services.log_loader import naive_utc
+from app.services.log_snapshots import invalidate_snapshots
+from app.services.analysis_jobs import schedule_pattern_analysis
+
+def commit_log_change(user_id, log_type, *timestamps, change='create'):
+    """
+    Commit a log insert, edit or delete along with the per-user data derived from it.
+
+    Use in place of db.session.commit() once the change is in the session.
+    log_type is the quick-log style type ('symptom', 'food', 'medication', ...)
+    and timestamps are those of every log the change touched; change is
+    'create', 'update' or 'delete'. Timestamps are taken as UTC, as they are
+    stored, so rollup days and snapshot watermarks agree. The user's data version is bumped so
+    cached analysis results are invalidated; after the commit, log snapshots
+    the change can't be appended to are dropped and a debounced pattern
+    analysis is queued for the user.
+    """
+    timestamps = [naive_utc(ts) for ts in timestamps if ts is not None]
+    User.query.filter_by(id=user_id).update(
+        {User.data_version: User.data_version + 1}, synchronize_session=False
+    )
+    if log_type in ROLLUP_LOG_TYPES:
+        refresh_daily_rollups(user_id, [ts.date() for ts in timestamps])
+    if log_type in ('food', 'symptom'):
+        refresh_cooccurrence(user_id, log_type, timestamps)
+    db.session.commit()
+    # Only after the commit, so a rebuilt snapshot can't miss the change
+    invalidate_snapshots(user_id, log_type, timestamps, change)
+
+    # The write has already succeeded. If the analysis can't be queued the
+    # record is marked failed, and the next /patterns read queues it again
+    try:
+        schedule_pattern_analysis(user_id)
+    except Exception as e:
+        print(f"Error scheduling pattern analysis: {e}")
+        db.session.rollback()
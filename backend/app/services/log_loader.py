@@ -0,0 +1,96 @@
+from datetime import timezone
+import pandas as pd
+from sqlalchemy import select
+from app import db
+from app.models.symptom import SymptomLog
+from app.models.food import FoodLog
+from app.models.activity import ActivityLog
+from app.models.mood import MoodLog
+from app.models.environment import EnvironmentLog
+from app.models.medication import MedicationLog
+
+# Columns each analysis DataFrame is built from: output name -> (model column, dtype).
+# Names are categorical, 1-10 scales are int8 and environment readings float32,
+# which keeps a worker's analysis frames a fraction of the object/64-bit size.
+LOG_COLUMNS = {
+    'symptoms': (SymptomLog, {
+        'severity': (SymptomLog.severity, 'int8'),
+        'timestamp': (SymptomLog.timestamp, 'datetime64[ns]'),
+        'symptomName': (SymptomLog.symptom_name, 'category'),
+    }),
+    'foods': (FoodLog, {
+        'foodName': (FoodLog.food_name, 'category'),
+        'timestamp': (FoodLog.timestamp, 'datetime64[ns]'),
+        'mealType': (FoodLog.meal_type, 'category'),
+    }),
+    'activities': (ActivityLog, {
+        'activityType': (ActivityLog.activity_type, 'category'),
+        'timestamp': (ActivityLog.timestamp, 'datetime64[ns]'),
+        'durationMinutes': (ActivityLog.duration_minutes, 'int32'),
+        'intensity': (ActivityLog.intensity, 'int8'),
+    }),
+    'moods': (MoodLog, {
+        'moodRating': (MoodLog.mood_rating, 'int8'),
+        'timestamp': (MoodLog.timestamp, 'datetime64[ns]'),
+    }),
+    'environment': (EnvironmentLog, {
+        'temperature': (EnvironmentLog.temperature, 'float32'),
+        'humidity': (EnvironmentLog.humidity, 'float32'),
+        'airQualityIndex': (EnvironmentLog.air_quality_index, 'float32'),
+        'timestamp': (EnvironmentLog.timestamp, 'datetime64[ns]'),
+    }),
+    'medication_logs': (MedicationLog, {
+        'timestamp': (MedicationLog.timestamp, 'datetime64[ns]'),
+        'taken': (MedicationLog.taken, 'bool'),
+        'medication_id': (MedicationLog.medication_id, 'category'),
+    }),
+}
+
+def naive_utc(ts):
+    """A timestamp as naive UTC, the way log timestamps are stored and compared"""
+    return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+
+def load_log_frame(model, columns, user_id, start=None, end=None):
+    """
+    Load a single log table into a DataFrame without building ORM objects.
+
+    Only the projected columns are selected through SQLAlchemy Core and the
+    rows go straight into typed pandas columns, ordered by timestamp. When
+    given, start is inclusive and end is exclusive.
+    """
+    stmt = (
+        select(*[column for column, _ in columns.values()])
+        .where(model.user_id == user_id)
+        .order_by(model.timestamp)
+    )
+    if start is not None:
+        stmt = stmt.where(model.timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(model.timestamp < end)
+    rows = db.session.execute(stmt).all()
+
+    names = list(columns.keys())
+    values = list(zip(*rows)) if rows else [[] for _ in names]
+    return pd.DataFrame({
+        name: pd.Series(col, dtype=dtype)
+        for name, col, (_, dtype) in zip(names, values, columns.values())
+    })
+
+def load_recent_logs(model, columns, user_id, limit, start=None, end=None):
+    """
+    The user's latest `limit` logs in [start, end) as dicts, oldest first.
+
+    Runs as ORDER BY timestamp DESC LIMIT on the (user_id, timestamp) index,
+    so the cost depends on limit rather than on the length of the history.
+    """
+    stmt = (
+        select(*[column.label(name) for name, (column, _) in columns.items()])
+        .where(model.user_id == user_id)
+        .order_by(model.timestamp.desc())
+        .limit(limit)
+    )
+    if start is not None:
+        stmt = stmt.where(model.timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(model.timestamp < end)
+    return [dict(row._mapping) for row in reversed(db.session.execute(stmt).all())]
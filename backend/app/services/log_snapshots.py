@@ -0,0 +1,176 @@
+import os
+import uuid
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from flask import current_app
+from app.services.log_loader import LOG_COLUMNS, load_log_frame, naive_utc
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # optional; without it analysis reads straight from the database
+    pa = None
+
+# Log types passed to commit_log_change -> the LOG_COLUMNS frame they write to
+LOG_TYPE_SNAPSHOTS = {
+    'symptom': 'symptoms',
+    'food': 'foods',
+    'activity': 'activities',
+    'mood': 'moods',
+    'environment': 'environment',
+    'medication': 'medication_logs',
+}
+
+WATERMARK_KEY = b'watermark'
+# Start of the history a snapshot holds; empty when it holds all of it
+COVERS_FROM_KEY = b'covers_from'
+
+def snapshot_dir():
+    """The configured snapshot directory, or None when snapshots are off"""
+    if pa is None:
+        return None
+    return current_app.config.get('ANALYSIS_SNAPSHOT_DIR')
+
+def _paths(root, user_id, key):
+    user_dir = os.path.join(root, user_id)
+    return user_dir, os.path.join(user_dir, f'{key}.arrow'), os.path.join(user_dir, f'{key}.epoch')
+
+def _read_epoch(path):
+    try:
+        with open(path) as f:
+            return f.read()
+    except FileNotFoundError:
+        return ''
+
+def _read_snapshot(path):
+    """
+    Memory-map a snapshot file, returning (table, watermark, covers_from),
+    or (None, None, None) without a usable one
+    """
+    try:
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None, None, None
+    metadata = table.schema.metadata or {}
+    watermark = metadata.get(WATERMARK_KEY)
+    if watermark is None:
+        return None, None, None
+    covers_from = metadata.get(COVERS_FROM_KEY)
+    covers_from = datetime.fromisoformat(covers_from.decode()) if covers_from else None
+    return table, pd.Timestamp(watermark.decode()), covers_from
+
+def _write_snapshot(user_dir, path, frame, watermark, covers_from):
+    """Write a frame as an Arrow IPC file, swapped in atomically"""
+    os.makedirs(user_dir, exist_ok=True)
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        WATERMARK_KEY: watermark.isoformat().encode(),
+        COVERS_FROM_KEY: covers_from.isoformat().encode() if covers_from else b'',
+    })
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    with pa.OSFile(tmp, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+def _remove_snapshot(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _window(table, start, end):
+    """Slice a timestamp-sorted table to [start, end) without reading the rest"""
+    stamps = table.column('timestamp').to_numpy()
+    lo = 0 if start is None else np.searchsorted(stamps, np.datetime64(start), side='left')
+    hi = len(stamps) if end is None else np.searchsorted(stamps, np.datetime64(end), side='left')
+    return table.slice(lo, max(hi - lo, 0))
+
+def load_snapshot_frame(key, user_id, start=None, end=None):
+    """
+    Load one LOG_COLUMNS frame for [start, end) through the user's snapshot.
+
+    The snapshot holds the user's table from some start onwards (or all of
+    it) as an Arrow IPC file, ordered by timestamp, with the latest timestamp
+    it has seen as its watermark. On read only rows at or after the watermark
+    are queried from the database. When they are just the snapshot's rows at
+    the watermark it is served as is; otherwise they replace those rows and
+    the file is rewritten (or removed, if no rows are left).
+
+    A window the snapshot doesn't cover rebuilds it from the window's start,
+    so the cold read stays as narrow as the window. Windows that ended in the
+    past are read from the database without one. Without a snapshot directory
+    configured (or pyarrow installed) this is load_log_frame.
+    """
+    model, columns = LOG_COLUMNS[key]
+    root = snapshot_dir()
+    if not root:
+        return load_log_frame(model, columns, user_id, start, end)
+
+    user_dir, path, epoch_path = _paths(root, user_id, key)
+    epoch = _read_epoch(epoch_path)
+    table, watermark, covers_from = _read_snapshot(path)
+
+    covered = table is not None and (covers_from is None or (start is not None and start >= covers_from))
+    if not covered:
+        if end is not None and end <= datetime.utcnow():
+            return load_log_frame(model, columns, user_id, start, end)
+        covers_from = start
+        frame = load_log_frame(model, columns, user_id, start=covers_from)
+    else:
+        # Rows at the watermark itself are re-read, so logs sharing the latest
+        # timestamp are never lost or duplicated
+        delta = load_log_frame(model, columns, user_id, start=watermark.to_pydatetime())
+        # Edits and deletes drop the snapshot, so the same rows at the
+        # watermark mean nothing was added; fewer mean some were removed
+        if len(delta) == _window(table, watermark, None).num_rows \
+                and (delta['timestamp'] == watermark).all():
+            return _window(table, start, end).to_pandas()
+        kept = _window(table, None, watermark).to_pandas()
+        frame = pd.concat([kept, delta], ignore_index=True)
+        for name, (_, dtype) in columns.items():
+            frame[name] = frame[name].astype(dtype)
+
+    # An invalidation since this read began means the rows may already be stale
+    if _read_epoch(epoch_path) == epoch:
+        if frame.empty:
+            _remove_snapshot(path)
+        else:
+            _write_snapshot(user_dir, path, frame, frame['timestamp'].iloc[-1], covers_from)
+    if not frame.empty:
+        if start is not None:
+            frame = frame[frame['timestamp'] >= start]
+        if end is not None:
+            frame = frame[frame['timestamp'] < end]
+        frame = frame.reset_index(drop=True)
+    return frame
+
+def invalidate_snapshots(user_id, log_type, timestamps, change='create'):
+    """
+    Drop a user's snapshot after a committed write it cannot pick up by itself.
+
+    New logs at or after the watermark are appended on the next read, but
+    any edit or delete, or a back-dated new log, would be missed, so the
+    snapshot is removed and rebuilt on the next read. The epoch file
+    is bumped first so a read already in progress does not write the stale
+    rows back.
+    """
+    key = LOG_TYPE_SNAPSHOTS.get(log_type)
+    root = snapshot_dir()
+    if not root or not key:
+        return
+
+    user_dir, path, epoch_path = _paths(root, user_id, key)
+    if change == 'create':
+        _, watermark, _ = _read_snapshot(path)
+        if watermark is None:
+            return
+        if all(ts is None or naive_utc(ts) >= watermark for ts in timestamps):
+            return
+
+    os.makedirs(user_dir, exist_ok=True)
+    with open(epoch_path, 'w') as f:
+        f.write(uuid.uuid4().hex)
+    _remove_snapshot(path)
@@ -0,0 +1,46 @@
+import json
+import logging
+import os
+import threading
+import time
+from flask import current_app
+from app.utils.http_client import integration_metrics
+from app.services.stage_timing import stage_histograms
+
+logger = logging.getLogger('patternmd.metrics')
+
+_last_logged = None
+_lock = threading.Lock()
+
+def process_metrics():
+    """Outbound integration metrics and stage duration histograms of this process"""
+    return {
+        'pid': os.getpid(),
+        'integrations': integration_metrics(),
+        'stages': stage_histograms.snapshot(),
+    }
+
+def log_metrics_if_due():
+    """
+    Log process_metrics() as a JSON line if METRICS_LOG_INTERVAL_SECONDS have
+    passed since this process last did. Called after each background task,
+    since worker processes have no route to read their metrics from.
+    """
+    global _last_logged
+    interval = current_app.config.get('METRICS_LOG_INTERVAL_SECONDS')
+    if not interval:
+        return
+    now = time.monotonic()
+    with _lock:
+        if _last_logged is not None and now - _last_logged < interval:
+            return
+        _last_logged = now
+    logger.info(json.dumps({'event': 'process_metrics', **process_metrics()}))
+
+def init_metrics(app):
+    """Send periodic metrics lines to stderr when METRICS_LOG_INTERVAL_SECONDS is set"""
+    if app.config.get('METRICS_LOG_INTERVAL_SECONDS') and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
@@ -1,79 +1,229 @@
+import hashlib
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from app.models.symptom import SymptomLog
-from app.models.food import FoodLog
-from app.models.activity import ActivityLog
-from app.models.mood import MoodLog
-from app.models.environment import EnvironmentLog
-from app.models.medication import MedicationLog, Medication
-
-def get_user_data_df(user_id):
-    """Fetch all user logs and convert to DataFrames"""
-    symptoms = SymptomLog.query.filter_by(user_id=user_id).all()
-    foods = FoodLog.query.filter_by(user_id=user_id).all()
-    activities = ActivityLog.query.filter_by(user_id=user_id).all()
-    moods = MoodLog.query.filter_by(user_id=user_id).all()
-    env = EnvironmentLog.query.filter_by(user_id=user_id).all()
-    med_logs = MedicationLog.query.filter_by(user_id=user_id).all()
-
-    # Create DataFrames directly from objects to preserve types (especially timestamps)
-    s_df = pd.DataFrame([{
-        'severity': s.severity, 
-        'timestamp': s.timestamp, 
-        'symptomName': s.symptom_name
-    } for s in symptoms])
-    
-    f_df = pd.DataFrame([{
-        'foodName': f.food_name, 
-        'timestamp': f.timestamp, 
-        'mealType': f.meal_type
-    } for f in foods])
-    
-    a_df = pd.DataFrame([{
-        'activityType': a.activity_type, 
-        'timestamp': a.timestamp, 
-        'durationMinutes': a.duration_minutes, 
-        'intensity': a.intensity
-    } for a in activities])
-    
-    m_df = pd.DataFrame([{
-        'moodRating': m.mood_rating, 
-        'timestamp': m.timestamp
-    } for m in moods])
-    
-    e_df = pd.DataFrame([{
-        'temperature': e.temperature, 
-        'humidity': e.humidity, 
-        'airQualityIndex': e.air_quality_index, 
-        'timestamp': e.timestamp
-    } for e in env])
-    
-    ml_df = pd.DataFrame([{
-        'timestamp': ml.timestamp, 
-        'taken': ml.taken,
-        'medication_id': ml.medication_id
-    } for ml in med_logs])
-
-    # Ensure timestamp column exists even in empty DFs
-    for df in [s_df, f_df, a_df, m_df, e_df, ml_df]:
-        if df.empty:
-            df['timestamp'] = pd.Series(dtype='datetime64[ns]')
-        else:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-
-    return {
-        'symptoms': s_df,
-        'foods': f_df,
-        'activities': a_df,
-        'moods': m_df,
-        'environment': e_df,
-        'medication_logs': ml_df
+from sqlalchemy import select
+from app import db
+from app.models.user import User
+from app.services.log_loader import LOG_COLUMNS, load_recent_logs
+from app.services.log_snapshots import load_snapshot_frame
+from app.services.rollups import load_daily_rollups
+from app.services.correlation_stats import load_correlation_stats, correlation_from_stats
+from app.services.window_join import window_join
+from app.services.lag_scan import shifted_factors, lagged_correlations
+from app.services.significance import permutation_correlations, permutation_p_values, fisher_interval
+from app.services.combo_scan import binarize_factors, severity_combos
+from app.services.stage_timing import stage
+
+# How far back before a symptom a logged food counts as a possible trigger
+TRIGGER_WINDOW = timedelta(hours=12)
+
+# Days analyzed when no explicit start date is given, so the cost of an
+# analysis follows the window rather than the age of the account
+DEFAULT_LOOKBACK_DAYS = 180
+
+# Longest delay, in days, scanned between an environment reading and symptoms
+MAX_LAG_DAYS = 7
+
+# Permutation test settings: shuffles per test and the p-value a correlation must beat
+N_PERMUTATIONS = 2000
+SIGNIFICANCE_ALPHA = 0.05
+
+# Most recent logs read per AI summary section; the prompt compresses them to one line per item
+SUMMARY_ROWS = {'symptoms': 50, 'foods': 50, 'activities': 30, 'moods': 30}
+
+# Environment rollup columns scanned for same-day and delayed effects, by display name
+ENVIRONMENT_FACTORS = {
+    'temperature': 'temperature',
+    'humidity': 'humidity',
+    'pressure': 'pressure',
+    'air_quality_index': 'airQualityIndex',
+    'pm2_5': 'pm2_5',
+    'pm10': 'pm10',
+    'uv_index': 'uvIndex',
+    'clouds': 'clouds',
+}
+
+# Daily rollup columns binarized into high/low days for the combo scan, by display name
+COMBO_FACTORS = {
+    'mood_mean': 'mood',
+    'activity_intensity': 'activity intensity',
+    **{col: col.replace('_', ' ') for col in ENVIRONMENT_FACTORS},
+    'scheduled_adherence_ratio': 'medication adherence',
+}
+
+# Combo scan settings: most frequent foods added as flags, days a pair must
+# share, severity lift over the baseline it must reach, and pairs reported
+COMBO_MAX_FOODS = 10
+COMBO_MIN_DAYS = 3
+COMBO_MIN_LIFT = 1.0
+COMBO_MAX_RESULTS = 5
+
+def analysis_window(start_date=None, end_date=None, lookback_days=None):
+    """
+    Resolve analysis date parameters into a [start, end) datetime range.
+
+    Dates are ISO strings as accepted by the log list endpoints and end_date
+    is inclusive of its whole day. Without start_date the window starts
+    lookback_days (default DEFAULT_LOOKBACK_DAYS) before the end, which
+    defaults to the end of today. Raises ValueError on malformed input.
+    """
+    end = datetime.fromisoformat(end_date) if end_date else datetime.utcnow()
+    end = datetime.combine(end.date() + timedelta(days=1), datetime.min.time())
+
+    if start_date:
+        start = datetime.combine(datetime.fromisoformat(start_date).date(), datetime.min.time())
+    else:
+        lookback = int(lookback_days) if lookback_days else DEFAULT_LOOKBACK_DAYS
+        if lookback < 1:
+            raise ValueError('lookbackDays must be at least 1')
+        start = end - timedelta(days=lookback)
+
+    if start >= end:
+        raise ValueError('startDate must not be after endDate')
+    return start, end
+
+def get_data_version(user_id):
+    """The user's data version, bumped by commit_log_change on every log write"""
+    return db.session.execute(select(User.data_version).where(User.id == user_id)).scalar() or 0
+
+def analysis_seed(user_id, data_version):
+    """Permutation seed for one version of a user's data, stable across processes and runs"""
+    digest = hashlib.sha256(f'{user_id}:{data_version}'.encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+def get_user_data_df(user_id, start=None, end=None):
+    """Fetch user logs, optionally within [start, end), and convert to DataFrames"""
+    return {key: load_snapshot_frame(key, user_id, start, end) for key in LOG_COLUMNS}
+
+# Raw log frames the analyzers and the AI summary still read row by row
+RAW_LOG_KEYS = ['symptoms', 'foods', 'activities', 'moods']
+
+def _daily_frame(rollups, columns):
+    """Select rollup columns as a daily frame, renamed to the raw log column names"""
+    return rollups[['timestamp', *columns]].rename(columns=columns)
+
+def load_user_data(user_id, start=None, end=None):
+    """
+    Build the request-scoped data bundle shared by every analyzer, optionally
+    limited to [start, end).
+
+    Daily values come from the user's rollups rather than resampling raw logs;
+    only the raw tables that are read row by row (symptoms and foods for
+    trigger detection, plus activity and mood for the AI summary) are loaded,
+    through the on-disk log snapshots when those are enabled.
+    """
+    dfs = {}
+    with stage('load_logs') as timer:
+        for key in RAW_LOG_KEYS:
+            dfs[key] = load_snapshot_frame(key, user_id, start, end)
+        timer.count(sum(len(dfs[key]) for key in RAW_LOG_KEYS))
+
+    with stage('load_rollups') as timer:
+        rollups = load_daily_rollups(user_id, start, end)
+        timer.count(len(rollups))
+    dfs['rollups'] = rollups
+    dfs['daily'] = {
+        'symptoms': _daily_frame(rollups, {'symptom_mean': 'severity'}),
+        'moods': _daily_frame(rollups, {'mood_mean': 'moodRating'}),
+        'activities': _daily_frame(rollups, {'activity_intensity': 'intensity'}),
+        'environment': _daily_frame(rollups, ENVIRONMENT_FACTORS),
+        'scheduled_adherence': _daily_frame(rollups, {'scheduled_adherence_ratio': 'taken'}),
     }
 
-def analyze_correlations(user_id):
-    """Find correlations between symptoms and other factors"""
-    dfs = get_user_data_df(user_id)
+    return dfs
+
+def _significance(r, p_value, n):
+    """p-value and confidence interval fields attached to a correlation result"""
+    return {'pValue': round(float(p_value), 4), 'confidenceInterval': fisher_interval(r, n)}
+
+def _pair_significance(x, y, n_permutations, seed):
+    """Permutation p-value of the correlation between two complete daily series"""
+    observed, null = permutation_correlations(np.asarray(x, dtype='float64'), np.asarray(y, dtype='float64')[:, None],
+                                              n_permutations, seed)
+    return float(permutation_p_values(observed, null)[0])
+
+def _strongest_lags(s_daily, f_daily, columns, max_lag, n_permutations, seed, min_days=3, threshold=0.3):
+    """
+    Correlate daily severity with each factor column at lags 0..max_lag.
+
+    Both frames are aligned on a continuous calendar so a lag of L pairs a
+    symptom day with the factor value L calendar days earlier. Yields
+    (column, lag, corr, p_value, days) for factors whose strongest lag, among
+    those with at least min_days paired days, clears the threshold. The
+    p-value compares that strongest |r| with the strongest |r| over all
+    lags of each shuffle, so picking the best lag is accounted for.
+    """
+    if s_daily.empty or f_daily.empty:
+        return
+
+    days = pd.date_range(min(s_daily['timestamp'].min(), f_daily['timestamp'].min()),
+                         max(s_daily['timestamp'].max(), f_daily['timestamp'].max()), freq='D')
+    target = s_daily.set_index('timestamp')['severity'].reindex(days).to_numpy()
+    factors = f_daily.set_index('timestamp')[columns].reindex(days).to_numpy(dtype='float64')
+
+    corr, counts = lagged_correlations(target, factors, max_lag)
+    corr[counts < min_days] = np.nan
+    if np.isnan(corr).all():
+        return
+
+    # Every (lag, factor) column is tested against the same shuffles in one pass
+    lags, n_cols = corr.shape
+    stack = shifted_factors(factors, max_lag).transpose(1, 0, 2).reshape(len(days), lags * n_cols)
+    _, null = permutation_correlations(target, stack, n_permutations, seed)
+    null = np.nan_to_num(np.abs(null.reshape(n_permutations, lags, n_cols)))
+    null[:, counts < min_days] = 0.0
+    null_best = null.max(axis=1)
+
+    for m, col in enumerate(columns):
+        if np.isnan(corr[:, m]).all():
+            continue
+        lag = int(np.nanargmax(np.abs(corr[:, m])))
+        r = float(corr[lag, m])
+        if abs(r) > threshold:
+            p_value = float(permutation_p_values(np.array([r]), null_best[:, m:m + 1])[0])
+            yield col, lag, r, p_value, int(counts[lag, m])
+
+def _combo_flags(dfs):
+    """
+    Boolean day x factor flags for the combo scan over the days with symptoms:
+    high and low days of each COMBO_FACTORS column, plus the days each of the
+    most frequent foods was eaten. Returns (labels, flags, severity).
+    """
+    rollups = dfs['rollups']
+    days = rollups[rollups['symptom_mean'].notna()]
+    columns = [col for col in COMBO_FACTORS if days[col].notna().any()]
+
+    flags = binarize_factors(days[columns].to_numpy(dtype='float64'))
+    labels = [f"high {COMBO_FACTORS[col]}" for col in columns] + [f"low {COMBO_FACTORS[col]}" for col in columns]
+
+    foods = dfs['foods']
+    if not foods.empty:
+        # Day x food indicator filled by index, foods in name order so ties rank alphabetically
+        names, food_codes = np.unique(foods['foodName'].astype(str).to_numpy(), return_inverse=True)
+        day_codes = pd.Index(days['timestamp']).get_indexer(foods['timestamp'].dt.normalize())
+        on_day = day_codes >= 0
+        eaten = np.zeros((len(days), len(names)), dtype=bool)
+        eaten[day_codes[on_day], food_codes[on_day]] = True
+        top = np.argsort(-eaten.sum(axis=0), kind='stable')[:COMBO_MAX_FOODS]
+        flags = np.hstack([flags, eaten[:, top]])
+        labels += [f"'{names[k]}'" for k in top]
+
+    return labels, flags, days['symptom_mean'].to_numpy(dtype='float64')
+
+def analyze_correlations(user_id, data=None, trigger_window=TRIGGER_WINDOW, max_lag=MAX_LAG_DAYS,
+                         n_permutations=N_PERMUTATIONS, alpha=SIGNIFICANCE_ALPHA, seed=None):
+    """
+    Find correlations between symptoms and other factors.
+
+    Each correlation is permutation-tested and only reported when its
+    p-value is below alpha. Without a seed the shuffles are seeded from the
+    user's current data version, so the same data always gets the same
+    p-values.
+    """
+    if seed is None:
+        seed = analysis_seed(user_id, get_data_version(user_id))
+    dfs = data if data is not None else load_user_data(user_id)
     s_df = dfs['symptoms']
     
     if s_df.empty or len(s_df) < 3: # Lowered from 5 to 3
@@ -82,130 +232,119 @@ def analyze_correlations(user_id):
     results = []
     
     # Prep daily symptom average
-    s_daily = s_df.set_index('timestamp').resample('D')['severity'].mean().reset_index()
+    s_daily = dfs['daily']['symptoms']
 
     # 1. Analyze correlations with Mood
-    m_df = dfs['moods']
-    if not m_df.empty:
-        m_daily = m_df.set_index('timestamp').resample('D')['moodRating'].mean().reset_index()
+    with stage('correlations.mood') as timer:
+        m_daily = dfs['daily']['moods']
         merged = pd.merge(s_daily, m_daily, on='timestamp', how='inner').dropna()
-        
+
         if len(merged) >= 3: # Lowered from 5
             corr = merged['severity'].corr(merged['moodRating'])
             if abs(corr) > 0.3: # Lowered from 0.4
-                direction = "lower" if corr < 0 else "higher"
-                results.append({
-                    'type': 'correlation',
-                    'factor': 'Mood',
-                    'score': round(corr, 2),
-                    'description': f"Data suggests your symptoms are often {direction} when your mood rating is higher. (Correlation: {round(corr, 2)})"
-                })
-
-    # 2. Environment Impact & Delayed Effects
-    e_df = dfs['environment']
-    if not e_df.empty:
-        e_daily = e_df.set_index('timestamp').resample('D')[['temperature', 'humidity', 'airQualityIndex']].mean().reset_index()
-        merged = pd.merge(s_daily, e_daily, on='timestamp', how='inner').dropna()
-        
-        if len(merged) >= 3: # Lowered from 5
-            for col in ['humidity', 'airQualityIndex']:
-                corr = merged['severity'].corr(merged[col])
-                if abs(corr) > 0.3: # Lowered from 0.5
-                    impact = "aggravate" if corr > 0 else "improve"
+                p_value = _pair_significance(merged['severity'], merged['moodRating'], n_permutations, seed)
+                if p_value < alpha:
+                    direction = "lower" if corr < 0 else "higher"
                     results.append({
                         'type': 'correlation',
-                        'factor': f'Environment ({col})',
+                        'factor': 'Mood',
                         'score': round(corr, 2),
-                        'description': f"Increases in {col} tend to {impact} your symptoms. Consider monitoring this factor more closely."
-                    })
-        
-        # Check for 24-hour delayed effect (e.g. yesterday's weather affects today's symptoms)
-        e_delayed = e_daily.copy()
-        e_delayed['timestamp'] = e_delayed['timestamp'] + timedelta(days=1)
-        merged_delayed = pd.merge(s_daily, e_delayed, on='timestamp', how='inner').dropna()
-        if len(merged_delayed) >= 3: # Lowered from 5
-             for col in ['temperature', 'humidity']:
-                corr = merged_delayed['severity'].corr(merged_delayed[col])
-                if abs(corr) > 0.3: # Lowered from 0.5
-                    results.append({
-                        'type': 'correlation',
-                        'factor': f'Delayed Environment ({col})',
-                        'score': round(corr, 2),
-                        'description': f"There is a delayed link: {col} levels from the *previous day* correlate with your symptoms today."
+                        **_significance(corr, p_value, len(merged)),
+                        'description': f"Data suggests your symptoms are often {direction} when your mood rating is higher. (Correlation: {round(corr, 2)})"
                     })
+        timer.count(len(merged))
 
-    # 3. Trigger Analysis (Specific items preceding symptoms)
-    f_df = dfs['foods']
-    if not f_df.empty:
-        triggers = {}
-        high_severity = s_df[s_df['severity'] >= 6] # Lowered from 7
-        for _, sym in high_severity.iterrows():
-            window_start = sym['timestamp'] - timedelta(hours=12)
-            recent_foods = f_df[(f_df['timestamp'] >= window_start) & (f_df['timestamp'] <= sym['timestamp'])]
-            for _, food in recent_foods.iterrows():
-                name = food['foodName']
-                triggers[name] = triggers.get(name, 0) + 1
-        
-        # Only show triggers that appear in at least 30% of high-severity episodes
-        total_high = len(high_severity)
-        if total_high >= 2: # Lowered from 3
-            significant_triggers = {k: v for k, v in triggers.items() if (v / total_high) >= 0.3 and v >= 2} # Lowered v from 3
-            for food, count in significant_triggers.items():
+    # 2. Environment Impact & Delayed Effects
+    # Scan every metric at lags 0..max_lag (e.g. yesterday's weather affecting
+    # today's symptoms) and report each one at its strongest lag
+    with stage('correlations.environment') as timer:
+        e_daily = dfs['daily']['environment']
+        env_columns = list(ENVIRONMENT_FACTORS.values())
+        for col, lag, corr, p_value, days in _strongest_lags(s_daily, e_daily, env_columns, max_lag, n_permutations, seed):
+            if p_value >= alpha:
+                continue
+            if lag == 0:
+                impact = "aggravate" if corr > 0 else "improve"
                 results.append({
-                    'type': 'trigger',
-                    'factor': 'Food',
-                    'item': food,
-                    'count': count,
-                    'description': f"'{food}' was logged shortly before {round((count/total_high)*100)}% of your most severe symptom episodes."
+                    'type': 'correlation',
+                    'factor': f'Environment ({col})',
+                    'score': round(corr, 2),
+                    **_significance(corr, p_value, days),
+                    'description': f"Increases in {col} tend to {impact} your symptoms. Consider monitoring this factor more closely."
                 })
+            else:
+                when = "the *previous day*" if lag == 1 else f"*{lag} days earlier*"
+                results.append({
+                    'type': 'correlation',
+                    'factor': f'Delayed Environment ({col})',
+                    'score': round(corr, 2),
+                    'lag': lag,
+                    **_significance(corr, p_value, days),
+                    'description': f"There is a delayed link: {col} levels from {when} correlate with your symptoms today."
+                })
+        timer.count(len(s_daily))
 
-    # 4. Multi-Factor Patterns (e.g. Environment + Activity)
-    a_df = dfs['activities']
-    if not a_df.empty and not e_df.empty:
-        a_daily = a_df.set_index('timestamp').resample('D')['intensity'].mean().reset_index()
-        e_daily = e_df.set_index('timestamp').resample('D')['humidity'].mean().reset_index()
-        merged = pd.merge(s_daily, a_daily, on='timestamp', how='inner')
-        merged = pd.merge(merged, e_daily, on='timestamp', how='inner').dropna()
+    # 3. Trigger Analysis (Specific items preceding symptoms)
+    with stage('correlations.triggers') as timer:
+        f_df = dfs['foods']
+        if not f_df.empty:
+            high_severity = s_df[s_df['severity'] >= 6] # Lowered from 7
+            _, food_idx = window_join(high_severity['timestamp'], f_df['timestamp'], trigger_window)
+            # Count every food logged inside a window, keeping first-seen order for ties
+            triggers = pd.Series(f_df['foodName'].to_numpy()[food_idx]).value_counts(sort=False).to_dict()
         
-        if len(merged) >= 3: # Lowered from 5
-            # Check for a specific "Bad Combo": High humidity + High intensity
-            high_combo = merged[(merged['humidity'] > merged['humidity'].mean()) & (merged['intensity'] > merged['intensity'].mean())]
-            if len(high_combo) >= 1: # Lowered from 2
-                avg_severity_combo = high_combo['severity'].mean()
-                avg_severity_overall = merged['severity'].mean()
-                if avg_severity_combo > avg_severity_overall + 1.0: # Lowered from 1.5
+            # Only show triggers that appear in at least 30% of high-severity episodes
+            total_high = len(high_severity)
+            if total_high >= 2: # Lowered from 3
+                significant_triggers = {k: v for k, v in triggers.items() if (v / total_high) >= 0.3 and v >= 2} # Lowered v from 3
+                for food, count in significant_triggers.items():
                     results.append({
-                        'type': 'pattern',
-                        'factor': 'Environmental/Activity Combo',
-                        'description': "Your symptoms tend to be worse on days with both high humidity and high-intensity activity."
+                        'type': 'trigger',
+                        'factor': 'Food',
+                        'item': food,
+                        'count': count,
+                        'description': f"'{food}' was logged shortly before {round((count/total_high)*100)}% of your most severe symptom episodes."
                     })
+        timer.count(len(s_df) + len(f_df))
+
+    # 4. Multi-Factor Patterns
+    # Every pair of high/low daily factors and frequent foods, scored at once
+    with stage('correlations.combos') as timer:
+        labels, flags, severity = _combo_flags(dfs)
+        *combos, baseline = severity_combos(severity, flags, COMBO_MIN_DAYS, COMBO_MIN_LIFT, n_permutations, seed)
+        significant = [combo for combo in zip(*combos) if combo[4] < alpha]
+        for i, j, days, mean, p_value in significant[:COMBO_MAX_RESULTS]:
+            results.append({
+                'type': 'pattern',
+                'factor': 'Combination',
+                'items': [labels[i], labels[j]],
+                'days': int(days),
+                'lift': round(float(mean - baseline), 2),
+                'pValue': round(float(p_value), 4),
+                'description': f"Your symptoms tend to be worse on days with both {labels[i]} and {labels[j]} "
+                               f"(average severity {mean:.1f} vs {baseline:.1f} overall, over {int(days)} days)."
+            })
+        timer.count(flags.size)
 
     # 5. Medication Adherence vs Symptoms
-    ml_df = dfs['medication_logs']
-    if not ml_df.empty:
-        # Filter for non-"as needed" medications for adherence tracking
-        meds = Medication.query.filter(
-            Medication.user_id == user_id, 
-            Medication.frequency.ilike('%daily%')
-        ).all()
-        med_ids = [m.id for m in meds]
-        
-        if med_ids:
-            ml_filtered = ml_df[ml_df['medication_id'].isin(med_ids)]
-            
-            if not ml_filtered.empty:
-                ml_daily = ml_filtered.set_index('timestamp').resample('D')['taken'].mean().reset_index()
-                merged = pd.merge(s_daily, ml_daily, on='timestamp', how='inner').dropna()
-                
-                if len(merged) >= 3:
-                    corr = merged['severity'].corr(merged['taken'])
-                    if corr < -0.3:
-                        results.append({
-                            'type': 'correlation',
-                            'factor': 'Medication Adherence',
-                            'score': round(corr, 2),
-                            'description': f"Consistent medication use shows a strong link to reduced symptom severity ({round(corr, 2)})."
-                        })
+    # Daily adherence only counts non-"as needed" medications
+    with stage('correlations.adherence') as timer:
+        ml_daily = dfs['daily']['scheduled_adherence']
+        merged = pd.merge(s_daily, ml_daily, on='timestamp', how='inner').dropna()
+    
+        if len(merged) >= 3:
+            corr = merged['severity'].corr(merged['taken'])
+            if corr < -0.3:
+                p_value = _pair_significance(merged['severity'], merged['taken'], n_permutations, seed)
+                if p_value < alpha:
+                    results.append({
+                        'type': 'correlation',
+                        'factor': 'Medication Adherence',
+                        'score': round(corr, 2),
+                        **_significance(corr, p_value, len(merged)),
+                        'description': f"Consistent medication use shows a strong link to reduced symptom severity ({round(corr, 2)})."
+                    })
+        timer.count(len(merged))
 
     # Sort results by importance
     results.sort(key=lambda x: (
@@ -215,65 +354,31 @@ def analyze_correlations(user_id):
 
     return results
 
-def calculate_correlation_matrix(user_id):
-    """Generate a full correlation matrix for all numeric health variables"""
-    dfs = get_user_data_df(user_id)
-    
-    # We want to correlate daily averages/states
-    daily_data = []
-    
-    # 1. Symptoms (per symptom)
-    s_df = dfs['symptoms']
-    if not s_df.empty:
-        for symptom_name in s_df['symptomName'].unique():
-            s_sub = s_df[s_df['symptomName'] == symptom_name]
-            s_daily = s_sub.set_index('timestamp').resample('D')['severity'].mean().rename(f"Symptom: {symptom_name}")
-            daily_data.append(s_daily)
-    
-    # 2. Mood
-    m_df = dfs['moods']
-    if not m_df.empty:
-        m_daily = m_df.set_index('timestamp').resample('D')['moodRating'].mean().rename("Mood")
-        daily_data.append(m_daily)
-        
-    # 3. Activity
-    a_df = dfs['activities']
-    if not a_df.empty:
-        a_daily = a_df.set_index('timestamp').resample('D')['intensity'].mean().rename("Activity Intensity")
-        daily_data.append(a_daily)
-        
-    # 4. Environment
-    e_df = dfs['environment']
-    if not e_df.empty:
-        e_daily = e_df.set_index('timestamp').resample('D')[['temperature', 'humidity', 'airQualityIndex']].mean()
-        e_daily.columns = ["Temp", "Humidity", "AQI"]
-        for col in e_daily.columns:
-            daily_data.append(e_daily[col])
-            
-    # 5. Medication Adherence
-    ml_df = dfs['medication_logs']
-    if not ml_df.empty:
-        ml_daily = ml_df.set_index('timestamp').resample('D')['taken'].mean().rename("Medication Adherence")
-        daily_data.append(ml_daily)
+def calculate_correlation_matrix(user_id, start=None, end=None):
+    """
+    Generate a full correlation matrix for all numeric health variables.
 
-    if not daily_data:
+    Reads the user's persisted sufficient statistics over daily values, so no
+    raw logs are touched; only days in partially covered months of the
+    [start, end) window are read from the rollups.
+    """
+    with stage('matrix') as timer:
+        variables, totals = load_correlation_stats(user_id, start, end)
+        timer.count(len(variables))
+    if not variables:
         return []
 
-    # Merge all into one DataFrame
-    full_df = pd.concat(daily_data, axis=1).dropna(how='all')
-    
     # Calculate correlation matrix
-    corr_matrix = full_df.corr().fillna(0)
+    corr_matrix = np.nan_to_num(correlation_from_stats(totals))
     
     # Convert to the format expected by the frontend
     results = []
-    variables = corr_matrix.columns.tolist()
     
     for i in range(len(variables)):
         for j in range(i + 1, len(variables)):
             v1 = variables[i]
             v2 = variables[j]
-            coeff = corr_matrix.iloc[i, j]
+            coeff = corr_matrix[i, j]
             
             # Only include if not NaN and reasonably non-zero (or just include all for the matrix)
             results.append({
@@ -284,30 +389,21 @@ def calculate_correlation_matrix(user_id):
             
     return results
 
-def get_summary_data(user_id):
-    """Aggregate all user data into a clean text summary for the AI model"""
-    dfs = get_user_data_df(user_id)
-    
-    summary = "User Health Data Summary:\n\n"
-    
-    if not dfs['symptoms'].empty:
-        summary += "Symptoms:\n"
-        for _, row in dfs['symptoms'].tail(15).iterrows():
-            summary += f"- {row['timestamp'].strftime('%Y-%m-%d %H:%M')}: {row['symptomName']} (Severity: {row['severity']})\n"
-    
-    if not dfs['foods'].empty:
-        summary += "\nRecent Food:\n"
-        for _, row in dfs['foods'].tail(15).iterrows():
-            summary += f"- {row['timestamp'].strftime('%Y-%m-%d %H:%M')}: {row['foodName']} ({row['mealType']})\n"
-
-    if not dfs['activities'].empty:
-        summary += "\nRecent Activity:\n"
-        for _, row in dfs['activities'].tail(10).iterrows():
-            summary += f"- {row['timestamp'].strftime('%Y-%m-%d %H:%M')}: {row['activityType']} ({row['durationMinutes']} mins, Intensity: {row['intensity']})\n"
-
-    if not dfs['moods'].empty:
-        summary += "\nRecent Mood:\n"
-        for _, row in dfs['moods'].tail(10).iterrows():
-            summary += f"- {row['timestamp'].strftime('%Y-%m-%d %H:%M')}: Rating {row['moodRating']}\n"
+def get_summary_logs(user_id, start=None, end=None, rows=None):
+    """
+    The user's recent logs for the AI summary, by log frame key, oldest first.
+
+    Each section is read with its own latest-n query, so the cost does not
+    grow with the user's history. rows overrides SUMMARY_ROWS per section
+    and start/end limit the summary to a time window.
+    """
+    rows = {**SUMMARY_ROWS, **(rows or {})}
+    summary = {}
+
+    with stage('summary') as timer:
+        for key, limit in rows.items():
+            model, columns = LOG_COLUMNS[key]
+            summary[key] = load_recent_logs(model, columns, user_id, limit, start, end) if limit > 0 else []
+        timer.count(sum(len(logs) for logs in summary.values()))
 
     return summary
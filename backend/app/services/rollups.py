@@ -0,0 +1,221 @@
+import uuid
+from datetime import datetime, time, timedelta
+import pandas as pd
+from sqlalchemy import select, exists
+from app import db
+from app.models.symptom import SymptomLog
+from app.models.activity import ActivityLog
+from app.models.mood import MoodLog
+from app.models.environment import EnvironmentLog
+from app.models.medication import MedicationLog, Medication
+from app.models.rollup import DailyRollup
+from app.services.log_loader import load_log_frame
+from app.services.correlation_stats import update_correlation_stats, rebuild_correlation_stats, rollup_values
+
+ENVIRONMENT_METRICS = ['temperature', 'humidity', 'pressure', 'air_quality_index', 'pm2_5', 'pm10', 'uv_index', 'clouds']
+
+# Raw columns each rollup value is aggregated from
+ROLLUP_SOURCES = {
+    'symptoms': (SymptomLog, {
+        'timestamp': (SymptomLog.timestamp, 'datetime64[ns]'),
+        'symptomName': (SymptomLog.symptom_name, 'object'),
+        'severity': (SymptomLog.severity, 'float64'),
+    }),
+    'moods': (MoodLog, {
+        'timestamp': (MoodLog.timestamp, 'datetime64[ns]'),
+        'moodRating': (MoodLog.mood_rating, 'float64'),
+    }),
+    'activities': (ActivityLog, {
+        'timestamp': (ActivityLog.timestamp, 'datetime64[ns]'),
+        'intensity': (ActivityLog.intensity, 'float64'),
+    }),
+    'environment': (EnvironmentLog, {
+        'timestamp': (EnvironmentLog.timestamp, 'datetime64[ns]'),
+        **{metric: (getattr(EnvironmentLog, metric), 'float64') for metric in ENVIRONMENT_METRICS},
+    }),
+    'medication_logs': (MedicationLog, {
+        'timestamp': (MedicationLog.timestamp, 'datetime64[ns]'),
+        'taken': (MedicationLog.taken, 'float64'),
+        'medication_id': (MedicationLog.medication_id, 'object'),
+    }),
+}
+
+# Log types whose writes change a day's rollup (food logs do not)
+ROLLUP_LOG_TYPES = {'symptom', 'mood', 'activity', 'environment', 'medication'}
+
+ROLLUP_VALUE_COLUMNS = [
+    'symptom_mean', 'symptom_max', 'symptom_count', 'symptom_breakdown',
+    'mood_mean', 'activity_intensity', *ENVIRONMENT_METRICS,
+    'adherence_ratio', 'scheduled_adherence_ratio',
+]
+
+def _day_bounds(day):
+    """Naive datetime range [start, end) covering one calendar day"""
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+def _as_day(value):
+    """Date of a window bound given as a date or datetime"""
+    return value.date() if isinstance(value, datetime) else value
+
+def scheduled_medication_ids(user_id):
+    """IDs of the user's medications with a daily schedule, used for adherence tracking"""
+    meds = Medication.query.filter(
+        Medication.user_id == user_id,
+        Medication.frequency.ilike('%daily%')
+    ).all()
+    return [m.id for m in meds]
+
+def compute_daily_rollups(user_id, start=None, end=None):
+    """
+    Aggregate a user's raw logs into rollup values for every day in [start, end).
+
+    Returns {date: {column: value}} for each day with at least one log, with
+    missing aggregates as None.
+    """
+    frames = {
+        key: load_log_frame(model, columns, user_id, start, end)
+        for key, (model, columns) in ROLLUP_SOURCES.items()
+    }
+
+    parts = []
+
+    s_df = frames['symptoms']
+    if not s_df.empty:
+        s_day = s_df['timestamp'].dt.date
+        parts.append(s_df.groupby(s_day)['severity'].agg(symptom_mean='mean', symptom_max='max', symptom_count='count'))
+
+        # Per-symptom stats, in order of first appearance within each day
+        breakdown = {}
+        by_name = s_df.groupby([s_day, 'symptomName'], sort=False)['severity'].agg(['mean', 'max', 'count'])
+        for (day, name), mean, max_, count in zip(by_name.index, by_name['mean'], by_name['max'], by_name['count']):
+            breakdown.setdefault(day, {})[name] = {'mean': float(mean), 'max': int(max_), 'count': int(count)}
+        parts.append(pd.Series(breakdown, name='symptom_breakdown', dtype='object'))
+
+    m_df = frames['moods']
+    if not m_df.empty:
+        parts.append(m_df.groupby(m_df['timestamp'].dt.date)['moodRating'].mean().rename('mood_mean'))
+
+    a_df = frames['activities']
+    if not a_df.empty:
+        parts.append(a_df.groupby(a_df['timestamp'].dt.date)['intensity'].mean().rename('activity_intensity'))
+
+    e_df = frames['environment']
+    if not e_df.empty:
+        parts.append(e_df.groupby(e_df['timestamp'].dt.date)[ENVIRONMENT_METRICS].mean())
+
+    ml_df = frames['medication_logs']
+    if not ml_df.empty:
+        parts.append(ml_df.groupby(ml_df['timestamp'].dt.date)['taken'].mean().rename('adherence_ratio'))
+        scheduled = ml_df[ml_df['medication_id'].isin(scheduled_medication_ids(user_id))]
+        if not scheduled.empty:
+            parts.append(scheduled.groupby(scheduled['timestamp'].dt.date)['taken'].mean().rename('scheduled_adherence_ratio'))
+
+    if not parts:
+        return {}
+
+    combined = pd.concat(parts, axis=1).reindex(columns=ROLLUP_VALUE_COLUMNS)
+
+    rollups = {}
+    for day, row in zip(combined.index, combined.to_dict('records')):
+        values = {col: (None if not isinstance(val, dict) and pd.isna(val) else val) for col, val in row.items()}
+        values['symptom_count'] = int(values['symptom_count'] or 0)
+        if values['symptom_max'] is not None:
+            values['symptom_max'] = int(values['symptom_max'])
+        values['symptom_breakdown'] = values['symptom_breakdown'] or {}
+        rollups[day] = values
+    return rollups
+
+def refresh_daily_rollups(user_id, days):
+    """
+    Recompute the rollups for the given days from the raw logs.
+
+    Called before commit on every log write, so pending inserts, edits and
+    deletes in the session are reflected. Days left with no logs lose their
+    rollup row. The correlation stats are updated with each day's change.
+    """
+    days = sorted(set(days))
+    if not days:
+        return
+
+    start, _ = _day_bounds(days[0])
+    _, end = _day_bounds(days[-1])
+    values = compute_daily_rollups(user_id, start, end)
+
+    existing = {
+        rollup.day: rollup
+        for rollup in DailyRollup.query.filter(
+            DailyRollup.user_id == user_id,
+            DailyRollup.day >= days[0],
+            DailyRollup.day <= days[-1]
+        ).all()
+    }
+
+    changes = []
+    for day in days:
+        rollup = existing.get(day)
+        day_values = values.get(day)
+        changes.append((day, rollup_values(rollup) if rollup else None, day_values))
+
+        if day_values is None:
+            if rollup:
+                db.session.delete(rollup)
+            continue
+
+        if not rollup:
+            rollup = DailyRollup(id=str(uuid.uuid4()), user_id=user_id, day=day)
+            db.session.add(rollup)
+        for col, val in day_values.items():
+            setattr(rollup, col, val)
+
+    update_correlation_stats(user_id, changes)
+
+def rebuild_user_rollups(user_id):
+    """Replace all of a user's rollups, and the stats built on them, from their full history"""
+    DailyRollup.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+
+    rollups = compute_daily_rollups(user_id)
+    rows = [
+        {'id': str(uuid.uuid4()), 'user_id': user_id, 'day': day, 'updated_at': datetime.utcnow(), **values}
+        for day, values in rollups.items()
+    ]
+    if rows:
+        db.session.execute(DailyRollup.__table__.insert(), rows)
+    rebuild_correlation_stats(user_id, rollups)
+    return len(rows)
+
+def _has_rollup_logs(user_id):
+    """Whether the user has any raw log that would produce a rollup"""
+    return any(
+        db.session.execute(select(exists().where(model.user_id == user_id))).scalar()
+        for model, _ in ROLLUP_SOURCES.values()
+    )
+
+def load_daily_rollups(user_id, start=None, end=None):
+    """
+    Load a user's rollups as a DataFrame with one row per logged day.
+
+    The day is exposed as a datetime 'timestamp' column so it lines up with the
+    raw log frames. When given, start is inclusive and end is exclusive. Users
+    whose rollups were never built (e.g. data inserted before the table
+    existed) are backfilled on first read.
+    """
+    columns = [DailyRollup.day, *[getattr(DailyRollup, col) for col in ROLLUP_VALUE_COLUMNS]]
+    stmt = select(*columns).where(DailyRollup.user_id == user_id).order_by(DailyRollup.day)
+    if start is not None:
+        stmt = stmt.where(DailyRollup.day >= _as_day(start))
+    if end is not None:
+        stmt = stmt.where(DailyRollup.day < _as_day(end))
+    rows = db.session.execute(stmt).all()
+
+    if not rows and _has_rollup_logs(user_id) \
+            and not db.session.execute(select(exists().where(DailyRollup.user_id == user_id))).scalar():
+        rebuild_user_rollups(user_id)
+        db.session.commit()
+        rows = db.session.execute(stmt).all()
+
+    df = pd.DataFrame.from_records(rows, columns=['day', *ROLLUP_VALUE_COLUMNS])
+    numeric = [col for col in ROLLUP_VALUE_COLUMNS if col != 'symptom_breakdown']
+    df[numeric] = df[numeric].astype('float64')
+    df.insert(0, 'timestamp', pd.to_datetime(df.pop('day')))
+    return df
@@ -0,0 +1,66 @@
+import numpy as np
+from app.services.correlation_stats import pearson_from_sums
+
+def _masked_correlations(y, factors):
+    """
+    Pairwise-complete Pearson correlation of each row of y (P x T) with each
+    column of factors (T x M), from masked matrix products. y must not
+    contain NaN, so the factor-side sums are shared by every row.
+    Returns P x M.
+    """
+    f_present = ~np.isnan(factors)
+    f0, f_mask = np.where(f_present, factors, 0.0), f_present.astype('float64')
+
+    n = f_mask.sum(axis=0)
+    sx, sxx = f0.sum(axis=0), (f0 ** 2).sum(axis=0)
+    sy, syy = np.split(np.vstack([y, y ** 2]) @ f_mask, 2)
+    sxy = y @ f0
+
+    return pearson_from_sums(n, sx, sy, sxx, syy, sxy)
+
+def permutation_correlations(target, factors, n_permutations=2000, seed=None):
+    """
+    Observed and permutation-null correlations of a target with every factor.
+
+    `target` is length T and `factors` T x M, with NaN gaps paired
+    pairwise-complete. The target's values are shuffled across the days it
+    was recorded on n_permutations times, and all shuffles are correlated
+    with all factor columns at once as matrix products. Pass seed for
+    reproducible results.
+
+    Returns (observed, null) with shapes (M,) and (n_permutations, M).
+    """
+    target = np.asarray(target, dtype='float64')
+    factors = np.asarray(factors, dtype='float64').reshape(len(target), -1)
+    # Days without a target value never pair with anything, shuffled or not
+    recorded = ~np.isnan(target)
+    target, factors = target[recorded], factors[recorded]
+
+    rng = np.random.default_rng(seed)
+    shuffled = rng.permuted(np.broadcast_to(target, (n_permutations, len(target))), axis=1)
+
+    observed = _masked_correlations(target[None, :], factors)[0]
+    null = _masked_correlations(shuffled, factors)
+    return observed, null
+
+def permutation_p_values(observed, null):
+    """
+    Two-sided p-values of observed correlations against their permutation null.
+
+    Uses the (1 + exceedances) / (1 + permutations) estimate, so no p-value
+    is ever exactly zero. The last axis of null must match observed.
+    """
+    exceed = (np.abs(np.nan_to_num(null)) >= np.abs(observed) - 1e-12).sum(axis=0)
+    p = (1 + exceed) / (1 + null.shape[0])
+    return np.where(np.isnan(observed), np.nan, p)
+
+def fisher_interval(r, n, z_crit=1.959964):
+    """
+    Approximate 95% confidence interval for a Pearson r over n pairs, via the
+    Fisher z-transform. Returns None when n is too small for an interval.
+    """
+    if n <= 3 or np.isnan(r):
+        return None
+    z = np.arctanh(np.clip(r, -0.999999, 0.999999))
+    half = z_crit / np.sqrt(n - 3)
+    return [round(float(np.tanh(z - half)), 2), round(float(np.tanh(z + half)), 2)]
@@ -0,0 +1,124 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from flask import current_app, g, has_app_context, has_request_context
+
+logger = logging.getLogger('patternmd.timing')
+
+# Upper bounds (ms) of the histogram buckets; durations above the last land in +Inf
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class StageHistograms:
+    """Per-process duration histograms of each stage, with fixed millisecond buckets"""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, ms):
+        with self._lock:
+            counts, totals = self._stages.setdefault(name, ([0] * (len(self.buckets) + 1), [0, 0.0]))
+            counts[bisect_left(self.buckets, ms)] += 1
+            totals[0] += 1
+            totals[1] += ms
+
+    def snapshot(self):
+        """Cumulative bucket counts, count and total ms of every stage seen"""
+        with self._lock:
+            result = {}
+            for name, (counts, (count, total)) in self._stages.items():
+                running, buckets = 0, {}
+                for bound, n in zip([*self.buckets, '+Inf'], counts):
+                    running += n
+                    buckets[str(bound)] = running
+                result[name] = {'buckets': buckets, 'count': count, 'sumMs': round(total, 3)}
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._stages.clear()
+
+stage_histograms = StageHistograms()
+
+class _Stage:
+    __slots__ = ('name', 'rows', 'started')
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+
+    def count(self, rows):
+        """Record how many rows (logs, days, pairs...) the stage worked on"""
+        self.rows = int(rows)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, (time.perf_counter() - self.started) * 1000, self.rows)
+        return False
+
+class _NullStage:
+    __slots__ = ()
+
+    def count(self, rows):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+def stage(name):
+    """
+    Time a block of the analysis pipeline:
+
+        with stage('load_data') as timer:
+            data = load_user_data(...)
+            timer.count(rows)
+
+    With ANALYSIS_TIMING off this returns a shared no-op, so instrumented
+    code costs one config lookup per stage.
+    """
+    if not has_app_context() or not current_app.config.get('ANALYSIS_TIMING'):
+        return _NULL_STAGE
+    return _Stage(name)
+
+def _record(name, ms, rows):
+    logger.info(json.dumps({'event': 'analysis_stage', 'stage': name, 'ms': round(ms, 3), 'rows': rows}))
+    if current_app.config.get('ANALYSIS_TIMING_HISTOGRAMS'):
+        stage_histograms.observe(name, ms)
+    # Background jobs have no response to attach a header to
+    if has_request_context():
+        g.setdefault('stage_timings', []).append((name, ms, rows))
+
+def server_timing_header(timings):
+    """Format (name, ms, rows) stages as a Server-Timing header value"""
+    return ', '.join(
+        f'{name};dur={ms:.1f}' + (f';desc="rows={rows}"' if rows is not None else '')
+        for name, ms, rows in timings
+    )
+
+def init_stage_timing(app):
+    """Attach the request's stage timings to its response and log them when timing is enabled"""
+    if app.config.get('ANALYSIS_TIMING') and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+    @app.after_request
+    def add_server_timing(response):
+        timings = g.pop('stage_timings', None)
+        if timings:
+            response.headers['Server-Timing'] = server_timing_header(timings)
+            # The frontend is served from another origin
+            response.headers['Timing-Allow-Origin'] = '*'
+        return response
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+def window_join(event_times, candidate_times, window):
+    """
+    Pair each event with every candidate logged within `window` before it.
+
+    Both inputs are datetime-like sequences and `window` is a timedelta. A
+    candidate matches an event when event - window <= candidate <= event.
+    Candidates are sorted once and each event's range is found with two
+    binary searches, so the whole join is O((events + candidates) log n + pairs)
+    with no Python-level loop.
+
+    Returns (event_idx, candidate_idx) integer arrays of positions into the
+    original inputs. Pairs are ordered by event, then by candidate time.
+    """
+    events = pd.to_datetime(pd.Series(event_times)).to_numpy(dtype='datetime64[ns]')
+    candidates = pd.to_datetime(pd.Series(candidate_times)).to_numpy(dtype='datetime64[ns]')
+
+    if len(events) == 0 or len(candidates) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty
+
+    order = np.argsort(candidates, kind='stable')
+    sorted_candidates = candidates[order]
+
+    lo = np.searchsorted(sorted_candidates, events - np.timedelta64(pd.Timedelta(window)), side='left')
+    hi = np.searchsorted(sorted_candidates, events, side='right')
+    counts = hi - lo
+
+    total = int(counts.sum())
+    event_idx = np.repeat(np.arange(len(events)), counts)
+    # Position of each pair within its event's run, added to that event's lower bound
+    run_starts = np.repeat(np.cumsum(counts) - counts, counts)
+    sorted_idx = np.repeat(lo, counts) + (np.arange(total) - run_starts)
+
+    return event_idx, order[sorted_idx]
@@ -0,0 +1,12 @@
+from celery import shared_task
+from app.services.analysis_jobs import run_pattern_analysis_job, run_insight_job
+
+@shared_task(name='analysis.run_pattern_analysis')
+def run_pattern_analysis(user_id, job_id):
+    """Recompute and store a user's pattern analysis"""
+    return run_pattern_analysis_job(user_id, job_id)
+
+@shared_task(name='analysis.generate_ai_insights')
+def generate_ai_insights(user_id, data_version, start, end):
+    """Generate and store the AI insights for a user's stored analysis"""
+    return run_insight_job(user_id, data_version, start, end)
@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.services.stage_timing import stage
+
+# Outbound integrations: (connect, read) timeout in seconds, retries on
+# RETRY_STATUSES and connection errors, and connections kept per host
+INTEGRATIONS = {
+    'openweather': {'timeout': (3.05, 10), 'retries': 2, 'pool_maxsize': 10, 'retry_post': False, 'retry_reads': True},
+    # Chat completions have no side effects, so a 429/503 POST is safe to retry.
+    # A read timeout is not: the model may still be generating, and retrying
+    # would multiply the wait
+    'huggingface': {'timeout': (3.05, 20), 'retries': 2, 'pool_maxsize': 4, 'retry_post': True, 'retry_reads': False},
+}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_BACKOFF_FACTOR = 0.5  # sleeps 0.5s, 1s, 2s... between retries, or the server's Retry-After
+
+_sessions = {}
+_metrics = {}
+_lock = threading.Lock()
+
+def _new_session(settings):
+    methods = Retry.DEFAULT_ALLOWED_METHODS | ({'POST'} if settings['retry_post'] else set())
+    retry = Retry(
+        total=settings['retries'],
+        # False re-raises read errors (e.g. ReadTimeout) as they are
+        read=None if settings['retry_reads'] else False,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=methods,
+        # Hand the last response back rather than raising, so callers keep their status handling
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=settings['pool_maxsize'])
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_session(integration):
+    """
+    The integration's pooled session, so calls to the same host reuse
+    kept-alive connections. Sessions are per process: a forked worker
+    never shares its parent's sockets.
+    """
+    key = (os.getpid(), integration)
+    session = _sessions.get(key)
+    if session is None:
+        with _lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = _sessions[key] = _new_session(INTEGRATIONS[integration])
+    return session
+
+def request(integration, method, url, **kwargs):
+    """
+    Send a request through the integration's pooled session with its
+    timeout budget (unless one is passed), recording latency and errors.
+    """
+    kwargs.setdefault('timeout', INTEGRATIONS[integration]['timeout'])
+    started = time.perf_counter()
+    error = False
+    try:
+        with stage(f'http.{integration}'):
+            return get_session(integration).request(method, url, **kwargs)
+    except requests.exceptions.RequestException:
+        error = True
+        raise
+    finally:
+        _record(integration, (time.perf_counter() - started) * 1000, error)
+
+def http_get(integration, url, **kwargs):
+    return request(integration, 'GET', url, **kwargs)
+
+def http_post(integration, url, **kwargs):
+    return request(integration, 'POST', url, **kwargs)
+
+def _record(integration, ms, error):
+    with _lock:
+        m = _metrics.setdefault(integration, {'requests': 0, 'errors': 0, 'totalMs': 0.0, 'maxMs': 0.0})
+        m['requests'] += 1
+        m['errors'] += error
+        m['totalMs'] += ms
+        m['maxMs'] = max(m['maxMs'], ms)
+
+def integration_metrics():
+    """
+    Per-integration request count, errors, mean and max latency (ms, retries
+    included) and connection reuse rate for this process. Reuse counts
+    every attempt urllib3 made against the connections it had to open.
+    """
+    result = {}
+    with _lock:
+        for integration, m in _metrics.items():
+            attempts = opened = 0
+            session = _sessions.get((os.getpid(), integration))
+            if session is not None:
+                # One adapter serves both schemes; its pool container can only be read by key
+                pools = session.get_adapter('https://').poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is not None:
+                        attempts += pool.num_requests
+                        opened += pool.num_connections
+            result[integration] = {
+                'requests': m['requests'],
+                'errors': m['errors'],
+                'meanMs': round(m['totalMs'] / m['requests'], 2),
+                'maxMs': round(m['maxMs'], 2),
+                'attempts': attempts,
+                'connectionsOpened': opened,
+                'reuseRate': round(1 - opened / attempts, 3) if attempts else None,
+            }
+    return result
@@ -0,0 +1,10 @@
+# Severity, intensity and mood ratings are all on a 1-10 scale
+SCALE_MIN = 1
+SCALE_MAX = 10
+
+def scale_error(value, label):
+    """Error message when value is not a whole number on the 1-10 scale, else None"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != int(value) \
+            or not SCALE_MIN <= value <= SCALE_MAX:
+        return f'{label} must be a whole number from {SCALE_MIN} to {SCALE_MAX}'
+    return None
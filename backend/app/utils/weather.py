@@ -1,58 +1,171 @@
+import uuid
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
 from flask import current_app
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.geocode_cache import GeocodeCache
+from app.utils.http_client import http_get
 
-def fetch_weather_data(location_name):
+# Longest a weather fetch waits for its concurrent calls after geocoding.
+# Air quality or UV still outstanding by then are left out of the result
+WEATHER_FETCH_DEADLINE_SECONDS = 10
+
+def normalize_location_search(location_name):
+    """Geocode cache key: case and spacing do not change what a search finds"""
+    return ' '.join(location_name.split()).lower()
+
+def _cache_geocode(search, lat, lon, name):
     """
-    Fetches weather and air quality data for a given location using OpenWeatherMap API.
+    Cache a geocode result in a savepoint, so it is saved with the caller's
+    commit and never commits or discards the caller's pending changes.
+    """
+    now = datetime.utcnow()
+    values = dict(lat=lat, lon=lon, name=name, created_at=now,
+                  expires_at=now + timedelta(seconds=current_app.config['GEOCODE_CACHE_TTL_SECONDS']))
+    try:
+        with db.session.begin_nested():
+            db.session.execute(delete(GeocodeCache).where(GeocodeCache.expires_at < now))
+            entry = GeocodeCache.query.filter_by(search=search).first()
+            if entry:
+                for key, value in values.items():
+                    setattr(entry, key, value)
+            else:
+                db.session.add(GeocodeCache(id=str(uuid.uuid4()), search=search, **values))
+    except IntegrityError:
+        # Another request cached the same search first; only the savepoint is rolled back
+        pass
+
+def geocode_location(location_name):
+    """
+    Resolve a location search to (lat, lon, display name), or None when it
+    matches nothing. Results, including misses, are kept in the shared
+    geocode cache for GEOCODE_CACHE_TTL_SECONDS. Returns (result, error).
     """
+    search = normalize_location_search(location_name)
+    entry = GeocodeCache.query.filter_by(search=search).first()
+    if entry and entry.expires_at > datetime.utcnow():
+        return ((entry.lat, entry.lon, entry.name) if entry.lat is not None else None), None
+
     api_key = current_app.config.get('OPENWEATHER_API_KEY')
     if not api_key:
         return None, "OpenWeatherMap API key not configured"
 
     try:
-        # 1. Geocoding to get lat/lon
-        query = location_name.strip()
-        geo_url = f"https://api.openweathermap.org/geo/1.0/direct?q={query}&limit=1&appid={api_key}"
-        geo_resp = requests.get(geo_url, timeout=10)
-        
+        geo_url = f"https://api.openweathermap.org/geo/1.0/direct?q={location_name.strip()}&limit=1&appid={api_key}"
+        geo_resp = http_get('openweather', geo_url)
+
         if geo_resp.status_code != 200:
             return None, f"Geocoding API error: {geo_resp.status_code} - {geo_resp.text}"
-            
-        geo_data = geo_resp.json()
 
+        geo_data = geo_resp.json()
         if not geo_data:
-            return None, f"Location '{location_name}' not found"
+            _cache_geocode(search, None, None, None)
+            return None, None
 
-        lat = geo_data[0]['lat']
-        lon = geo_data[0]['lon']
-        
         # Build a more descriptive name for display
         name = geo_data[0]['name']
         state = geo_data[0].get('state', '')
         country = geo_data[0]['country']
         actual_name = f"{name}, {state}, {country}".replace(', ,', ',').strip(', ')
 
-        # 2. Current Weather
-        weather_url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&units=imperial&appid={api_key}"
-        weather_resp = requests.get(weather_url, timeout=10)
+        result = (geo_data[0]['lat'], geo_data[0]['lon'], actual_name)
+        _cache_geocode(search, *result)
+        return result, None
+
+    except requests.exceptions.RequestException as e:
+        return None, f"API Request failed: {str(e)}"
+    except (KeyError, IndexError) as e:
+        return None, f"Data parsing failed: {str(e)}"
+
+def resolve_home_location(user):
+    """
+    Store the coordinates and display name of user.home_location on the
+    user (cleared when it cannot be resolved), so weather fetches for it
+    need no geocoding. Returns an error message or None; the caller commits.
+    """
+    user.home_lat = user.home_lon = user.home_location_name = None
+    if not user.home_location:
+        return None
+
+    place, error = geocode_location(user.home_location)
+    if error:
+        return error
+    if place is None:
+        return f"Location '{user.home_location}' not found"
+    user.home_lat, user.home_lon, user.home_location_name = place
+    return None
+
+def _in_app_context(app, func):
+    """func run inside app's context, so stage timings taken in worker threads are recorded"""
+    def run(*args, **kwargs):
+        with app.app_context():
+            return func(*args, **kwargs)
+    return run
+
+def _optional_json(future, done):
+    """The JSON body of a finished, successful call, or None"""
+    if future not in done or future.exception() is not None:
+        return None
+    resp = future.result()
+    if resp.status_code != 200:
+        print(f"OpenWeatherMap API error: {resp.status_code} - {resp.text}")
+        return None
+    try:
+        return resp.json()
+    except ValueError:
+        return None
+
+def fetch_weather_data(location_name, coords=None):
+    """
+    Fetches weather and air quality data for a given location using OpenWeatherMap API.
+    With coords (lat, lon) already known the location is not geocoded and
+    location_name is used as its display name.
+    """
+    api_key = current_app.config.get('OPENWEATHER_API_KEY')
+    if not api_key:
+        return None, "OpenWeatherMap API key not configured"
+
+    # 1. Geocoding to get lat/lon
+    if coords is not None:
+        lat, lon = coords
+        actual_name = location_name
+    else:
+        place, error = geocode_location(location_name)
+        if error:
+            return None, error
+        if place is None:
+            return None, f"Location '{location_name}' not found"
+        lat, lon, actual_name = place
+
+    # 2-4. Current weather, air pollution and UV index (UV is in One Call, but if we don't
+    # have One Call 3.0, we can use the UVI API), requested concurrently
+    base = "https://api.openweathermap.org/data/2.5"
+    urls = {
+        'weather': f"{base}/weather?lat={lat}&lon={lon}&units=imperial&appid={api_key}",
+        'aqi': f"{base}/air_pollution?lat={lat}&lon={lon}&appid={api_key}",
+        'uvi': f"{base}/uvi?lat={lat}&lon={lon}&appid={api_key}",
+    }
+    executor = ThreadPoolExecutor(max_workers=len(urls))
+    get = _in_app_context(current_app._get_current_object(), http_get)
+    futures = {key: executor.submit(get, 'openweather', url) for key, url in urls.items()}
+    done, _ = wait(futures.values(), timeout=WEATHER_FETCH_DEADLINE_SECONDS)
+    # Calls still running past the deadline finish in the background and are ignored
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    try:
+        if futures['weather'] not in done:
+            return None, f"Weather API request timed out after {WEATHER_FETCH_DEADLINE_SECONDS}s"
+        weather_resp = futures['weather'].result()
         if weather_resp.status_code != 200:
             return None, f"Weather API error: {weather_resp.status_code} - {weather_resp.text}"
         weather_data = weather_resp.json()
 
-        # 3. Air Pollution & UV (UV is in One Call, but if we don't have One Call 3.0, we can use the UVI API)
-        aqi_url = f"https://api.openweathermap.org/data/2.5/air_pollution?lat={lat}&lon={lon}&appid={api_key}"
-        aqi_resp = requests.get(aqi_url, timeout=10)
-        
-        # 4. UV Index
-        uvi_url = f"https://api.openweathermap.org/data/2.5/uvi?lat={lat}&lon={lon}&appid={api_key}"
-        uvi_resp = requests.get(uvi_url, timeout=10)
-        uv_index = None
-        if uvi_resp.status_code == 200:
-            uv_index = uvi_resp.json().get('value')
-
-        if aqi_resp.status_code != 200:
-            return None, f"AQI API error: {aqi_resp.status_code} - {aqi_resp.text}"
-        aqi_data = aqi_resp.json()
+        # Air quality and UV are optional: their fields are left empty when the call fails
+        aqi_data = _optional_json(futures['aqi'], done) or {}
+        uv_index = (_optional_json(futures['uvi'], done) or {}).get('value')
 
         # OpenWeather returned units: temp in °F (because units=imperial), pressure in hPa, visibility in meters
         pressure_hpa = float(weather_data['main']['pressure'])
@@ -70,7 +183,8 @@ def fetch_weather_data(location_name):
             visibility_mi = round(float(weather_data['visibility']) / 1609.344, 2)
 
         # Extract components from AQI response if available
-        components = aqi_data['list'][0].get('components', {}) if aqi_data.get('list') else {}
+        air = aqi_data['list'][0] if aqi_data.get('list') else {}
+        components = air.get('components', {})
 
         result = {
             'temperature': round(float(weather_data['main']['temp']), 2),  # °F
@@ -78,7 +192,7 @@ def fetch_weather_data(location_name):
             'humidity': round(float(weather_data['main']['humidity']), 2),
             'pressure': pressure_inhg,  # inHg
             'weather_condition': weather_data['weather'][0]['main'],
-            'air_quality_index': aqi_data['list'][0]['main']['aqi'],
+            'air_quality_index': air.get('main', {}).get('aqi'),
             'uv_index': uv_index,
             'pm2_5': round(float(components.get('pm2_5', 0)), 2) if components else None,
             'pm10': round(float(components.get('pm10', 0)), 2) if components else None,
@@ -106,7 +220,7 @@ def search_cities(query):
 
     try:
         url = f"https://api.openweathermap.org/geo/1.0/direct?q={query}&limit=5&appid={api_key}"
-        resp = requests.get(url, timeout=10)
+        resp = http_get('openweather', url)
         if resp.status_code != 200:
             return [], f"Search API error: {resp.status_code} - {resp.text}"
         data = resp.json()
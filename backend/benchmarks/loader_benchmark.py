@@ -0,0 +1,133 @@
+"""
+Compare the column-projected Core loader against the old ORM loading path.
+
+Usage (from backend/):
+    python -m benchmarks.loader_benchmark --rows 10000 100000 1000000
+
+Each scale is loaded into a fresh SQLite database for a single user, spread
+across the six log tables, and both loaders are timed against it.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from app import create_app, db
+from app.config import Config
+from app.models import User, SymptomLog, FoodLog, ActivityLog, MoodLog, EnvironmentLog, Medication, MedicationLog
+from app.services.pattern_analysis import get_user_data_df
+
+# Share of the per-user rows that goes to each table, roughly matching seed.py
+TABLE_SHARES = {
+    SymptomLog: 0.15,
+    FoodLog: 0.40,
+    ActivityLog: 0.10,
+    MoodLog: 0.13,
+    EnvironmentLog: 0.12,
+    MedicationLog: 0.10,
+}
+
+SYMPTOMS = ["Nausea", "Joint Pain", "Fatigue", "Headache"]
+FOODS = ["Oatmeal", "Chicken Salad", "Pasta with Pesto", "Sushi", "Apple", "Tofu Curry"]
+MEALS = ["breakfast", "lunch", "dinner", "snack"]
+ACTIVITIES = ["Walking", "Yoga", "Swimming", "Cycling"]
+
+def legacy_get_user_data_df(user_id):
+    """The ORM loading path get_user_data_df used before the Core loader"""
+    symptoms = SymptomLog.query.filter_by(user_id=user_id).all()
+    foods = FoodLog.query.filter_by(user_id=user_id).all()
+    activities = ActivityLog.query.filter_by(user_id=user_id).all()
+    moods = MoodLog.query.filter_by(user_id=user_id).all()
+    env = EnvironmentLog.query.filter_by(user_id=user_id).all()
+    med_logs = MedicationLog.query.filter_by(user_id=user_id).all()
+
+    dfs = {
+        'symptoms': pd.DataFrame([{'severity': s.severity, 'timestamp': s.timestamp, 'symptomName': s.symptom_name} for s in symptoms]),
+        'foods': pd.DataFrame([{'foodName': f.food_name, 'timestamp': f.timestamp, 'mealType': f.meal_type} for f in foods]),
+        'activities': pd.DataFrame([{'activityType': a.activity_type, 'timestamp': a.timestamp, 'durationMinutes': a.duration_minutes, 'intensity': a.intensity} for a in activities]),
+        'moods': pd.DataFrame([{'moodRating': m.mood_rating, 'timestamp': m.timestamp} for m in moods]),
+        'environment': pd.DataFrame([{'temperature': e.temperature, 'humidity': e.humidity, 'airQualityIndex': e.air_quality_index, 'timestamp': e.timestamp} for e in env]),
+        'medication_logs': pd.DataFrame([{'timestamp': ml.timestamp, 'taken': ml.taken, 'medication_id': ml.medication_id} for ml in med_logs]),
+    }
+    for df in dfs.values():
+        if not df.empty:
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+    return dfs
+
+def _row(model, user_id, medication_id, ts):
+    """Build one insert row for a log table, with a notes column to hydrate"""
+    row = {'id': str(uuid.uuid4()), 'user_id': user_id, 'timestamp': ts}
+    if model is SymptomLog:
+        row.update(symptom_name=random.choice(SYMPTOMS), severity=random.randint(1, 10), notes="Logged by benchmark.")
+    elif model is FoodLog:
+        row.update(food_name=random.choice(FOODS), meal_type=random.choice(MEALS), notes="Logged by benchmark.")
+    elif model is ActivityLog:
+        row.update(activity_type=random.choice(ACTIVITIES), duration_minutes=random.choice([30, 45, 60]), intensity=random.randint(1, 10), notes="Logged by benchmark.")
+    elif model is MoodLog:
+        row.update(mood_rating=random.randint(1, 10), emotions=["Calm"], notes="Logged by benchmark.")
+    elif model is EnvironmentLog:
+        row.update(temperature=random.uniform(40, 90), humidity=random.uniform(20, 90), pressure=random.uniform(29.8, 30.2),
+                   air_quality_index=random.randint(1, 5), weather_condition="Cloudy", location="Benchmark City")
+    elif model is MedicationLog:
+        row.update(medication_id=medication_id, taken=random.random() < 0.9, notes="Logged by benchmark.")
+    return row
+
+def populate(user_id, total_rows, batch_size=20000):
+    """Insert total_rows log rows for one user with Core bulk inserts"""
+    medication = Medication(id=str(uuid.uuid4()), user_id=user_id, name="Magnesium", dosage="250mg",
+                            frequency="Daily", start_date=datetime.now().date())
+    db.session.add(medication)
+    db.session.commit()
+
+    start = datetime.now() - timedelta(days=365)
+    for model, share in TABLE_SHARES.items():
+        count = int(total_rows * share)
+        step = timedelta(days=365) / max(count, 1)
+        for offset in range(0, count, batch_size):
+            rows = [_row(model, user_id, medication.id, start + step * i)
+                    for i in range(offset, min(offset + batch_size, count))]
+            db.session.execute(model.__table__.insert(), rows)
+        db.session.commit()
+
+def time_loader(loader, user_id, repeat):
+    """Best wall time over repeat runs, expiring the session between runs"""
+    best = None
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        loader(user_id)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run(scales, repeat):
+    for total_rows in scales:
+        workdir = tempfile.mkdtemp(prefix='patternmd-bench-')
+
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            user = User(id=str(uuid.uuid4()), email=f"bench-{total_rows}@example.com", name="Benchmark User", preferences={})
+            user.set_password("benchmark")
+            db.session.add(user)
+            db.session.commit()
+            populate(user.id, total_rows)
+
+            legacy = time_loader(legacy_get_user_data_df, user.id, repeat)
+            projected = time_loader(get_user_data_df, user.id, repeat)
+            print(f"{total_rows:>9} rows  orm: {legacy:8.3f}s  core: {projected:8.3f}s  speedup: {legacy / projected:5.1f}x")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
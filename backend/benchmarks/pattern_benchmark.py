@@ -0,0 +1,167 @@
+"""
+Time each pattern analysis entry point against synthetic user histories.
+
+Usage (from backend/):
+    python -m benchmarks.pattern_benchmark --years 1 5 20 --profiles light heavy \
+        --output pattern-report.json [--baseline previous-report.json]
+
+Every (years, profile) case gets a fresh SQLite database holding one user
+whose history comes from seed.generate_history with a fixed RNG seed, so
+runs are reproducible and comparable. Each function is timed on its own
+(best and mean of --repeat runs), then run once more under tracemalloc for
+its peak Python memory. The JSON report records the environment, row
+counts and all measurements; with --baseline the times are compared to an
+earlier report.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app import create_app, db
+from app.config import Config
+from app.models import User
+from app.services.rollups import rebuild_user_rollups
+from app.services.cooccurrence import rebuild_cooccurrence
+from app.services.pattern_analysis import (
+    analysis_window, get_user_data_df, load_user_data,
+    analyze_correlations, calculate_correlation_matrix, get_summary_logs,
+)
+from seed import seed_medications, generate_history, insert_history
+
+def measure(fn, repeat):
+    """Best and mean wall time over repeat runs, then peak traced memory of one more run"""
+    times = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'best': min(times), 'mean': sum(times) / len(times), 'peakBytes': peak}
+
+def run_case(years, profile, repeat, seed, lookback_days):
+    """Generate one user's history in a fresh database and time every analysis function"""
+    workdir = tempfile.mkdtemp(prefix='patternmd-bench-')
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        user = User(id=str(uuid.uuid4()), email=f"bench-{years}y-{profile}@example.com", name="Benchmark User", preferences={})
+        user.set_password("benchmark")
+        db.session.add(user)
+        db.session.commit()
+
+        days = int(years * 365)
+        rng = random.Random(seed)
+        started = time.perf_counter()
+        medications = seed_medications(user.id, days)
+        rows = insert_history(generate_history(user.id, medications, days, profile=profile, rng=rng))
+        generate_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        rebuild_user_rollups(user.id)
+        rebuild_cooccurrence(user.id)
+        db.session.commit()
+        derive_seconds = time.perf_counter() - started
+
+        # None analyzes the whole history, otherwise the same window /patterns uses
+        start, end = analysis_window(lookback_days=lookback_days) if lookback_days else (None, None)
+        bundle = load_user_data(user.id, start, end)
+
+        functions = {
+            'get_user_data_df': lambda: get_user_data_df(user.id, start, end),
+            'load_user_data': lambda: load_user_data(user.id, start, end),
+            'analyze_correlations': lambda: analyze_correlations(user.id, bundle, seed=seed),
+            'calculate_correlation_matrix': lambda: calculate_correlation_matrix(user.id, start, end),
+            'get_summary_logs': lambda: get_summary_logs(user.id, start, end),
+        }
+        results = {name: measure(fn, repeat) for name, fn in functions.items()}
+
+    return {
+        'years': years,
+        'profile': profile,
+        'days': days,
+        'lookbackDays': lookback_days,
+        'rows': rows,
+        'totalRows': sum(rows.values()),
+        'generateSeconds': generate_seconds,
+        'deriveSeconds': derive_seconds,
+        'functions': results,
+    }
+
+def compare(report, baseline):
+    """Print each function's best time relative to the matching case of a baseline report"""
+    previous = {(c['years'], c['profile'], c['lookbackDays']): c for c in baseline['cases']}
+    for case in report['cases']:
+        before = previous.get((case['years'], case['profile'], case['lookbackDays']))
+        if not before:
+            continue
+        for name, now in case['functions'].items():
+            if name in before['functions']:
+                ratio = now['best'] / before['functions'][name]['best']
+                print(f"  {case['years']:>4}y {case['profile']:<6} {name:<30} {ratio:6.2f}x of baseline")
+
+def run(years_list, profiles, repeat, seed, lookback_days, output, baseline):
+    report = {
+        'generatedAt': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+        },
+        'seed': seed,
+        'repeat': repeat,
+        'cases': [],
+    }
+
+    for years in years_list:
+        for profile in profiles:
+            case = run_case(years, profile, repeat, seed, lookback_days)
+            report['cases'].append(case)
+            print(f"{years:>4}y {profile:<6} {case['totalRows']:>8} rows")
+            for name, result in case['functions'].items():
+                print(f"    {name:<30} best {result['best'] * 1000:9.1f} ms  "
+                      f"mean {result['mean'] * 1000:9.1f} ms  peak {result['peakBytes'] / 2 ** 20:7.1f} MiB")
+
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {output}")
+
+    if baseline:
+        with open(baseline) as f:
+            compare(report, json.load(f))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=float, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--profiles', nargs='+', default=['light', 'heavy'], choices=['light', 'standard', 'heavy'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42, help='RNG seed for the generated histories and permutation tests')
+    parser.add_argument('--lookback-days', type=int, default=None,
+                        help='Analyze only this many recent days, as /patterns does (default: whole history)')
+    parser.add_argument('--output', default='pattern-benchmark.json')
+    parser.add_argument('--baseline', default=None, help='Earlier report to compare best times against')
+    args = parser.parse_args()
+    run(args.years, args.profiles, args.repeat, args.seed, args.lookback_days, args.output, args.baseline)
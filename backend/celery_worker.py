@@ -0,0 +1,5 @@
+# Celery worker entry point: celery -A celery_worker worker --loglevel=info
+from app import create_app
+
+app = create_app()
+celery_app = app.extensions['celery']
@@ -0,0 +1,30 @@
+"""drop batch result patterns
+
+Revision ID: 89e8f24d6356
+Revises: 1316f354a6e2
+Create Date: 2026-10-17 23:17:06.281582
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '89e8f24d6356'
+down_revision = '1316f354a6e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The nightly batch used to store each result as its own pattern row, which
+    # nothing read; it now writes the analysis_result record instead
+    op.execute(
+        "DELETE FROM patterns WHERE pattern_type IN ('correlation', 'trigger', 'pattern') "
+        "AND id NOT IN (SELECT related_pattern_id FROM alerts WHERE related_pattern_id IS NOT NULL)"
+    )
+
+
+def downgrade():
+    # The deleted rows are rebuilt by running the batch on the previous revision
+    pass
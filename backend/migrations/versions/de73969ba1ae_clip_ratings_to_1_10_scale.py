@@ -0,0 +1,40 @@
+"""clip ratings to 1-10 scale
+
+Revision ID: de73969ba1ae
+Revises: 89e8f24d6356
+Create Date: 2026-10-17 23:21:34.671869
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'de73969ba1ae'
+down_revision = '89e8f24d6356'
+branch_labels = None
+depends_on = None
+
+
+# Rating columns on a 1-10 scale, by table
+RATING_COLUMNS = {
+    'symptom_logs': 'severity',
+    'activity_logs': 'intensity',
+    'mood_logs': 'mood_rating',
+}
+
+
+def upgrade():
+    # Ratings were not range checked before; analysis loads them as int8, so
+    # out-of-range values broke it. Clip them onto the scale the routes now enforce.
+    # Rollups built from the old values are refreshed by `flask analysis backfill-rollups`.
+    for table, column in RATING_COLUMNS.items():
+        op.execute(
+            f"UPDATE {table} SET {column} = CASE WHEN {column} < 1 THEN 1 ELSE 10 END "
+            f"WHERE {column} < 1 OR {column} > 10"
+        )
+
+
+def downgrade():
+    # The original out-of-range values are not kept
+    pass
@@ -17,7 +17,11 @@ def make_shell_context():
         'EnvironmentLog': EnvironmentLog,
         'Pattern': Pattern,
         'Alert': Alert,
-        'Report': Report
+        'Report': Report,
+        'DailyRollup': DailyRollup,
+        'CorrelationStats': CorrelationStats,
+        'FoodSymptomCount': FoodSymptomCount,
+        'InsightCache': InsightCache
     }
 
 if __name__ == '__main__':
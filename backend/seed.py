@@ -10,6 +10,209 @@ from app.models.activity import ActivityLog
 from app.models.mood import MoodLog
 from app.models.environment import EnvironmentLog
 from app.models.pattern import Pattern
+from app.services.rollups import rebuild_user_rollups
+from app.services.cooccurrence import rebuild_cooccurrence
+
+DAYS_TO_SEED = 90
+
+# Data categories
+FOODS = {
+    "breakfast": ["Oatmeal", "Eggs and Toast", "Smoothie", "Greek Yogurt", "Pancakes"],
+    "lunch": ["Chicken Salad", "Quinoa Bowl", "Turkey Sandwich", "Lentil Soup", "Sushi"],
+    "dinner": ["Salmon and Asparagus", "Beef Stir-fry", "Pasta with Pesto", "Tofu Curry", "Steak and Potatoes"],
+    "snack": ["Apple", "Almonds", "Protein Bar", "Dark Chocolate", "Hummus and Carrots"]
+}
+ACTIVITIES = ["Walking", "Yoga", "Swimming", "Cycling", "Strength Training"]
+EMOTIONS = ["Happy", "Anxious", "Calm", "Tired", "Energetic", "Irritated", "Productive", "Stressed"]
+WEATHER_CONDITIONS = ["Sunny", "Cloudy", "Rainy", "Overcast", "Windy"]
+
+# How much a simulated user logs. "standard" is the seeded test user; light
+# loggers skip days, heavy loggers add snacks and repeat readings and check-ins.
+LOGGER_PROFILES = {
+    "light": {"log_days": 0.5, "snacks": 0.0, "env_readings": 1, "mood_checkins": 1},
+    "standard": {"log_days": 1.0, "snacks": 0.0, "env_readings": 1, "mood_checkins": 1},
+    "heavy": {"log_days": 1.0, "snacks": 0.9, "env_readings": 4, "mood_checkins": 3},
+}
+
+MEDICATIONS = [
+    {"name": "Lisinopril", "dosage": "10mg", "frequency": "Daily", "purpose": "Blood Pressure"},
+    {"name": "Zyrtec", "dosage": "10mg", "frequency": "As needed", "purpose": "Allergies"},
+    {"name": "Magnesium", "dosage": "250mg", "frequency": "Daily", "purpose": "Sleep Support"}
+]
+
+def seed_medications(user_id, days):
+    """Add the seeded medication list for a user whose history starts `days` ago"""
+    created_meds = []
+    for med_data in MEDICATIONS:
+        med = Medication(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            name=med_data["name"],
+            dosage=med_data["dosage"],
+            frequency=med_data["frequency"],
+            start_date=(datetime.now() - timedelta(days=days)).date(),
+            purpose=med_data["purpose"],
+            active=True
+        )
+        db.session.add(med)
+        created_meds.append(med)
+    # Logs are bulk inserted with Core, so the medications must exist first
+    db.session.flush()
+    return created_meds
+
+def generate_history(user_id, medications, days, profile="standard", rng=random, now=None):
+    """
+    Yield (model, row) pairs of patterned health logs for the last `days` days.
+
+    The patterns are the ones analysis should find: humid spells bring joint
+    pain and low mood, "Pasta with Pesto" dinners bring nausea, and weekend
+    medication adherence drops. Pass a seeded random.Random as rng for a
+    reproducible history.
+    """
+    settings = LOGGER_PROFILES[profile]
+    now = now or datetime.now()
+
+    for i in range(days):
+        current_date = now - timedelta(days=i)
+        if settings["log_days"] < 1 and rng.random() >= settings["log_days"]:
+            continue
+
+        # --- ENVIRONMENTAL FACTORS ---
+        # Simulate a rainy spell for joint pain patterns (repeating every 90 days)
+        is_rainy_spell = (20 < i % 90 < 30) or (50 < i % 90 < 60)
+        humidity = rng.uniform(70, 90) if is_rainy_spell else rng.uniform(30, 60)
+        weather = "Rainy" if is_rainy_spell else rng.choice(WEATHER_CONDITIONS)
+
+        for reading in range(settings["env_readings"]):
+            yield EnvironmentLog, dict(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                timestamp=current_date.replace(hour=12 + reading * 3, minute=0),
+                temperature=rng.uniform(50, 75),
+                humidity=humidity,
+                pressure=rng.uniform(29.8, 30.2),
+                air_quality_index=rng.randint(20, 60),
+                weather_condition=weather,
+                location="Cumming, Georgia, US"
+            )
+
+        # --- FOOD LOGS ---
+        # User frequently eats "Pasta with Pesto" which we'll correlate with "Nausea"
+        dinner_choice = "Pasta with Pesto" if (i % 3 == 0) else rng.choice(FOODS["dinner"])
+
+        for meal_type in ["breakfast", "lunch", "dinner"]:
+            yield FoodLog, dict(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                food_name=dinner_choice if meal_type == "dinner" else rng.choice(FOODS[meal_type]),
+                meal_type=meal_type,
+                timestamp=current_date.replace(
+                    hour={"breakfast": 8, "lunch": 13, "dinner": 19}[meal_type],
+                    minute=rng.randint(0, 59)
+                ),
+                portion_size="Medium"
+            )
+
+        if settings["snacks"] and rng.random() < settings["snacks"]:
+            yield FoodLog, dict(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                food_name=rng.choice(FOODS["snack"]),
+                meal_type="snack",
+                timestamp=current_date.replace(hour=15, minute=rng.randint(0, 59)),
+                portion_size="Small"
+            )
+
+        # --- SYMPTOMS (PATTERNED) ---
+        # Pattern 1: High humidity -> Joint Pain (70% correlation)
+        if humidity > 65 and rng.random() < 0.7:
+            yield SymptomLog, dict(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                symptom_name="Joint Pain",
+                severity=rng.randint(6, 9),
+                timestamp=current_date.replace(hour=10, minute=0),
+                duration_minutes=240,
+                notes="High humidity today."
+            )
+
+        # Pattern 2: Pasta with Pesto -> Nausea (80% correlation)
+        if dinner_choice == "Pasta with Pesto" and rng.random() < 0.8:
+            yield SymptomLog, dict(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                symptom_name="Nausea",
+                severity=rng.randint(5, 8),
+                timestamp=current_date.replace(hour=21, minute=30),
+                duration_minutes=120,
+                notes="After dinner."
+            )
+
+        # Pattern 3: Random mild fatigue
+        if rng.random() < 0.2:
+            yield SymptomLog, dict(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                symptom_name="Fatigue",
+                severity=rng.randint(2, 4),
+                timestamp=current_date.replace(hour=15, minute=0),
+                duration_minutes=60
+            )
+
+        # --- MEDICATION (Realistic Adherence) ---
+        # Adherence drops on weekends (pattern detection opportunity)
+        is_weekend = current_date.weekday() >= 5
+        adherence = 0.6 if is_weekend else 0.95
+
+        for med in medications:
+            if med.frequency == "Daily":
+                yield MedicationLog, dict(
+                    id=str(uuid.uuid4()),
+                    user_id=user_id,
+                    medication_id=med.id,
+                    timestamp=current_date.replace(hour=8, minute=0),
+                    taken=rng.random() < adherence
+                )
+
+        # --- MOOD & ACTIVITY ---
+        # Joint pain leads to lower mood
+        mood_base = 4 if humidity > 65 else 7
+        for checkin in range(settings["mood_checkins"]):
+            yield MoodLog, dict(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                mood_rating=max(1, min(10, mood_base + rng.randint(-1, 2))),
+                emotions=rng.sample(EMOTIONS, 2),
+                timestamp=current_date.replace(hour=20 - checkin * 4, minute=0)
+            )
+
+        if rng.random() > 0.3:
+            yield ActivityLog, dict(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                activity_type=rng.choice(ACTIVITIES),
+                duration_minutes=rng.choice([30, 45, 60]),
+                intensity=rng.randint(3, 7),
+                timestamp=current_date.replace(hour=17, minute=0)
+            )
+
+def insert_history(rows, batch_size=5000):
+    """Bulk insert (model, row) pairs from generate_history, batched per table and column set"""
+    batches = {}
+    counts = {}
+    for model, row in rows:
+        # Executemany needs every row in a batch to bind the same columns
+        batch = batches.setdefault((model, tuple(row)), [])
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(model.__table__.insert(), batch)
+            batch.clear()
+        counts[model.__tablename__] = counts.get(model.__tablename__, 0) + 1
+    for (model, _), batch in batches.items():
+        if batch:
+            db.session.execute(model.__table__.insert(), batch)
+    db.session.commit()
+    return counts
 
 def seed_data():
     app = create_app()
@@ -46,160 +249,17 @@ def seed_data():
         user_id = user.id
 
         # Medications
-        meds = [
-            {"name": "Lisinopril", "dosage": "10mg", "frequency": "Daily", "purpose": "Blood Pressure"},
-            {"name": "Zyrtec", "dosage": "10mg", "frequency": "As needed", "purpose": "Allergies"},
-            {"name": "Magnesium", "dosage": "250mg", "frequency": "Daily", "purpose": "Sleep Support"}
-        ]
-        
-        created_meds = []
-        for med_data in meds:
-            med = Medication(
-                id=str(uuid.uuid4()),
-                user_id=user_id,
-                name=med_data["name"],
-                dosage=med_data["dosage"],
-                frequency=med_data["frequency"],
-                start_date=(datetime.now() - timedelta(days=90)).date(),
-                purpose=med_data["purpose"],
-                active=True
-            )
-            db.session.add(med)
-            created_meds.append(med)
-        
-        # Data categories
-        foods = {
-            "breakfast": ["Oatmeal", "Eggs and Toast", "Smoothie", "Greek Yogurt", "Pancakes"],
-            "lunch": ["Chicken Salad", "Quinoa Bowl", "Turkey Sandwich", "Lentil Soup", "Sushi"],
-            "dinner": ["Salmon and Asparagus", "Beef Stir-fry", "Pasta with Pesto", "Tofu Curry", "Steak and Potatoes"],
-            "snack": ["Apple", "Almonds", "Protein Bar", "Dark Chocolate", "Hummus and Carrots"]
-        }
-        activities = ["Walking", "Yoga", "Swimming", "Cycling", "Strength Training"]
-        emotions_list = ["Happy", "Anxious", "Calm", "Tired", "Energetic", "Irritated", "Productive", "Stressed"]
-        weather_conditions = ["Sunny", "Cloudy", "Rainy", "Overcast", "Windy"]
-
-        now = datetime.now()
-        days_to_seed = 90
-        print(f"Generating {days_to_seed} days of realistic health patterns...")
-        
-        for i in range(days_to_seed):
-            current_date = now - timedelta(days=i)
-            
-            # --- ENVIRONMENTAL FACTORS ---
-            # Simulate a rainy spell for joint pain patterns
-            is_rainy_spell = (20 < i < 30) or (50 < i < 60)
-            humidity = random.uniform(70, 90) if is_rainy_spell else random.uniform(30, 60)
-            weather = "Rainy" if is_rainy_spell else random.choice(weather_conditions)
-            
-            env = EnvironmentLog(
-                id=str(uuid.uuid4()),
-                user_id=user_id,
-                timestamp=current_date.replace(hour=12, minute=0),
-                temperature=random.uniform(50, 75),
-                humidity=humidity,
-                pressure=random.uniform(29.8, 30.2),
-                air_quality_index=random.randint(20, 60),
-                weather_condition=weather,
-                location="Cumming, Georgia, US"
-            )
-            db.session.add(env)
-
-            # --- FOOD LOGS ---
-            # User frequently eats "Pasta with Pesto" which we'll correlate with "Nausea"
-            dinner_choice = "Pasta with Pesto" if (i % 3 == 0) else random.choice(foods["dinner"])
-            
-            for meal_type in ["breakfast", "lunch", "dinner"]:
-                food = FoodLog(
-                    id=str(uuid.uuid4()),
-                    user_id=user_id,
-                    food_name=dinner_choice if meal_type == "dinner" else random.choice(foods[meal_type]),
-                    meal_type=meal_type,
-                    timestamp=current_date.replace(
-                        hour={"breakfast": 8, "lunch": 13, "dinner": 19}[meal_type],
-                        minute=random.randint(0, 59)
-                    ),
-                    portion_size="Medium"
-                )
-                db.session.add(food)
-
-            # --- SYMPTOMS (PATTERNED) ---
-            # Pattern 1: High humidity -> Joint Pain (70% correlation)
-            if humidity > 65 and random.random() < 0.7:
-                symptom = SymptomLog(
-                    id=str(uuid.uuid4()),
-                    user_id=user_id,
-                    symptom_name="Joint Pain",
-                    severity=random.randint(6, 9),
-                    timestamp=current_date.replace(hour=10, minute=0),
-                    duration_minutes=240,
-                    notes="High humidity today."
-                )
-                db.session.add(symptom)
-
-            # Pattern 2: Pasta with Pesto -> Nausea (80% correlation)
-            if dinner_choice == "Pasta with Pesto" and random.random() < 0.8:
-                symptom = SymptomLog(
-                    id=str(uuid.uuid4()),
-                    user_id=user_id,
-                    symptom_name="Nausea",
-                    severity=random.randint(5, 8),
-                    timestamp=current_date.replace(hour=21, minute=30),
-                    duration_minutes=120,
-                    notes="After dinner."
-                )
-                db.session.add(symptom)
-            
-            # Pattern 3: Random mild fatigue
-            if random.random() < 0.2:
-                symptom = SymptomLog(
-                    id=str(uuid.uuid4()),
-                    user_id=user_id,
-                    symptom_name="Fatigue",
-                    severity=random.randint(2, 4),
-                    timestamp=current_date.replace(hour=15, minute=0),
-                    duration_minutes=60
-                )
-                db.session.add(symptom)
-
-            # --- MEDICATION (Realistic Adherence) ---
-            # Adherence drops on weekends (pattern detection opportunity)
-            is_weekend = current_date.weekday() >= 5
-            adherence = 0.6 if is_weekend else 0.95
-            
-            for med in created_meds:
-                if med.frequency == "Daily":
-                    db.session.add(MedicationLog(
-                        id=str(uuid.uuid4()),
-                        user_id=user_id,
-                        medication_id=med.id,
-                        timestamp=current_date.replace(hour=8, minute=0),
-                        taken=random.random() < adherence
-                    ))
-
-            # --- MOOD & ACTIVITY ---
-            # Joint pain leads to lower mood
-            mood_base = 4 if humidity > 65 else 7
-            mood = MoodLog(
-                id=str(uuid.uuid4()),
-                user_id=user_id,
-                mood_rating=max(1, min(10, mood_base + random.randint(-1, 2))),
-                emotions=random.sample(emotions_list, 2),
-                timestamp=current_date.replace(hour=20, minute=0)
-            )
-            db.session.add(mood)
+        created_meds = seed_medications(user_id, DAYS_TO_SEED)
 
-            if random.random() > 0.3:
-                db.session.add(ActivityLog(
-                    id=str(uuid.uuid4()),
-                    user_id=user_id,
-                    activity_type=random.choice(activities),
-                    duration_minutes=random.choice([30, 45, 60]),
-                    intensity=random.randint(3, 7),
-                    timestamp=current_date.replace(hour=17, minute=0)
-                ))
+        print(f"Generating {DAYS_TO_SEED} days of realistic health patterns...")
+        insert_history(generate_history(user_id, created_meds, DAYS_TO_SEED))
+        db.session.commit()
 
+        # Logs were inserted directly, so build the daily rollups and food x symptom counts in one pass
+        rebuild_user_rollups(user_id)
+        rebuild_cooccurrence(user_id)
         db.session.commit()
-        print(f"90 days of patterned data for '{email}' generated successfully!")
+        print(f"{DAYS_TO_SEED} days of patterned data for '{email}' generated successfully!")
 
 if __name__ == "__main__":
     seed_data()
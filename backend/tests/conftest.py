@@ -0,0 +1,122 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app import create_app, db, tasks
+from app.services import ai_service
+from app.utils import http_client
+from app.config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    # Queued tasks go to an in-memory broker and are never run
+    CELERY_BROKER_URL = 'memory://'
+    CELERY_RESULT_BACKEND = 'cache+memory://'
+    CELERY_TASK_ALWAYS_EAGER = False
+    ANALYSIS_SNAPSHOT_DIR = None
+    ANALYSIS_TIMING = False
+    OPENWEATHER_API_KEY = 'test-key'
+
+class FakeTask:
+    """Stands in for the pattern analysis task, recording what was queued"""
+
+    def __init__(self):
+        self.calls = []
+        self.error = None  # raised on enqueue when set, like an unreachable broker
+
+    def apply_async(self, args, countdown):
+        if self.error:
+            raise self.error
+        self.calls.append(args)
+
+@pytest.fixture
+def task(monkeypatch):
+    fake = FakeTask()
+    monkeypatch.setattr(tasks, 'run_pattern_analysis', fake)
+    return fake
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(client):
+    response = client.post('/api/auth/register', json={
+        'email': 'test@example.com', 'password': 'password123', 'name': 'Test User'
+    })
+    return {'Authorization': f"Bearer {response.get_json()['data']['token']}"}
+
+@pytest.fixture
+def user(app, auth_headers):
+    from app.models.user import User
+    return User.query.filter_by(email='test@example.com').one()
+
+class ModelServer:
+    """
+    A local stand-in for the Hugging Face chat completion API. Replies with
+    `status`, and on success with `content` (or, for stream requests,
+    `pieces` as server-sent events split mid-character).
+    """
+
+    def __init__(self):
+        self.status = 200
+        self.content = 'Headaches tend to follow short nights.'
+        self.pieces = ['Headaches ', 'follow ', 'short nights.']
+        self.content_type = 'text/event-stream'
+        self.requests = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.url = f'http://127.0.0.1:{self.server.server_port}/v1/chat/completions'
+
+    def _handler(self):
+        model = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)))
+                model.requests.append(payload)
+                if model.status != 200:
+                    body, content_type = b'{"error": "unavailable"}', 'application/json'
+                elif payload.get('stream'):
+                    events = ''.join(
+                        f'data: {json.dumps({"choices": [{"delta": {"content": p}}]}, ensure_ascii=False)}\n\n'
+                        for p in model.pieces
+                    )
+                    body, content_type = (events + 'data: [DONE]\n\n').encode('utf-8'), model.content_type
+                else:
+                    body = json.dumps({'choices': [{'message': {'content': model.content}}]}).encode('utf-8')
+                    content_type = 'application/json'
+                self.send_response(model.status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                for i in range(0, len(body), 7):
+                    self.wfile.write(body[i:i + 7])
+                    self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+@pytest.fixture
+def model_server(monkeypatch):
+    """Point the AI service at a ModelServer, without real retry backoff"""
+    model = ModelServer()
+    threading.Thread(target=model.server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(ai_service, 'HF_TOKEN', 'test-token')
+    monkeypatch.setattr(ai_service, 'HF_API_URL', model.url)
+    monkeypatch.setattr(http_client, '_sessions', {})
+    monkeypatch.setattr(http_client, 'RETRY_BACKOFF_FACTOR', 0)
+    yield model
+    model.server.shutdown()
+    model.server.server_close()
@@ -0,0 +1,10 @@
+import pytest
+from app.services import ai_service
+
+TEXT = ['Café days ', 'bring naïve ', 'headaches — ', 'rest 😴']
+
+@pytest.mark.parametrize('content_type', ['text/event-stream', 'text/event-stream; charset=utf-8'])
+def test_stream_decodes_utf8(app, model_server, content_type):
+    model_server.pieces = TEXT
+    model_server.content_type = content_type
+    assert list(ai_service.stream_health_insights([])) == TEXT
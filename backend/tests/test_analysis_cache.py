@@ -0,0 +1,33 @@
+from datetime import datetime
+from app import create_app
+from app.config import Config
+from app.services import analysis_cache
+from app.services.analysis_cache import get_analysis_cache, get_cached_analysis
+
+class SmallCacheConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    ANALYSIS_CACHE_SIZE = 2
+
+def test_cache_is_sized_from_the_app_config(app):
+    assert get_analysis_cache().max_entries == app.config['ANALYSIS_CACHE_SIZE']
+
+    small = create_app(SmallCacheConfig)
+    with small.app_context():
+        assert get_analysis_cache().max_entries == 2
+    assert small.extensions['analysis_cache'] is not app.extensions['analysis_cache']
+
+def test_unchanged_versions_are_served_from_the_cache(app, user, monkeypatch):
+    runs = []
+    monkeypatch.setattr(analysis_cache, 'analyze_correlations', lambda user_id, data, seed: runs.append(seed) or [])
+    window = (datetime(2026, 1, 1), datetime(2026, 2, 1))
+
+    get_cached_analysis(user.id, 1, *window)
+    get_cached_analysis(user.id, 1, *window)
+    assert len(runs) == 1
+    assert get_analysis_cache().hits == 1
+
+    # A new version, or another window, is analyzed again
+    get_cached_analysis(user.id, 2, *window)
+    get_cached_analysis(user.id, 2, datetime(2026, 1, 15), window[1])
+    assert len(runs) == 3
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from app import db
+from app.services.analysis_jobs import get_analysis_record, schedule_pattern_analysis, job_in_progress, _update_record
+
+def _ago(seconds):
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+
+def test_enqueue_failure_marks_job_failed(user, task):
+    task.error = ConnectionError('broker down')
+    with pytest.raises(ConnectionError):
+        schedule_pattern_analysis(user.id)
+
+    variables = get_analysis_record(user.id).variables
+    assert variables['status'] == 'failed'
+    assert 'broker down' in variables['error']
+
+def test_log_write_survives_enqueue_failure(client, auth_headers, user, task):
+    task.error = ConnectionError('broker down')
+    response = client.post('/api/mood', headers=auth_headers, json={'moodRating': 5})
+    assert response.status_code == 201
+
+    # The failed job is queued again on the next read once the broker is back
+    task.error = None
+    job = client.get('/api/analysis/patterns', headers=auth_headers).get_json()['data']['job']
+    assert job['status'] == 'queued'
+    assert len(task.calls) == 1
+
+def test_job_in_progress_times_out(app, user, task):
+    schedule_pattern_analysis(user.id)
+    record = get_analysis_record(user.id)
+    assert job_in_progress(record)
+
+    timeout = app.config['ANALYSIS_JOB_TIMEOUT_SECONDS'] + app.config['ANALYSIS_DEBOUNCE_SECONDS']
+    _update_record(record, requestedAt=_ago(timeout + 1))
+    assert not job_in_progress(record)
+
+    _update_record(record, status='running', startedAt=_ago(10))
+    assert job_in_progress(record)
+    _update_record(record, startedAt=_ago(app.config['ANALYSIS_JOB_TIMEOUT_SECONDS'] + 1))
+    assert not job_in_progress(record)
+
+def test_stale_queued_job_is_requeued(client, auth_headers, user, task):
+    schedule_pattern_analysis(user.id)
+    client.get('/api/analysis/patterns', headers=auth_headers)
+    assert len(task.calls) == 1  # still queued, not queued again
+
+    record = get_analysis_record(user.id)
+    _update_record(record, requestedAt=_ago(24 * 3600))
+    db.session.commit()
+    client.get('/api/analysis/patterns', headers=auth_headers)
+    assert len(task.calls) == 2
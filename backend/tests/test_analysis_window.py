@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+import pytest
+from app.services.analysis_jobs import run_pattern_analysis_job
+from app.services.pattern_analysis import DEFAULT_LOOKBACK_DAYS
+
+TODAY = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _day(days_ago):
+    return (TODAY - timedelta(days=days_ago)).date().isoformat()
+
+@pytest.fixture
+def episodes(client, auth_headers, task):
+    """Severe headaches preceded by wine in the last week and by cheese about 200 days ago"""
+    for food, days in [('Wine', [5, 6, 7]), ('Cheese', [200, 201, 202])]:
+        for days_ago in days:
+            day = TODAY - timedelta(days=days_ago)
+            client.post('/api/food', headers=auth_headers, json={
+                'foodName': food, 'mealType': 'dinner', 'timestamp': (day + timedelta(hours=8)).isoformat()
+            })
+            client.post('/api/symptoms', headers=auth_headers, json={
+                'symptomName': 'Headache', 'severity': 8, 'timestamp': (day + timedelta(hours=12)).isoformat()
+            })
+
+def _patterns(client, auth_headers, **params):
+    response = client.get('/api/analysis/patterns', headers=auth_headers, query_string=params)
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    return data['window'], {r['item'] for r in data['correlations'] if r['type'] == 'trigger'}
+
+def _triggers(client, auth_headers, **params):
+    response = client.get('/api/analysis/triggers', headers=auth_headers, query_string=params)
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    return data['window'], {t['food'] for t in data['triggers'].get('Headache', [])}
+
+@pytest.mark.parametrize('url', ['/api/analysis/patterns', '/api/analysis/triggers'])
+@pytest.mark.parametrize('params', [
+    {'startDate': 'yesterday'},
+    {'endDate': '2026-13-01'},
+    {'startDate': '2026-03-10', 'endDate': '2026-03-01'},
+    {'lookbackDays': '0'},
+    {'lookbackDays': 'ninety'},
+])
+def test_invalid_windows_are_rejected(client, auth_headers, url, params):
+    response = client.get(url, headers=auth_headers, query_string=params)
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['success'] is False
+    assert body['error'].startswith('Invalid date range')
+
+def test_single_day_window_is_valid(client, auth_headers):
+    response = client.get('/api/analysis/triggers', headers=auth_headers,
+                          query_string={'startDate': '2026-03-01', 'endDate': '2026-03-01'})
+    assert response.get_json()['data']['window'] == {'startDate': '2026-03-01', 'endDate': '2026-03-01'}
+
+def test_default_window_is_the_lookback(client, auth_headers, user, episodes, task):
+    default = {'startDate': _day(DEFAULT_LOOKBACK_DAYS - 1), 'endDate': _day(0)}
+
+    # The stored analysis covers the default window only
+    assert run_pattern_analysis_job(*task.calls[-1]) == 'complete'
+    assert _patterns(client, auth_headers) == (default, {'Wine'})
+    assert _triggers(client, auth_headers) == (default, {'Wine'})
+
+def test_logs_outside_the_window_are_excluded(client, auth_headers, episodes):
+    old = {'startDate': _day(210), 'endDate': _day(190)}
+    assert _patterns(client, auth_headers, **old) == (old, {'Cheese'})
+    assert _triggers(client, auth_headers, **old) == (old, {'Cheese'})
+
+    year = {'startDate': _day(364), 'endDate': _day(0)}
+    assert _patterns(client, auth_headers, lookbackDays=365) == (year, {'Wine', 'Cheese'})
+    assert _triggers(client, auth_headers, lookbackDays=365) == (year, {'Wine', 'Cheese'})
+
+    # The end date includes its whole day; the day after the last episode starts after it
+    recent = {'startDate': _day(7), 'endDate': _day(6)}
+    assert _triggers(client, auth_headers, **recent)[1] == {'Wine'}
+    assert _triggers(client, auth_headers, startDate=_day(4), endDate=_day(0))[1] == set()
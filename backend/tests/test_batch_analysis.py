@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+from app import db
+from app.services.analysis_jobs import get_analysis_record, _update_record
+from app.services.batch_analysis import analyze_user_shard
+
+def test_batch_result_is_served_by_patterns(client, auth_headers, user, task):
+    today = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+    for day in range(10):
+        ts = today - timedelta(days=day)
+        client.post('/api/symptoms', headers=auth_headers, json={'symptomName': 'Headache', 'severity': day % 5 + 1, 'timestamp': ts.isoformat()})
+        client.post('/api/mood', headers=auth_headers, json={'moodRating': 10 - day % 5, 'timestamp': ts.isoformat()})
+
+    # The writes' debounced job has since finished (or was lost)
+    _update_record(get_analysis_record(user.id), status='failed')
+    db.session.commit()
+
+    user_id, data_version = user.id, user.data_version
+    [(_, count, error, _)] = analyze_user_shard([user_id])
+    assert error is None
+
+    variables = get_analysis_record(user_id).variables
+    assert variables['dataVersion'] == data_version
+    assert variables['status'] == 'complete'
+
+    queued = len(task.calls)
+    data = client.get('/api/analysis/patterns', headers=auth_headers).get_json()['data']
+    assert len(task.calls) == queued  # served as stored, nothing recomputed or queued
+    assert data['job']['status'] == 'complete'
+    assert len(data['correlations']) == count
+    assert data['matrix']
+
+def test_batch_leaves_pending_job_status(client, auth_headers, user, task):
+    client.post('/api/mood', headers=auth_headers, json={'moodRating': 5})
+    user_id = user.id
+    analyze_user_shard([user_id])
+
+    variables = get_analysis_record(user_id).variables
+    assert variables['status'] == 'queued'
+    assert variables['jobId'] == task.calls[-1][1]
@@ -0,0 +1,119 @@
+from datetime import datetime
+import pytest
+from app import db
+from app.models.food_symptom import FoodSymptomCount
+from app.models.user import User
+from app.services import cooccurrence
+from app.services.cooccurrence import load_cooccurrence, food_trigger_scores, rebuild_cooccurrence
+
+pytestmark = pytest.mark.usefixtures('task')
+
+# Foods and the symptom episodes after them. Within the 12 hour window:
+#   Headache 03-01  Wine, Cheese
+#   Headache 03-02  Wine (twice, counted once)
+#   Headache 03-03  Bread
+#   Nausea   03-04  Wine
+#   Nausea   03-05  Cheese
+#   Nausea   03-06  nothing (Bread is 12.5 hours before)
+#   Headache 03-07  Wine (exactly 12 hours before)
+FOODS = [
+    ('Wine', '2026-03-01T08:00:00'), ('Cheese', '2026-03-01T09:00:00'),
+    ('Wine', '2026-03-02T08:00:00'), ('Wine', '2026-03-02T10:00:00'),
+    ('Bread', '2026-03-03T08:00:00'),
+    ('Wine', '2026-03-04T08:00:00'),
+    ('Cheese', '2026-03-05T08:00:00'),
+    ('Bread', '2026-03-05T23:30:00'),
+    ('Wine', '2026-03-07T00:00:00'),
+]
+EPISODES = [
+    ('Headache', '2026-03-01T12:00:00'), ('Headache', '2026-03-02T12:00:00'),
+    ('Headache', '2026-03-03T12:00:00'), ('Nausea', '2026-03-04T12:00:00'),
+    ('Nausea', '2026-03-05T12:00:00'), ('Nausea', '2026-03-06T12:00:00'),
+    ('Headache', '2026-03-07T12:00:00'),
+]
+
+# Episodes preceded by each food: Headache (4 episodes) / Nausea (3), 7 in all
+TABLE = {'Bread': [1, 0], 'Cheese': [1, 1], 'Wine': [3, 1]}
+
+@pytest.fixture
+def logs(client, auth_headers):
+    for food, ts in FOODS:
+        response = client.post('/api/food', headers=auth_headers, json={'foodName': food, 'mealType': 'snack', 'timestamp': ts})
+        assert response.status_code == 201
+    for symptom, ts in EPISODES:
+        response = client.post('/api/symptoms', headers=auth_headers, json={'symptomName': symptom, 'severity': 7, 'timestamp': ts})
+        assert response.status_code == 201
+
+def _table(matrix):
+    dense = matrix['counts'].toarray()
+    return {food: dense[i].tolist() for i, food in enumerate(matrix['foods'])}
+
+@pytest.mark.parametrize('rebuilt', [False, True])
+def test_counts_match_the_hand_computed_table(logs, user, rebuilt):
+    if rebuilt:
+        rebuild_cooccurrence(user.id)
+        db.session.commit()
+    matrix = load_cooccurrence(user.id)
+
+    assert matrix['symptoms'] == ['Headache', 'Nausea']
+    assert _table(matrix) == TABLE
+    assert matrix['episodes'].tolist() == [4, 3]
+    assert matrix['total'] == 7
+
+def test_scores_match_the_hand_computed_table(logs, user):
+    matrix = load_cooccurrence(user.id)
+
+    # support = n / 7, confidence = n / episodes of the symptom,
+    # lift = confidence / (episodes preceded by the food / 7)
+    assert food_trigger_scores(matrix, 'Headache', min_episodes=1) == [
+        {'food': 'Bread', 'episodes': 1, 'support': 0.1429, 'confidence': 0.25, 'lift': 1.75},
+        {'food': 'Wine', 'episodes': 3, 'support': 0.4286, 'confidence': 0.75, 'lift': 1.31},
+        {'food': 'Cheese', 'episodes': 1, 'support': 0.1429, 'confidence': 0.25, 'lift': 0.88},
+    ]
+    assert food_trigger_scores(matrix, 'Nausea', min_episodes=1) == [
+        {'food': 'Cheese', 'episodes': 1, 'support': 0.1429, 'confidence': 0.3333, 'lift': 1.17},
+        {'food': 'Wine', 'episodes': 1, 'support': 0.1429, 'confidence': 0.3333, 'lift': 0.58},
+    ]
+    assert [s['food'] for s in food_trigger_scores(matrix, 'Headache')] == ['Wine']
+    assert food_trigger_scores(matrix, 'Migraine') == []
+
+def test_window_limits_the_episodes_counted(logs, user):
+    # 03-02 up to 03-06 keeps the Headache episodes of 03-02 and 03-03 and
+    # the Nausea episodes of 03-04 and 03-05
+    matrix = load_cooccurrence(user.id, datetime(2026, 3, 2), datetime(2026, 3, 6))
+
+    assert _table(matrix) == {'Bread': [1, 0], 'Cheese': [0, 1], 'Wine': [1, 1]}
+    assert matrix['episodes'].tolist() == [2, 2]
+    assert matrix['total'] == 4
+
+def _unbuilt(user):
+    """As a user from before the index existed: logs but no counts and no marker"""
+    FoodSymptomCount.query.filter_by(user_id=user.id).delete()
+    User.query.filter_by(id=user.id).update({User.cooccurrence_built: False})
+    db.session.commit()
+
+@pytest.fixture
+def rebuilds(monkeypatch):
+    calls = []
+    def counting(user_id):
+        calls.append(user_id)
+        return rebuild_cooccurrence(user_id)
+    monkeypatch.setattr(cooccurrence, 'rebuild_cooccurrence', counting)
+    return calls
+
+def test_unbuilt_users_are_rebuilt_once(logs, user, rebuilds):
+    _unbuilt(user)
+
+    assert _table(load_cooccurrence(user.id)) == TABLE
+    assert _table(load_cooccurrence(user.id)) == TABLE
+    assert rebuilds == [user.id]
+
+def test_empty_counts_are_not_rebuilt_on_every_read(client, auth_headers, user, rebuilds):
+    # Food but no symptoms: nothing co-occurs, so there are never any count rows
+    client.post('/api/food', headers=auth_headers, json={'foodName': 'Wine', 'mealType': 'dinner', 'timestamp': '2026-03-01T20:00:00'})
+    _unbuilt(user)
+
+    for _ in range(3):
+        matrix = load_cooccurrence(user.id)
+        assert matrix['foods'] == [] and matrix['total'] == 0
+    assert rebuilds == [user.id]
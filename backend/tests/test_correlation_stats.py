@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.correlation_stats import sufficient_stats, correlation_from_stats, load_correlation_stats, matrix_values
+from app.services.rollups import compute_daily_rollups
+
+FIRST_DAY = datetime(2026, 1, 20)
+DAYS = 75
+
+def _assert_corr_equal(actual, expected):
+    pd.testing.assert_frame_equal(actual.loc[expected.index, expected.columns], expected, check_exact=False, atol=1e-9)
+
+def _expected_corr(user_id, start=None, end=None):
+    """DataFrame.corr over the day-level matrix variables rebuilt from the raw logs"""
+    rollups = compute_daily_rollups(user_id, start, end)
+    frame = pd.DataFrame([matrix_values(rollups[day]) for day in sorted(rollups)], dtype='float64')
+    return frame.corr(min_periods=1)
+
+def _assert_matches_logs(user_id, start=None, end=None):
+    variables, totals = load_correlation_stats(user_id, start, end)
+    expected = _expected_corr(user_id, start, end)
+    assert sorted(variables) == sorted(expected.columns)
+    _assert_corr_equal(pd.DataFrame(correlation_from_stats(totals), index=variables, columns=variables), expected)
+
+@pytest.fixture
+def logs(client, auth_headers):
+    """Symptom, mood and activity logs over two and a half months, with gaps"""
+    rng = np.random.default_rng(7)
+    ids = {'symptoms': [], 'activity': []}
+    for day in range(DAYS):
+        ts = FIRST_DAY + timedelta(days=day, hours=9)
+        if rng.random() < 0.8:
+            for name in rng.choice(['Headache', 'Nausea'], size=rng.integers(1, 3)):
+                r = client.post('/api/symptoms', headers=auth_headers, json={
+                    'symptomName': str(name), 'severity': int(rng.integers(1, 11)), 'timestamp': ts.isoformat()
+                })
+                ids['symptoms'].append(r.get_json()['data']['id'])
+        if rng.random() < 0.7:
+            client.post('/api/mood', headers=auth_headers, json={
+                'moodRating': int(rng.integers(1, 11)), 'timestamp': (ts + timedelta(hours=3)).isoformat()
+            })
+        if rng.random() < 0.5:
+            r = client.post('/api/activity', headers=auth_headers, json={
+                'activityType': 'Walking', 'durationMinutes': 30, 'intensity': int(rng.integers(1, 11)),
+                'timestamp': (ts + timedelta(hours=6)).isoformat()
+            })
+            ids['activity'].append(r.get_json()['data']['id'])
+    return ids
+
+def test_stats_match_dataframe_corr():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(40, 5))
+    values[:, 3] = values[:, 0] * 2 + 1  # perfectly correlated pair
+    values[:, 4] = 3.0  # no variance
+    values[rng.random(values.shape) < 0.3] = np.nan
+    values[:38, 2] = np.nan  # only two days overlap the others
+
+    expected = pd.DataFrame(values).corr(min_periods=1)
+    _assert_corr_equal(pd.DataFrame(correlation_from_stats(sufficient_stats(values))), expected)
+
+def test_stats_sum_across_chunks():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=(30, 4))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    parts = [sufficient_stats(chunk) for chunk in np.array_split(values, 3)]
+    totals = {field: sum(part[field] for part in parts) for field in parts[0]}
+
+    _assert_corr_equal(pd.DataFrame(correlation_from_stats(totals)), pd.DataFrame(values).corr(min_periods=1))
+
+def test_full_history_matches_logs(user, logs):
+    _assert_matches_logs(user.id)
+
+def test_windows_match_logs(user, logs):
+    windows = [
+        (0, DAYS),    # whole history as an explicit window
+        (5, 40),      # partial months at both edges
+        (12, 41),     # the whole of February plus partial edges
+        (50, 58),     # inside a single month
+    ]
+    for start_day, end_day in windows:
+        _assert_matches_logs(user.id, FIRST_DAY + timedelta(days=start_day), FIRST_DAY + timedelta(days=end_day))
+
+def test_matches_logs_after_insert_edit_and_delete(client, auth_headers, user, logs):
+    window = (FIRST_DAY + timedelta(days=5), FIRST_DAY + timedelta(days=40))
+
+    client.post('/api/symptoms', headers=auth_headers, json={
+        'symptomName': 'Fatigue', 'severity': 4, 'timestamp': (FIRST_DAY + timedelta(days=20, hours=1)).isoformat()
+    })
+    _assert_matches_logs(user.id)
+    _assert_matches_logs(user.id, *window)
+
+    for symptom_id in logs['symptoms'][::7]:
+        client.put(f'/api/symptoms/{symptom_id}', headers=auth_headers, json={'severity': 10})
+    _assert_matches_logs(user.id)
+    _assert_matches_logs(user.id, *window)
+
+    for symptom_id in logs['symptoms'][::5]:
+        client.delete(f'/api/symptoms/{symptom_id}', headers=auth_headers)
+    for activity_id in logs['activity'][::3]:
+        client.delete(f'/api/activity/{activity_id}', headers=auth_headers)
+    _assert_matches_logs(user.id)
+    _assert_matches_logs(user.id, *window)
+
+def test_lag_and_permutation_correlations_match_pandas():
+    from app.services.lag_scan import lagged_correlations
+    from app.services.significance import permutation_correlations
+
+    rng = np.random.default_rng(2)
+    target = rng.normal(size=60)
+    factors = rng.normal(size=(60, 3))
+    factors[:, 2] = 1.5  # no variance
+    target[rng.random(60) < 0.2] = np.nan
+    factors[rng.random(factors.shape) < 0.2] = np.nan
+    frame = pd.DataFrame(factors)
+
+    # pandas warns on the constant column before returning NaN for it
+    with np.errstate(invalid='ignore'):
+        expected = [frame.shift(lag).corrwith(pd.Series(target)).to_numpy() for lag in range(4)]
+
+    corr, _ = lagged_correlations(target, factors, max_lag=3)
+    np.testing.assert_allclose(corr, np.array(expected), atol=1e-9)
+
+    observed, _ = permutation_correlations(target, factors, n_permutations=10, seed=0)
+    np.testing.assert_allclose(observed, expected[0], atol=1e-9)
@@ -0,0 +1,111 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from app.utils import http_client
+
+class StandIn:
+    """A local HTTP server answering each path from a script of (status, delay) replies"""
+
+    def __init__(self):
+        self.script = {}
+        self.hits = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, so connections can be reused
+
+            def _reply(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self.rfile.read(length)
+                stand_in.hits.append((self.command, self.path))
+                replies = stand_in.script.get(self.path, [])
+                status, delay = replies.pop(0) if len(replies) > 1 else (replies[0] if replies else (200, 0))
+                time.sleep(delay)
+                body = b'{"ok": true}'
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if status in (429, 503):
+                    self.send_header('Retry-After', '0')
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def count(self, method, path):
+        return self.hits.count((method, path))
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    # Fresh sessions and metrics, without real backoff sleeps
+    monkeypatch.setattr(http_client, '_sessions', {})
+    monkeypatch.setattr(http_client, '_metrics', {})
+    monkeypatch.setattr(http_client, 'RETRY_BACKOFF_FACTOR', 0)
+    server = StandIn()
+    thread = threading.Thread(target=server.server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+@pytest.mark.parametrize('status', [429, 500, 503])
+def test_get_retries_throttling_and_server_errors(stand_in, status):
+    stand_in.script['/weather'] = [(status, 0), (status, 0), (200, 0)]
+    response = http_client.http_get('openweather', f'{stand_in.url}/weather')
+    assert response.status_code == 200
+    assert stand_in.count('GET', '/weather') == 3
+
+def test_retries_give_back_the_last_response(stand_in):
+    stand_in.script['/weather'] = [(503, 0)]
+    response = http_client.http_get('openweather', f'{stand_in.url}/weather')
+    assert response.status_code == 503
+    # The first attempt plus two retries
+    assert stand_in.count('GET', '/weather') == 3
+
+def test_client_errors_are_not_retried(stand_in):
+    stand_in.script['/weather'] = [(404, 0)]
+    assert http_client.http_get('openweather', f'{stand_in.url}/weather').status_code == 404
+    assert stand_in.count('GET', '/weather') == 1
+
+def test_post_retries_follow_the_integration(stand_in):
+    stand_in.script['/weather'] = [(503, 0), (200, 0)]
+    stand_in.script['/chat'] = [(503, 0), (200, 0)]
+    assert http_client.http_post('openweather', f'{stand_in.url}/weather').status_code == 503
+    assert stand_in.count('POST', '/weather') == 1
+    assert http_client.http_post('huggingface', f'{stand_in.url}/chat').status_code == 200
+    assert stand_in.count('POST', '/chat') == 2
+
+@pytest.mark.parametrize('integration', ['openweather', 'huggingface'])
+def test_post_timeouts_are_not_retried(stand_in, integration):
+    stand_in.script['/slow'] = [(200, 0.5)]
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        http_client.http_post(integration, f'{stand_in.url}/slow', timeout=(1, 0.1))
+    time.sleep(0.5)
+    assert stand_in.count('POST', '/slow') == 1
+    assert http_client.integration_metrics()[integration]['errors'] == 1
+
+def test_get_timeouts_are_retried(stand_in):
+    stand_in.script['/slow'] = [(200, 0.5), (200, 0)]
+    response = http_client.http_get('openweather', f'{stand_in.url}/slow', timeout=(1, 0.1))
+    assert response.status_code == 200
+    assert stand_in.count('GET', '/slow') == 2
+
+def test_connections_are_reused(stand_in):
+    for _ in range(5):
+        assert http_client.http_get('openweather', f'{stand_in.url}/weather').status_code == 200
+    metrics = http_client.integration_metrics()['openweather']
+    assert metrics['requests'] == 5
+    assert metrics['attempts'] == 5
+    assert metrics['connectionsOpened'] == 1
+    assert metrics['reuseRate'] == 0.8
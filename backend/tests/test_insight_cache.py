@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models.insight_cache import InsightCache
+from app.services import ai_service, analysis_jobs
+from app.services.ai_service import AIServiceError
+from app.services.analysis_jobs import get_analysis_record, run_insight_job, _get_or_create_record, _update_record
+from app.services.insight_cache import INSIGHT_ACCESS_WRITE_INTERVAL, lookup_insight, store_insight
+
+START, END = '2026-01-01T00:00:00', '2026-04-01T00:00:00'
+
+@pytest.fixture
+def record(user):
+    record = _get_or_create_record(user.id)
+    _update_record(record, dataVersion=3, correlations=[], insightStatus='pending')
+    db.session.commit()
+    return record
+
+def _generate_with(monkeypatch, result):
+    def generate(messages):
+        if isinstance(result, Exception):
+            raise result
+        return result
+    monkeypatch.setattr(analysis_jobs, 'generate_health_insights', generate)
+
+def test_failed_generation_is_not_cached(user, record, monkeypatch):
+    _generate_with(monkeypatch, AIServiceError('The AI model is loading'))
+    with pytest.raises(AIServiceError):
+        run_insight_job(user.id, 3, START, END)
+
+    assert lookup_insight(user.id, '3') == (None, None)
+    assert InsightCache.query.filter_by(user_id=user.id).one().lease_owner is None
+    variables = get_analysis_record(user.id).variables
+    assert variables['insightStatus'] == 'failed'
+    assert variables['insightError'] == 'The AI model is loading'
+
+    # The next attempt generates again instead of serving the failure
+    _generate_with(monkeypatch, 'Headaches follow poor sleep.')
+    assert run_insight_job(user.id, 3, START, END) == 'complete'
+    assert lookup_insight(user.id, '3') == ('Headaches follow poor sleep.', 'fresh')
+    assert get_analysis_record(user.id).variables['insightStatus'] == 'complete'
+
+def test_missing_token_raises(monkeypatch):
+    monkeypatch.setattr(ai_service, 'HF_TOKEN', None)
+    with pytest.raises(AIServiceError, match='unavailable'):
+        ai_service.generate_health_insights([])
+    with pytest.raises(AIServiceError, match='unavailable'):
+        list(ai_service.stream_health_insights([]))
+
+def _accessed(user, ago):
+    """Back-date the entry's last access, returning the stored value"""
+    entry = InsightCache.query.filter_by(user_id=user.id).one()
+    entry.last_accessed_at = datetime.utcnow() - ago
+    db.session.commit()
+    return entry.last_accessed_at
+
+def test_hits_only_write_the_access_time_once_it_is_old(user):
+    store_insight(user.id, '3', 'Headaches follow poor sleep.')
+
+    recent = _accessed(user, INSIGHT_ACCESS_WRITE_INTERVAL - timedelta(minutes=1))
+    assert lookup_insight(user.id, '3') == ('Headaches follow poor sleep.', 'fresh')
+    db.session.expire_all()
+    assert InsightCache.query.filter_by(user_id=user.id).one().last_accessed_at == recent
+
+    old = _accessed(user, INSIGHT_ACCESS_WRITE_INTERVAL + timedelta(minutes=1))
+    assert lookup_insight(user.id, '3') == ('Headaches follow poor sleep.', 'fresh')
+    db.session.expire_all()
+    assert InsightCache.query.filter_by(user_id=user.id).one().last_accessed_at > old + INSIGHT_ACCESS_WRITE_INTERVAL
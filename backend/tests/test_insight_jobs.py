@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+import pytest
+from app import tasks
+from app.services.ai_service import AIServiceError
+from app.services.analysis_jobs import run_pattern_analysis_job, run_insight_job
+
+class FakeInsightTask:
+    """Stands in for the insight task, recording what was queued"""
+
+    def __init__(self):
+        self.calls = []
+
+    def delay(self, *args):
+        self.calls.append(args)
+
+@pytest.fixture
+def insight_task(monkeypatch):
+    fake = FakeInsightTask()
+    monkeypatch.setattr(tasks, 'generate_ai_insights', fake)
+    return fake
+
+@pytest.fixture
+def analysed(client, auth_headers, user, task, insight_task):
+    """A user whose queued analysis has run, leaving their insights pending"""
+    today = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+    for day in range(14):
+        ts = (today - timedelta(days=day)).isoformat()
+        client.post('/api/symptoms', headers=auth_headers, json={'symptomName': 'Headache', 'severity': day % 5 + 1, 'timestamp': ts})
+        client.post('/api/mood', headers=auth_headers, json={'moodRating': 10 - day % 5, 'timestamp': ts})
+
+    user_id, job_id = task.calls[-1]
+    assert run_pattern_analysis_job(user_id, job_id) == 'complete'
+    [args] = insight_task.calls
+    return args
+
+def _insights(client, auth_headers):
+    response = client.get('/api/analysis/insights', headers=auth_headers)
+    assert response.status_code == 200
+    return response.get_json()['data']
+
+def test_insights_go_from_pending_to_complete(client, auth_headers, analysed, model_server):
+    patterns = client.get('/api/analysis/patterns', headers=auth_headers).get_json()['data']
+    assert patterns['job']['status'] == 'complete'
+    assert patterns['insightStatus'] == 'pending'
+    assert patterns['aiInsights'] is None
+    assert _insights(client, auth_headers)['status'] == 'pending'
+
+    # The worker calls the model over HTTP
+    assert run_insight_job(*analysed) == 'complete'
+    [request] = model_server.requests
+    assert request['messages'][0]['role'] == 'system'
+    assert 'Headache' in request['messages'][1]['content']
+
+    insights = _insights(client, auth_headers)
+    assert insights['status'] == 'complete'
+    assert insights['aiInsights'] == model_server.content
+    assert insights['error'] is None
+    patterns = client.get('/api/analysis/patterns', headers=auth_headers).get_json()['data']
+    assert (patterns['insightStatus'], patterns['aiInsights']) == ('complete', model_server.content)
+
+def test_insights_go_from_pending_to_failed(client, auth_headers, analysed, model_server):
+    model_server.status = 500
+    with pytest.raises(AIServiceError):
+        run_insight_job(*analysed)
+    # The first attempt and both retries
+    assert len(model_server.requests) == 3
+
+    insights = _insights(client, auth_headers)
+    assert insights['status'] == 'failed'
+    assert insights['aiInsights'] is None
+    assert 'Status 500' in insights['error']
+    patterns = client.get('/api/analysis/patterns', headers=auth_headers).get_json()['data']
+    assert patterns['insightStatus'] == 'failed'
+    assert patterns['insightError'] == insights['error']
+
+    # Nothing was cached, so the next run asks the model again
+    model_server.status = 200
+    assert run_insight_job(*analysed) == 'complete'
+    assert _insights(client, auth_headers)['status'] == 'complete'
+
+def test_insight_stream_route(client, auth_headers, analysed, model_server):
+    response = client.get('/api/analysis/insights/stream', headers=auth_headers)
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    for piece in model_server.pieces:
+        assert f'event: token\ndata: {{"text": "{piece}"}}' in body
+    assert f'event: done\ndata: {{"text": "{"".join(model_server.pieces)}"}}' in body
+    assert _insights(client, auth_headers)['status'] == 'complete'
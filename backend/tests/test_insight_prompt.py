@@ -0,0 +1,78 @@
+import random
+from datetime import datetime, timedelta
+import pytest
+from app.services.insight_prompt import (
+    INSTRUCTIONS, SYSTEM_PROMPT, build_insight_messages, estimate_prompt_tokens, rank_correlations
+)
+
+# Estimated size of the system prompt and instructions alone
+FIXED_TOKENS = estimate_prompt_tokens(build_insight_messages({}, [], 10 ** 6))
+
+def _history(seed, days=365, per_day=6):
+    """A year of varied logs per summary section, oldest first"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, 8)
+    stamps = [start + timedelta(days=d, hours=h) for d in range(days) for h in range(per_day)]
+    return {
+        'symptoms': [{'timestamp': t, 'symptomName': rng.choice(['Headache', 'Nausea', 'Fatigue', 'Joint pain']),
+                      'severity': rng.randint(1, 10)} for t in stamps],
+        'foods': [{'timestamp': t, 'foodName': f'Food {rng.randint(1, 300)}',
+                   'mealType': rng.choice(['breakfast', 'lunch', 'dinner', 'snack'])} for t in stamps],
+        'moods': [{'timestamp': t, 'moodRating': rng.randint(1, 10)} for t in stamps],
+        'activities': [{'timestamp': t, 'activityType': rng.choice(['Walk', 'Run', 'Yoga']),
+                        'durationMinutes': rng.choice([15, 30, 60]), 'intensity': rng.randint(1, 10)} for t in stamps],
+    }
+
+def _patterns(seed, count):
+    rng = random.Random(seed)
+    return [{
+        'type': 'correlation',
+        'factor': f'Factor {i}',
+        'score': round(rng.uniform(-1, 1), 2),
+        'pValue': round(rng.uniform(0, 1), 3),
+        'description': f'Symptom {i % 9} is linked with factor {i} (r={rng.uniform(-1, 1):.2f})',
+    } for i in range(count)]
+
+def test_large_history_and_many_patterns_fit_the_budget():
+    messages = build_insight_messages(_history(1), _patterns(1, 500), 1200)
+    assert estimate_prompt_tokens(messages) <= 1200
+    assert messages[0] == {'role': 'system', 'content': SYSTEM_PROMPT}
+    content = messages[1]['content']
+    assert content.endswith(INSTRUCTIONS)
+    # Correlations come first, most significant first
+    best = rank_correlations(_patterns(1, 500))[0]['description']
+    assert content.startswith(f'STATISTICAL CORRELATIONS:\n- {best}\n')
+
+def test_repeated_logs_are_compressed():
+    history = _history(2, days=60)
+    content = build_insight_messages(history, [], 100000)[1]['content']
+    assert content.count('- Headache ×') == 1
+    assert 'Symptoms, 2025-01-01 to 2025-03-01:' in content
+    # Every food gets one line, however many times it was eaten
+    foods = {log['foodName'] for log in history['foods']}
+    assert sum(line.startswith('- Food ') for line in content.splitlines()) == len(foods)
+
+def test_lower_sections_are_dropped_first():
+    content = build_insight_messages(_history(3), _patterns(3, 5), 400)[1]['content']
+    assert 'STATISTICAL CORRELATIONS:' in content
+    assert 'Activity,' not in content
+
+@pytest.mark.parametrize('seed', range(25))
+def test_prompt_never_exceeds_budget(seed):
+    rng = random.Random(seed)
+    history = _history(seed, days=rng.randint(1, 120), per_day=rng.randint(1, 4))
+    for key in history:
+        if rng.random() < 0.3:
+            history[key] = []
+    patterns = _patterns(seed, rng.randint(0, 200))
+    for budget in [rng.randint(FIXED_TOKENS, 3000) for _ in range(10)]:
+        messages = build_insight_messages(history, patterns, budget)
+        assert estimate_prompt_tokens(messages) <= budget
+        assert messages == build_insight_messages(history, list(reversed(patterns)), budget)
+
+def test_budget_below_fixed_prompt_raises():
+    with pytest.raises(ValueError):
+        build_insight_messages(_history(4, days=5), _patterns(4, 5), FIXED_TOKENS - 1)
+    # Exactly the fixed prompt fits, with nothing else
+    messages = build_insight_messages(_history(4, days=5), _patterns(4, 5), FIXED_TOKENS)
+    assert messages[1]['content'] == INSTRUCTIONS
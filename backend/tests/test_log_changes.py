@@ -0,0 +1,63 @@
+import pytest
+from app import db
+from app.models.rollup import DailyRollup
+from app.models.user import User
+
+pytestmark = pytest.mark.usefixtures('task')
+
+def _version(user):
+    return db.session.get(User, user.id, populate_existing=True).data_version
+
+def _rollups(user):
+    return {
+        r.day.isoformat(): (r.symptom_count, r.symptom_max)
+        for r in DailyRollup.query.filter_by(user_id=user.id).execution_options(populate_existing=True)
+    }
+
+def _post(client, auth_headers, severity, timestamp):
+    response = client.post('/api/symptoms', headers=auth_headers, json={
+        'symptomName': 'Headache', 'severity': severity, 'timestamp': timestamp
+    })
+    assert response.status_code == 201
+    return response.get_json()['data']['id']
+
+def test_each_change_bumps_the_version_and_refreshes_its_day(client, auth_headers, user, task):
+    version = _version(user)
+
+    first = _post(client, auth_headers, 4, '2026-02-01T08:00:00')
+    _post(client, auth_headers, 6, '2026-02-01T20:00:00')
+    assert _version(user) == version + 2
+    assert _rollups(user) == {'2026-02-01': (2, 6)}
+
+    response = client.put(f'/api/symptoms/{first}', headers=auth_headers, json={'severity': 9})
+    assert response.status_code == 200
+    assert _version(user) == version + 3
+    assert _rollups(user) == {'2026-02-01': (2, 9)}
+
+    response = client.delete(f'/api/symptoms/{first}', headers=auth_headers)
+    assert response.status_code == 200
+    assert _version(user) == version + 4
+    assert _rollups(user) == {'2026-02-01': (1, 6)}
+
+    # Every change also queued an analysis of the new version
+    assert len(task.calls) == 4
+
+def test_deleting_a_days_last_log_drops_its_rollup(client, auth_headers, user):
+    _post(client, auth_headers, 3, '2026-02-01T08:00:00')
+    only = _post(client, auth_headers, 5, '2026-02-02T08:00:00')
+    version = _version(user)
+
+    response = client.delete(f'/api/symptoms/{only}', headers=auth_headers)
+    assert response.status_code == 200
+    assert _version(user) == version + 1
+    assert _rollups(user) == {'2026-02-01': (1, 3)}
+
+def test_failed_writes_leave_the_version_alone(client, auth_headers, user):
+    version = _version(user)
+
+    response = client.post('/api/symptoms', headers=auth_headers, json={
+        'symptomName': 'Headache', 'severity': 42, 'timestamp': '2026-02-01T08:00:00'
+    })
+    assert response.status_code == 400
+    assert _version(user) == version
+    assert _rollups(user) == {}
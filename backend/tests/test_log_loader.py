@@ -0,0 +1,28 @@
+import pytest
+from app.services.log_loader import LOG_COLUMNS, load_log_frame
+
+pytestmark = pytest.mark.usefixtures('task')
+
+def _dtypes(frame):
+    return {name: str(dtype) for name, dtype in frame.dtypes.items()}
+
+@pytest.mark.parametrize('key', list(LOG_COLUMNS))
+def test_empty_frames_have_the_compact_dtypes(user, key):
+    model, columns = LOG_COLUMNS[key]
+    frame = load_log_frame(model, columns, user.id)
+    assert frame.empty
+    assert _dtypes(frame) == {name: dtype for name, (_, dtype) in columns.items()}
+
+def test_loaded_frames_keep_the_compact_dtypes(client, auth_headers, user):
+    client.post('/api/symptoms', headers=auth_headers, json={'symptomName': 'Headache', 'severity': 7, 'timestamp': '2026-02-01T08:00:00'})
+    client.post('/api/symptoms', headers=auth_headers, json={'symptomName': 'Nausea', 'severity': 3, 'timestamp': '2026-02-01T09:00:00'})
+    client.post('/api/mood', headers=auth_headers, json={'moodRating': 6, 'timestamp': '2026-02-01T10:00:00'})
+
+    model, columns = LOG_COLUMNS['symptoms']
+    symptoms = load_log_frame(model, columns, user.id)
+    assert _dtypes(symptoms) == {'severity': 'int8', 'timestamp': 'datetime64[ns]', 'symptomName': 'category'}
+    assert symptoms['severity'].tolist() == [7, 3]
+    assert list(symptoms['symptomName'].cat.categories) == ['Headache', 'Nausea']
+
+    model, columns = LOG_COLUMNS['moods']
+    assert _dtypes(load_log_frame(model, columns, user.id)) == {'moodRating': 'int8', 'timestamp': 'datetime64[ns]'}
@@ -0,0 +1,102 @@
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import pytest
+from app import db
+from app.models import SymptomLog
+from app.models.rollup import DailyRollup
+from app.services.log_changes import commit_log_change
+from app.services.log_loader import LOG_COLUMNS, load_log_frame
+from app.services.log_snapshots import load_snapshot_frame
+
+pytest.importorskip('pyarrow')
+
+pytestmark = pytest.mark.usefixtures('task')
+
+@pytest.fixture(autouse=True)
+def snapshot_dir(app, tmp_path):
+    app.config['ANALYSIS_SNAPSHOT_DIR'] = str(tmp_path)
+    return tmp_path
+
+def _log(client, auth_headers, severity, timestamp):
+    response = client.post('/api/symptoms', headers=auth_headers, json={
+        'symptomName': 'Headache', 'severity': severity, 'timestamp': timestamp
+    })
+    assert response.status_code == 201
+    return response.get_json()['data']['id']
+
+def _assert_current(user, start=None, end=None):
+    """The snapshot read matches a direct database read"""
+    model, columns = LOG_COLUMNS['symptoms']
+    expected = load_log_frame(model, columns, user.id, start, end)
+    actual = load_snapshot_frame('symptoms', user.id, start, end)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    return actual
+
+def test_snapshot_follows_appends_and_backdated_logs(client, auth_headers, user):
+    _log(client, auth_headers, 3, '2026-02-01T08:00:00')
+    _log(client, auth_headers, 4, '2026-02-02T08:00:00')
+    assert len(_assert_current(user)) == 2
+    assert len(_assert_current(user)) == 2
+
+    _log(client, auth_headers, 5, '2026-02-03T08:00:00')
+    _log(client, auth_headers, 6, '2026-01-15T08:00:00')
+    assert len(_assert_current(user)) == 4
+
+@pytest.mark.parametrize('shared', [False, True])
+def test_snapshot_drops_edited_and_deleted_newest_logs(client, auth_headers, user, shared):
+    _log(client, auth_headers, 3, '2026-02-01T08:00:00')
+    newest = '2026-02-01T08:00:00' if shared else '2026-02-02T08:00:00'
+    newest_id = _log(client, auth_headers, 4, newest)
+    _assert_current(user)
+
+    response = client.put(f'/api/symptoms/{newest_id}', headers=auth_headers, json={'severity': 9})
+    assert response.status_code == 200
+    assert 9 in _assert_current(user)['severity'].tolist()
+
+    response = client.delete(f'/api/symptoms/{newest_id}', headers=auth_headers)
+    assert response.status_code == 200
+    assert _assert_current(user)['severity'].tolist() == [3]
+
+def test_snapshot_drops_rows_missing_from_the_delta(client, auth_headers, user):
+    only_id = _log(client, auth_headers, 3, '2026-02-01T08:00:00')
+    _assert_current(user)
+
+    # A removal that skipped invalidation still isn't served from the snapshot
+    db.session.delete(db.session.get(SymptomLog, only_id))
+    db.session.commit()
+    assert _assert_current(user).empty
+
+def test_windowed_cold_reads_only_load_their_window(client, auth_headers, user, snapshot_dir):
+    for day in range(1, 6):
+        _log(client, auth_headers, day, f'2026-02-0{day}T08:00:00')
+    path = snapshot_dir / user.id / 'symptoms.arrow'
+
+    # A window that has already ended is never worth a snapshot
+    assert len(_assert_current(user, datetime(2026, 2, 2), datetime(2026, 2, 4))) == 2
+    assert not path.exists()
+
+    # An open window snapshots from its start, so later windows inside it are served
+    future = datetime.utcnow() + timedelta(days=1)
+    assert len(_assert_current(user, datetime(2026, 2, 3), future)) == 3
+    built = os.path.getmtime(path)
+    assert len(_assert_current(user, datetime(2026, 2, 4), future)) == 2
+    assert os.path.getmtime(path) == built
+
+    # One reaching further back rebuilds it from the earlier start
+    assert len(_assert_current(user, datetime(2026, 2, 1), future)) == 5
+    assert len(_assert_current(user)) == 5
+    _log(client, auth_headers, 9, '2026-02-06T08:00:00')
+    assert len(_assert_current(user, datetime(2026, 2, 2), future)) == 5
+
+def test_log_changes_bucket_by_utc_day(app, user):
+    # 23:30 in New York is 04:30 the next day in UTC, which is how it is stored
+    local = datetime(2026, 2, 1, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+    db.session.add(SymptomLog(
+        id=str(uuid.uuid4()), user_id=user.id, symptom_name='Headache', severity=5,
+        timestamp=datetime(2026, 2, 2, 4, 30)
+    ))
+    commit_log_change(user.id, 'symptom', local)
+
+    assert [r.day.isoformat() for r in DailyRollup.query.filter_by(user_id=user.id)] == ['2026-02-02']
@@ -0,0 +1,32 @@
+import pytest
+from app import db
+from app.models import SymptomLog
+
+pytestmark = pytest.mark.usefixtures('task')
+
+@pytest.mark.parametrize('value', [0, 11, 200, -5, 2.5, '7', True, None])
+def test_out_of_scale_ratings_rejected(client, auth_headers, value):
+    requests = [
+        ('/api/symptoms', {'symptomName': 'Headache', 'severity': value}),
+        ('/api/activity', {'activityType': 'Walk', 'durationMinutes': 30, 'intensity': value}),
+        ('/api/mood', {'moodRating': value}),
+        ('/api/quick-log', {'type': 'mood', 'data': {'moodRating': value}}),
+        ('/api/quick-log', {'type': 'activity', 'data': {'activityType': 'Walk', 'durationMinutes': 30, 'intensity': value}}),
+        ('/api/quick-log', {'type': 'symptom', 'data': {'symptomName': 'Headache', 'severity': value}}),
+    ]
+    for url, body in requests:
+        response = client.post(url, headers=auth_headers, json=body)
+        assert response.status_code == 400, (url, body)
+        assert response.get_json()['success'] is False
+
+def test_symptom_update_checks_severity(client, auth_headers):
+    created = client.post('/api/symptoms', headers=auth_headers, json={'symptomName': 'Headache', 'severity': 10})
+    assert created.status_code == 201
+    symptom_id = created.get_json()['data']['id']
+
+    response = client.put(f'/api/symptoms/{symptom_id}', headers=auth_headers, json={'severity': 300})
+    assert response.status_code == 400
+    assert db.session.get(SymptomLog, symptom_id).severity == 10
+
+    response = client.put(f'/api/symptoms/{symptom_id}', headers=auth_headers, json={'severity': 1})
+    assert response.status_code == 200
@@ -0,0 +1,35 @@
+import logging
+from app.services import metrics
+from app.services.stage_timing import stage_histograms
+
+def test_metrics_route_needs_a_configured_token(app, client):
+    assert client.get('/api/metrics').status_code == 404
+
+    app.config['METRICS_TOKEN'] = 'ops-token'
+    assert client.get('/api/metrics').status_code == 401
+    assert client.get('/api/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+
+def test_metrics_route_reports_stage_histograms(app, client):
+    app.config['METRICS_TOKEN'] = 'ops-token'
+    stage_histograms.clear()
+    stage_histograms.observe('load_data', 12)
+
+    response = client.get('/api/metrics', headers={'Authorization': 'Bearer ops-token'})
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert set(data) == {'pid', 'integrations', 'stages'}
+    assert data['stages']['load_data']['count'] == 1
+    assert data['stages']['load_data']['buckets']['25'] == 1
+    stage_histograms.clear()
+
+def test_metrics_are_logged_at_the_configured_interval(app, caplog, monkeypatch):
+    monkeypatch.setattr(metrics, '_last_logged', None)
+    with caplog.at_level(logging.INFO, logger='patternmd.metrics'):
+        metrics.log_metrics_if_due()
+        assert not caplog.records
+
+        app.config['METRICS_LOG_INTERVAL_SECONDS'] = 3600
+        metrics.log_metrics_if_due()
+        metrics.log_metrics_if_due()
+    assert len(caplog.records) == 1
+    assert '"event": "process_metrics"' in caplog.records[0].getMessage()
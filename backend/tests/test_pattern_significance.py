@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+import pytest
+from app.services.pattern_analysis import analysis_seed, analyze_correlations, get_data_version, load_user_data
+
+pytestmark = pytest.mark.usefixtures('task')
+
+SEVERITY = [3, 5, 4, 6, 2, 7, 5, 3, 6, 4, 5, 6]
+MOOD = [7, 4, 5, 5, 6, 3, 7, 6, 4, 8, 5, 6]
+
+@pytest.fixture
+def noisy_days(client, auth_headers):
+    """A dozen days where mood and symptoms are only loosely related"""
+    first = datetime.utcnow().replace(hour=9, minute=0, second=0, microsecond=0) - timedelta(days=len(SEVERITY))
+    for i, (severity, mood) in enumerate(zip(SEVERITY, MOOD)):
+        ts = (first + timedelta(days=i)).isoformat()
+        client.post('/api/symptoms', headers=auth_headers, json={'symptomName': 'Headache', 'severity': severity, 'timestamp': ts})
+        client.post('/api/mood', headers=auth_headers, json={'moodRating': mood, 'timestamp': ts})
+
+def _mood_p_value(user, **kwargs):
+    # Few shuffles and alpha=1 so a middling p-value is reported and would vary with the seed
+    results = analyze_correlations(user.id, load_user_data(user.id), n_permutations=50, alpha=1.0, **kwargs)
+    return next(r['pValue'] for r in results if r['factor'] == 'Mood')
+
+def test_p_values_are_seeded_from_the_data_version(noisy_days, user):
+    p_value = _mood_p_value(user)
+    assert 0.02 < p_value < 1
+    assert _mood_p_value(user) == p_value
+    assert _mood_p_value(user, seed=analysis_seed(user.id, get_data_version(user.id))) == p_value
+
+def test_analysis_seed_is_stable_per_version():
+    # A hash of the id and version, not Python's per-process hash(), so every worker agrees
+    assert analysis_seed('user-1', 3) == 4274073722290676414
+    assert analysis_seed('user-1', 3) != analysis_seed('user-1', 4)
+    assert analysis_seed('user-1', 3) != analysis_seed('user-2', 3)
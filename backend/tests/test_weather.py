@@ -0,0 +1,160 @@
+import time
+import pytest
+import requests
+from app import db
+from app.models.geocode_cache import GeocodeCache
+from app.models.user import User
+from app.services.stage_timing import stage_histograms
+from app.utils import http_client, weather
+
+class FakeResponse:
+    def __init__(self, body, status_code=200):
+        self.body = body
+        self.status_code = status_code
+        self.text = str(body)
+
+    def json(self):
+        return self.body
+
+class NotJson(FakeResponse):
+    def __init__(self):
+        super().__init__('<html>', 200)
+
+    def json(self):
+        raise ValueError('not JSON')
+
+WEATHER = {'main': {'temp': 61.2, 'humidity': 70, 'pressure': 1012}, 'weather': [{'main': 'Clouds'}]}
+
+@pytest.fixture
+def openweather(monkeypatch, task):
+    """Stand-in OpenWeatherMap answers, recording the URLs asked for"""
+    calls = []
+
+    def http_get(integration, url, **kwargs):
+        calls.append(url)
+        if '/geo/' in url:
+            return FakeResponse([{'name': 'Paris', 'state': 'Ile-de-France', 'country': 'FR', 'lat': 48.85, 'lon': 2.35}])
+        if '/weather?' in url:
+            return FakeResponse(WEATHER)
+        return FakeResponse({}, 404)
+
+    monkeypatch.setattr(weather, 'http_get', http_get)
+    return calls
+
+def test_geocoding_leaves_the_callers_changes_uncommitted(user, openweather):
+    user.name = 'Renamed'
+    user.home_location = '  paris '
+    assert weather.resolve_home_location(user) is None
+    assert user.home_location_name == 'Paris, Ile-de-France, FR'
+
+    # A failure after geocoding still discards the whole edit
+    db.session.rollback()
+    stored = db.session.get(User, user.id)
+    assert stored.name != 'Renamed'
+    assert stored.home_lat is None
+    # The cache entry went with it; it is kept when the caller commits
+    assert GeocodeCache.query.count() == 0
+
+def test_auto_fetch_logs_the_resolved_name(client, auth_headers, user, openweather):
+    response = client.put('/api/users/profile', headers=auth_headers, json={'homeLocation': 'paris'})
+    assert response.status_code == 200
+    stored = db.session.get(User, user.id)
+    assert (stored.home_lat, stored.home_lon, stored.home_location_name) == (48.85, 2.35, 'Paris, Ile-de-France, FR')
+    assert GeocodeCache.query.filter_by(search='paris').one().name == 'Paris, Ile-de-France, FR'
+
+    response = client.post('/api/environment/auto-fetch', headers=auth_headers)
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()['data']['location'] == 'Paris, Ile-de-France, FR'
+    # Stored coordinates are used without geocoding again
+    assert sum('/geo/' in url for url in openweather) == 1
+
+def test_weather_http_timings_are_recorded_from_worker_threads(app, monkeypatch):
+    app.config.update(ANALYSIS_TIMING=True, ANALYSIS_TIMING_HISTOGRAMS=True)
+    stage_histograms.clear()
+
+    class Session:
+        def request(self, method, url, **kwargs):
+            return FakeResponse(WEATHER if '/weather?' in url else {})
+
+    monkeypatch.setattr(http_client, 'get_session', lambda integration: Session())
+    data, error = weather.fetch_weather_data('Paris', (48.85, 2.35))
+    assert error is None
+    assert stage_histograms.snapshot()['http.openweather']['count'] == 3
+    stage_histograms.clear()
+
+AIR = {'list': [{'main': {'aqi': 2}, 'components': {'pm2_5': 4.1, 'pm10': 9.7}}]}
+
+@pytest.fixture
+def endpoints(app, monkeypatch):
+    """
+    Stand-in weather, air pollution and UV calls. Each entry is a reply
+    body, an exception to raise, or (seconds to sleep, reply).
+    """
+    replies = {'weather': WEATHER, 'air_pollution': AIR, 'uvi': {'value': 5.3}}
+
+    def http_get(integration, url, **kwargs):
+        reply = replies[url.split('/data/2.5/')[1].split('?')[0]]
+        if isinstance(reply, tuple):
+            delay, reply = reply
+            time.sleep(delay)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply if isinstance(reply, FakeResponse) else FakeResponse(reply)
+
+    monkeypatch.setattr(weather, 'http_get', http_get)
+    return replies
+
+def _fetch():
+    return weather.fetch_weather_data('Paris, FR', (48.85, 2.35))
+
+def test_weather_with_air_quality_and_uv(endpoints):
+    data, error = _fetch()
+    assert error is None
+    assert (data['temperature'], data['location']) == (61.2, 'Paris, FR')
+    assert (data['air_quality_index'], data['pm2_5'], data['pm10'], data['uv_index']) == (2, 4.1, 9.7, 5.3)
+
+def test_calls_run_concurrently(endpoints):
+    for key in endpoints:
+        endpoints[key] = (0.3, endpoints[key])
+    started = time.perf_counter()
+    data, error = _fetch()
+    assert error is None and data['uv_index'] == 5.3
+    assert time.perf_counter() - started < 0.6
+
+@pytest.mark.parametrize('failure', [
+    requests.exceptions.ConnectionError('refused'),
+    FakeResponse({'message': 'server error'}, 500),
+    'not json',
+])
+def test_failed_air_quality_and_uv_are_left_out(endpoints, failure):
+    if failure == 'not json':
+        failure = NotJson()
+    endpoints['air_pollution'] = endpoints['uvi'] = failure
+    data, error = _fetch()
+    assert error is None
+    assert data['temperature'] == 61.2
+    assert (data['air_quality_index'], data['pm2_5'], data['pm10'], data['uv_index']) == (None, None, None, None)
+
+def test_slow_air_quality_and_uv_miss_the_deadline(endpoints, monkeypatch):
+    monkeypatch.setattr(weather, 'WEATHER_FETCH_DEADLINE_SECONDS', 0.2)
+    endpoints['air_pollution'] = (1, AIR)
+    endpoints['uvi'] = (1, {'value': 5.3})
+    started = time.perf_counter()
+    data, error = _fetch()
+    assert time.perf_counter() - started < 0.8
+    assert error is None
+    assert data['temperature'] == 61.2
+    assert data['air_quality_index'] is None and data['uv_index'] is None
+
+def test_weather_past_the_deadline_is_an_error(endpoints, monkeypatch):
+    monkeypatch.setattr(weather, 'WEATHER_FETCH_DEADLINE_SECONDS', 0.2)
+    endpoints['weather'] = (1, WEATHER)
+    data, error = _fetch()
+    assert data is None
+    assert 'timed out' in error
+
+def test_weather_failure_is_an_error(endpoints):
+    endpoints['weather'] = FakeResponse({'message': 'city not found'}, 404)
+    data, error = _fetch()
+    assert data is None
+    assert error.startswith('Weather API error: 404')
@@ -0,0 +1,60 @@
+import random
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.window_join import window_join
+
+WINDOW = timedelta(hours=12)
+START = datetime(2026, 3, 1)
+
+def _naive_join(events, candidates, window):
+    """The nested loop window_join replaces, in its output order"""
+    by_time = sorted(range(len(candidates)), key=lambda j: (candidates[j], j))
+    pairs = [(i, j) for i, event in enumerate(events) for j in by_time if event - window <= candidates[j] <= event]
+    return [i for i, _ in pairs], [j for _, j in pairs]
+
+def _assert_matches_naive(events, candidates, window=WINDOW):
+    event_idx, candidate_idx = window_join(events, candidates, window)
+    assert (event_idx.tolist(), candidate_idx.tolist()) == _naive_join(events, candidates, window)
+
+def test_window_bounds_are_inclusive():
+    event = START + timedelta(days=1)
+    candidates = [
+        event - WINDOW,                              # exactly on the window start
+        event - WINDOW - timedelta(microseconds=1),  # just before it
+        event,                                       # at the event itself
+        event + timedelta(microseconds=1),           # just after the event
+    ]
+    event_idx, candidate_idx = window_join([event], candidates, WINDOW)
+    assert event_idx.tolist() == [0, 0]
+    assert candidate_idx.tolist() == [0, 2]
+    _assert_matches_naive([event], candidates)
+
+def test_empty_inputs():
+    for events, candidates in [([START], []), ([], [START]), ([], [])]:
+        event_idx, candidate_idx = window_join(events, candidates, WINDOW)
+        assert len(event_idx) == len(candidate_idx) == 0
+    # Candidates exist but none fall inside any window
+    _assert_matches_naive([START], [START + timedelta(hours=1), START - timedelta(days=2)])
+
+def test_unsorted_inputs_with_ties_map_back_to_original_positions():
+    events = [START + timedelta(hours=h) for h in (30, 2, 14, 2)]
+    candidates = [START + timedelta(hours=h) for h in (20, 0, 13, 2, 0, 26, 2)]
+    _assert_matches_naive(events, candidates)
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_naive_loop(seed):
+    rng = random.Random(seed)
+    # Whole-hour times, so ties and exact window boundaries are common
+    events = [START + timedelta(hours=rng.randint(0, 24 * 10)) for _ in range(rng.randint(0, 40))]
+    candidates = [START + timedelta(hours=rng.randint(0, 24 * 10)) for _ in range(rng.randint(0, 80))]
+    _assert_matches_naive(events, candidates)
+
+def test_accepts_pandas_series_with_an_index():
+    events = pd.Series([START + timedelta(hours=5)], index=[17])
+    candidates = pd.Series([START, START + timedelta(hours=4)], index=[40, 3])
+    event_idx, candidate_idx = window_join(events, candidates, WINDOW)
+    assert np.issubdtype(event_idx.dtype, np.integer)
+    # Positions, not index labels
+    assert candidate_idx.tolist() == [0, 1]
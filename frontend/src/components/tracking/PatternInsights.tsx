@@ -11,9 +11,11 @@ import type { CorrelationResult } from "@/services/analysisService";
 interface Props {
     correlations: CorrelationResult[];
     aiInsights: string;
+    insightsPending?: boolean;
+    insightError?: string | null;
 }
 
-export const PatternInsights = ({ correlations, aiInsights }: Props) => {
+export const PatternInsights = ({ correlations, aiInsights, insightsPending = false, insightError = null }: Props) => {
     return (
         <div className="space-y-6">
             <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
@@ -39,6 +41,10 @@ export const PatternInsights = ({ correlations, aiInsights }: Props) => {
                                 >
                                     {aiInsights}
                                 </ReactMarkdown>
+                            ) : insightsPending ? (
+                                "Generating insights from your latest data..."
+                            ) : insightError ? (
+                                insightError
                             ) : (
                                 "No insights generated yet. Continue logging data to see AI analysis."
                             )}
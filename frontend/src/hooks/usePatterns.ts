@@ -1,38 +1,81 @@
-import { useState, useEffect } from "react";
-import { analysisService, type CorrelationResult } from "@/services/analysisService";
+import { useState, useEffect, useRef } from "react";
+import { analysisService, type AnalysisJob, type CorrelationResult, type InsightStatus } from "@/services/analysisService";
 import type { Correlation } from "@/types";
 
+// How often to re-check while a background analysis is queued or running
+const JOB_POLL_INTERVAL_MS = 5000;
+// How often to re-check while AI insights are being generated
+const INSIGHT_POLL_INTERVAL_MS = 2000;
+
 export const usePatterns = () => {
 	const [correlations, setCorrelations] = useState<CorrelationResult[]>([]);
 	const [matrix, setMatrix] = useState<Correlation[]>([]);
 	const [aiInsights, setAiInsights] = useState<string>("");
+	const [insightStatus, setInsightStatus] = useState<InsightStatus>("idle");
+	const [insightError, setInsightError] = useState<string | null>(null);
+	const [job, setJob] = useState<AnalysisJob | null>(null);
 	const [loading, setLoading] = useState(true);
 	const [error, setError] = useState<string | null>(null);
+	const pollTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
+	const insightTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
+
+	const pollInsights = async () => {
+		try {
+			const insights = await analysisService.getInsights();
+			setInsightStatus(insights.status);
+			setInsightError(insights.error);
+			if (insights.status === "pending") {
+				insightTimer.current = setTimeout(pollInsights, INSIGHT_POLL_INTERVAL_MS);
+			} else {
+				setAiInsights(insights.aiInsights || "");
+			}
+		} catch (err: any) {
+			setError(err.message);
+		}
+	};
 
-	const fetchData = async () => {
+	const fetchData = async (silent = false) => {
+		if (pollTimer.current) clearTimeout(pollTimer.current);
+		if (insightTimer.current) clearTimeout(insightTimer.current);
 		try {
-			setLoading(true);
+			if (!silent) setLoading(true);
 			const data = await analysisService.getPatterns();
 			setCorrelations(data.correlations);
 			setMatrix(data.matrix || []);
-			setAiInsights(data.aiInsights);
+			setAiInsights(data.aiInsights || "");
+			setInsightStatus(data.insightStatus);
+			setInsightError(data.insightError);
+			setJob(data.job);
+
+			if (data.job && (data.job.status === "queued" || data.job.status === "running")) {
+				pollTimer.current = setTimeout(() => fetchData(true), JOB_POLL_INTERVAL_MS);
+			} else if (data.insightStatus === "pending") {
+				insightTimer.current = setTimeout(pollInsights, INSIGHT_POLL_INTERVAL_MS);
+			}
 		} catch (err: any) {
 			setError(err.message);
 		} finally {
-			setLoading(false);
+			if (!silent) setLoading(false);
 		}
 	};
 
 	useEffect(() => {
 		fetchData();
+		return () => {
+			if (pollTimer.current) clearTimeout(pollTimer.current);
+			if (insightTimer.current) clearTimeout(insightTimer.current);
+		};
 	}, []);
 
 	return {
 		correlations,
 		matrix,
 		aiInsights,
+		insightStatus,
+		insightError,
+		job,
 		loading,
 		error,
-		refetch: fetchData,
+		refetch: () => fetchData(),
 	};
 };
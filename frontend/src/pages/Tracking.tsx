@@ -51,7 +51,7 @@ export const Tracking = () => {
 	const { foodLogs } = useFood(filters.dateRange?.startDate, filters.dateRange?.endDate);
 	const { activityLogs } = useActivity(filters.dateRange?.startDate, filters.dateRange?.endDate);
 	const { moodLogs } = useMood(filters.dateRange?.startDate, filters.dateRange?.endDate);
-	const { correlations, matrix, aiInsights, loading: patternsLoading } = usePatterns();
+	const { correlations, matrix, aiInsights, insightStatus, insightError, loading: patternsLoading } = usePatterns();
 
 	const isLoading = symptomsLoading || patternsLoading;
 
@@ -321,7 +321,7 @@ export const Tracking = () => {
 						</Card>
 					</TabPanel>
 					<TabPanel className="space-y-6">
-						<PatternInsights correlations={correlations} aiInsights={aiInsights} />
+						<PatternInsights correlations={correlations} aiInsights={aiInsights} insightsPending={insightStatus === "pending"} insightError={insightStatus === "failed" ? insightError : null} />
 					</TabPanel>
 					<TabPanel>
 						<Card title="Comprehensive Timeline">
@@ -2,23 +2,131 @@ import { api } from "./api";
 import type { ApiResponse, Correlation } from "@/types";
 
 export interface CorrelationResult {
-	type: "correlation" | "trigger";
+	type: "correlation" | "trigger" | "pattern";
 	factor: string;
 	score?: number;
 	item?: string;
+	items?: string[];
 	count?: number;
+	days?: number;
+	lift?: number;
+	lag?: number;
+	pValue?: number;
+	confidenceInterval?: [number, number] | null;
 	description: string;
 }
 
+export interface AnalysisJob {
+	id: string | null;
+	status: "idle" | "queued" | "running" | "complete" | "failed";
+	requestedAt: string | null;
+	completedAt: string | null;
+	error: string | null;
+}
+
+export type InsightStatus = "idle" | "pending" | "complete" | "failed";
+
+export interface InsightsResponse {
+	status: InsightStatus;
+	aiInsights: string | null;
+	dataVersion: number | null;
+	requestedAt: string | null;
+	completedAt: string | null;
+	error: string | null;
+}
+
+export interface AnalysisWindow {
+	startDate: string;
+	endDate: string;
+}
+
 export interface PatternsResponse {
 	correlations: CorrelationResult[];
 	matrix: Correlation[];
-	aiInsights: string;
+	aiInsights: string | null;
+	insightStatus: InsightStatus;
+	insightError: string | null;
+	window: AnalysisWindow | null;
+	job: AnalysisJob;
+}
+
+export interface FoodTrigger {
+	food: string;
+	episodes: number;
+	support: number;
+	confidence: number;
+	lift: number;
+}
+
+export interface TriggersResponse {
+	window: AnalysisWindow;
+	triggers: Record<string, FoodTrigger[]>;
 }
 
 export const analysisService = {
-	async getPatterns(): Promise<PatternsResponse> {
-		const response = await api.get<ApiResponse<PatternsResponse>>("/analysis/patterns");
+	async getPatterns(params?: {
+		startDate?: string;
+		endDate?: string;
+		lookbackDays?: number;
+	}): Promise<PatternsResponse> {
+		const response = await api.get<ApiResponse<PatternsResponse>>("/analysis/patterns", { params });
+		return response.data.data!;
+	},
+
+	async getInsights(): Promise<InsightsResponse> {
+		const response = await api.get<ApiResponse<InsightsResponse>>("/analysis/insights");
+		return response.data.data!;
+	},
+
+	// Streams the AI insights as the model writes them, calling onToken with each
+	// piece and resolving with the whole text. Read with fetch because
+	// EventSource can't send the Authorization header the route requires.
+	async streamInsights(onToken: (text: string) => void, signal?: AbortSignal): Promise<string> {
+		const response = await fetch(`${api.defaults.baseURL}/analysis/insights/stream`, {
+			headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
+			signal,
+		});
+		if (!response.ok || !response.body) {
+			throw new Error(`Insight stream failed (status ${response.status})`);
+		}
+
+		const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+		let buffer = "";
+		for (;;) {
+			const { value, done } = await reader.read();
+			if (done) break;
+			buffer += value;
+
+			// Server-sent events are separated by a blank line
+			let boundary: number;
+			while ((boundary = buffer.indexOf("\n\n")) >= 0) {
+				const block = buffer.slice(0, boundary);
+				buffer = buffer.slice(boundary + 2);
+				let event = "message";
+				let data = "";
+				for (const line of block.split("\n")) {
+					if (line.startsWith("event:")) event = line.slice(6).trim();
+					else if (line.startsWith("data:")) data += line.slice(5).trim();
+				}
+				if (!data) continue;
+
+				const payload = JSON.parse(data);
+				if (event === "token") onToken(payload.text);
+				else if (event === "done") return payload.text;
+				else if (event === "error") throw new Error(payload.error);
+			}
+		}
+		throw new Error("Insight stream ended before the insights were complete");
+	},
+
+	async getTriggers(params?: {
+		symptom?: string;
+		minEpisodes?: number;
+		startDate?: string;
+		endDate?: string;
+		lookbackDays?: number;
+	}): Promise<TriggersResponse> {
+		const response = await api.get<ApiResponse<TriggersResponse>>("/analysis/triggers", { params });
 		return response.data.data!;
 	},
 };